@@ -0,0 +1,434 @@
+import multiprocessing
+import numpy as np
+from sim_env import create_world
+from curves import curve_path
+from config import (LINEAR_ACCEL, ANGULAR_ACCEL, DEFAULT_MOVE_TIME, FLIP_TIME, TAKEOFF_TIME, LAND_TIME, TERRAIN_FILE,
+                    DRONE_INITIAL_X, DRONE_INITIAL_Y, DRONE_INITIAL_Z, DRONE_INITIAL_YAW, DRONE_INITIAL_BATTERY,
+                    DRONE_DEFAULT_SPEED, DRONE_IDLE_DRAIN_RATE, DRONE_FLYING_DRAIN_RATE, ENV_STEP_TIME,
+                    ENV_MAX_SPEED, ENV_MAX_YAW_RATE, ENV_OBSTACLE_COUNT, ENV_OBSTACLE_RANGE, ENV_MAX_EPISODE_TIME,
+                    ENV_START_JITTER, ENV_START_FLYING, ENV_END_ON_COLLISION, CURVE_MIN_RADIUS, CURVE_MAX_RADIUS,
+                    CURVE_MAX_SPEED)
+
+# Command opcodes; unknown commands parse to INVALID
+(INVALID, COMMAND, TAKEOFF, LAND, UP, DOWN, FORWARD, BACK, RIGHT, LEFT, CW, CCW, FLIP, GO, SPEED, BATTERY_QUERY,
+ SPEED_QUERY, TIME_QUERY, EMERGENCY, CURVE, TOF_QUERY) = range(21)
+_OPCODES = {"command": COMMAND, "takeoff": TAKEOFF, "land": LAND, "up": UP, "down": DOWN, "forward": FORWARD,
+            "back": BACK, "right": RIGHT, "left": LEFT, "cw": CW, "ccw": CCW, "flip": FLIP, "go": GO, "speed": SPEED,
+            "battery?": BATTERY_QUERY, "speed?": SPEED_QUERY, "time?": TIME_QUERY, "emergency": EMERGENCY,
+            "curve": CURVE, "tof?": TOF_QUERY}
+_ARG_COUNT = 7  # The most integer arguments a command takes ("curve")
+_HORIZONTAL_HEADINGS = {FORWARD: 0, RIGHT: 90, BACK: 180, LEFT: 270}  # Degrees from the drone's yaw
+_PARSE_CACHE = {}
+
+
+def parse_command(cmd):
+    """
+    Parse a Tello command into (opcode, arg0, ..., arg6, well_formed), mirroring Drone.execute_command.
+
+    Arguments are the integers the command takes (flip: 1 for a valid direction); range checks happen when
+    the batch applies it. Results are cached, so repeated command strings parse once.
+    """
+    parsed = _PARSE_CACHE.get(cmd)
+    if parsed is not None:
+        return parsed
+    parts = cmd.strip().split()
+    opcode = _OPCODES.get(parts[0].lower(), INVALID) if parts else INVALID
+    args = [0] * _ARG_COUNT
+    well_formed = opcode != INVALID
+    try:
+        if opcode in (UP, DOWN, FORWARD, BACK, RIGHT, LEFT, CW, CCW, SPEED):
+            args[0] = int(parts[1])
+        elif opcode in (GO, CURVE):
+            expected = 4 if opcode == GO else 7
+            args = list(map(int, parts[1:expected + 1]))
+            well_formed = len(args) == expected
+            args += [0] * (_ARG_COUNT - len(args))
+        elif opcode == FLIP:
+            args[0] = int(parts[1].lower() in ("l", "r", "f", "b"))
+    except (IndexError, ValueError):
+        well_formed = False
+    parsed = _PARSE_CACHE[cmd] = (opcode, *args, well_formed)
+    return parsed
+
+
+def linear_move_times(distance, speed, accel=LINEAR_ACCEL):
+    """Vectorized MotionPlanner._calc_linear_time (trapezoidal profile, triangular when too short to coast)."""
+    distance = np.asarray(distance, dtype=float)
+    accel_time = speed / accel
+    accel_dist = 0.5 * accel * accel_time ** 2
+    short = 2 * np.sqrt(distance / accel)
+    coasting = 2 * accel_time + (distance - 2 * accel_dist) / speed
+    times = np.where(distance <= 2 * accel_dist, short, coasting)
+    return np.where(distance == 0, DEFAULT_MOVE_TIME, times)
+
+
+def arc_geometry(start, via, end):
+    """
+    Vectorized circle_through and ArcSegment length for (K, 3) point arrays.
+
+    Returns:
+        (radius, length) arrays, NaN where the three points are (nearly) collinear
+    """
+    ab, ac = via - start, end - start
+    normal = np.cross(ab, ac)
+    normal_sq = (normal ** 2).sum(axis=1)
+    ab_sq, ac_sq = (ab ** 2).sum(axis=1), (ac ** 2).sum(axis=1)
+    valid = normal_sq > 1e-9 * ab_sq * ac_sq
+    normal_sq = np.where(valid, normal_sq, 1.0)
+    center = start + (ac_sq[:, None] * np.cross(normal, ab) + ab_sq[:, None] * np.cross(ac, normal)) / (
+        2 * normal_sq[:, None])
+    radius = np.sqrt(((start - center) ** 2).sum(axis=1))
+    u = (start - center) / np.where(valid, radius, 1.0)[:, None]
+    v = np.cross(normal / np.sqrt(normal_sq)[:, None], u)
+    offset = end - center
+    sweep = np.arctan2((offset * v).sum(axis=1), (offset * u).sum(axis=1)) % (2 * np.pi)
+    return np.where(valid, radius, np.nan), np.where(valid, radius * sweep, np.nan)
+
+
+"""K independent simulated drones stepped together, for policy search.
+
+Each environment has its own drone, clock and episode; they share one read-only world. Drone state lives in
+(K, ...) arrays and every step applies K commands (or K velocity actions) with masked array updates, so the
+per-step cost is a handful of NumPy calls regardless of K. Battery drain, wind drift and path collisions are
+batched too.
+Commands follow Drone.execute_command and their durations MotionPlanner.calculate_move_time.
+
+Observations are the DroneEnv observations stacked: pose (K, 4), battery (K, 1), obstacles (K, count).
+"""
+class BatchDroneEnv:
+    def __init__(self, count, collision_detector=None, terrain=None, weather_data=None, step_time=ENV_STEP_TIME,
+                 obstacle_count=ENV_OBSTACLE_COUNT, obstacle_range=ENV_OBSTACLE_RANGE,
+                 max_episode_time=ENV_MAX_EPISODE_TIME, start_jitter=ENV_START_JITTER):
+        """
+        Initialize K environments; call reset() before the first step.
+
+        Args:
+            count: Number of environments K
+            collision_detector: Prebuilt detector shared by all environments, or None to build the world
+            terrain: Optional Terrain, loaded from TERRAIN_FILE when None
+            weather_data: Weather data dictionary (temperature drains the battery, wind drifts the drones), or None
+            step_time: Seconds each velocity action is held
+            obstacle_count: Obstacle distances per observation
+            obstacle_range: Obstructions farther than this (cm) are not observed
+            max_episode_time: Simulated seconds before an episode ends, or None
+            start_jitter: Random start offset (cm) in x and y drawn per environment on reset
+        """
+        if terrain is None and TERRAIN_FILE:
+            from terrain import load_terrain
+            terrain = load_terrain(TERRAIN_FILE)
+        self.count = count
+        self.terrain = terrain
+        self.collision_detector = collision_detector if collision_detector is not None else create_world(terrain)
+        self.wind = None
+        if weather_data:
+            from wind import create_wind_field
+            self.wind = create_wind_field(weather_data, self.collision_detector)
+        self.step_time = step_time
+        self.obstacle_count = obstacle_count
+        self.obstacle_range = obstacle_range
+        self.max_episode_time = max_episode_time
+        self.start_jitter = start_jitter
+        self.action_high = np.array((ENV_MAX_SPEED, ENV_MAX_SPEED, ENV_MAX_SPEED, ENV_MAX_YAW_RATE), dtype=float)
+        self.rng = np.random.default_rng()
+
+        # Same temperature factor as Drone.update_battery
+        temperature = (weather_data or {}).get("temperature", 20)
+        self.temp_factor = 0.0
+        if temperature < 10:
+            self.temp_factor = max(0, (20 - temperature) * 0.0167)
+        elif temperature > 30:
+            self.temp_factor = max(0, (temperature - 30) * 0.02)
+
+        self.position = np.zeros((count, 3))
+        self.yaw = np.zeros(count)
+        self.battery = np.zeros(count)
+        self.speed = np.zeros(count)
+        self.connected = np.zeros(count, dtype=bool)
+        self.flying = np.zeros(count, dtype=bool)
+        self.time = np.zeros(count)
+        self.episode_steps = np.zeros(count, dtype=np.int64)
+
+    def ground_heights(self, x, y):
+        if self.terrain is None:
+            return np.zeros(np.shape(x))
+        return self.terrain.heights_at(x, y)
+
+    def reset(self, seed=None, mask=None, flying=ENV_START_FLYING):
+        """
+        Start new episodes and return the observation of all K environments.
+
+        Args:
+            seed: Reseeds the start jitter, for reproducible episodes
+            mask: (K,) booleans selecting the environments to reset (e.g. the last step's done), None for all
+            flying: Start connected and hovering at takeoff height instead of landed
+        """
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        envs = np.arange(self.count) if mask is None else np.flatnonzero(mask)
+        x = np.full(len(envs), float(DRONE_INITIAL_X))
+        y = np.full(len(envs), float(DRONE_INITIAL_Y))
+        if self.start_jitter:
+            x += self.rng.uniform(-self.start_jitter, self.start_jitter, len(envs))
+            y += self.rng.uniform(-self.start_jitter, self.start_jitter, len(envs))
+        ground = self.ground_heights(x, y)
+        self.position[envs, 0] = x
+        self.position[envs, 1] = y
+        self.position[envs, 2] = ground + 100 if flying else np.maximum(DRONE_INITIAL_Z, ground)
+        self.yaw[envs] = DRONE_INITIAL_YAW
+        self.battery[envs] = DRONE_INITIAL_BATTERY
+        self.speed[envs] = DRONE_DEFAULT_SPEED
+        self.connected[envs] = flying
+        self.flying[envs] = flying
+        self.time[envs] = 0.0
+        self.episode_steps[envs] = 0
+        return self.observe()
+
+    def observe(self):
+        return {
+            "pose": np.column_stack((self.position, self.yaw)),
+            "battery": self.battery[:, None].copy(),
+            "obstacles": self.collision_detector.obstacle_distances_batch(self.position, self.obstacle_count,
+                                                                          self.obstacle_range),
+        }
+
+    def step(self, actions):
+        """
+        Apply one action per environment and advance each environment's clock by its duration.
+
+        Args:
+            actions: K Tello command strings, or a (K, 4) array of [right, forward, up, yaw_rate] velocities
+        Returns:
+            (observation, done, info); done is (K,) booleans and info holds (K,) arrays "ok", "collision",
+            "duration", "time", "flying" and "value" (query results, NaN for other commands)
+        """
+        if self.collision_detector is None:
+            raise RuntimeError("step() called on a closed BatchDroneEnv")
+        start = self.position.copy()
+        value = np.full(self.count, np.nan)
+        if isinstance(actions, np.ndarray) and actions.dtype.kind in "fiu":
+            ok, duration = self._apply_velocities(actions)
+            curves, vias = np.zeros(0, dtype=np.int64), np.zeros((0, 3))
+        else:
+            if len(actions) != self.count:
+                raise ValueError(f"Expected {self.count} commands, got {len(actions)}")
+            ok, duration, curves, vias = self._apply_commands(actions, value)
+        if self.wind is not None:
+            drifting = np.flatnonzero(self.flying & (duration > 0))
+            if len(drifting):
+                self.position[drifting] += self.wind.drift(start[drifting], duration[drifting], self.time[drifting])
+        self._update_battery(duration)
+        self.time += duration
+        self.episode_steps += 1
+
+        collision = np.zeros(self.count, dtype=bool)
+        moved = (self.position != start).any(axis=1)
+        # Curves are swept along the chords of their arc (through the drifted end, like DroneEnv), one at a time
+        for env, via in zip(curves, vias):
+            if moved[env]:
+                path = curve_path(tuple(start[env]), tuple(via), tuple(self.position[env]))
+                collision[env] = self.collision_detector.check_polyline_collision(path.chords()[1]) is not None
+                moved[env] = False
+        moved = np.flatnonzero(moved)
+        if len(moved):
+            collision[moved] = self.collision_detector.check_paths_collision(start[moved], self.position[moved])
+        done = self.battery <= 0
+        if ENV_END_ON_COLLISION:
+            done |= collision
+        if self.max_episode_time is not None:
+            done |= self.time >= self.max_episode_time
+        info = {"ok": ok, "collision": collision, "duration": duration, "time": self.time.copy(),
+                "flying": self.flying.copy(), "value": value}
+        return self.observe(), done, info
+
+    def _apply_commands(self, commands, value):
+        parsed = np.array([parse_command(cmd) for cmd in commands], dtype=float)
+        opcode = parsed[:, 0].astype(np.int64)
+        args = parsed[:, 1:1 + _ARG_COUNT]
+        arg = args[:, 0]
+        well_formed = parsed[:, 1 + _ARG_COUNT].astype(bool)
+        x, y, z = self.position.T  # Views: writes below update the state
+        flying = self.flying
+        duration = np.zeros(self.count)
+
+        # Everything except "command" needs a connection; movement also needs the drone in the air
+        ok = well_formed & (self.connected | (opcode == COMMAND))
+        airborne = ok & flying
+        in_range = (20 <= arg) & (arg <= 500)
+        speed_range = (10 <= arg) & (arg <= 100)
+
+        self.connected |= opcode == COMMAND
+
+        takeoff = ok & (opcode == TAKEOFF) & ~flying
+        land = airborne & (opcode == LAND)
+        emergency = ok & (opcode == EMERGENCY)
+        up = airborne & (opcode == UP) & in_range
+        down = airborne & (opcode == DOWN) & in_range
+        horizontal = airborne & np.isin(opcode, tuple(_HORIZONTAL_HEADINGS)) & in_range
+        turn = airborne & ((opcode == CW) | (opcode == CCW)) & (1 <= arg) & (arg <= 360)
+        flip = airborne & (opcode == FLIP) & (arg == 1)
+        go_args = np.abs(args[:, :3]) <= 500
+        go = airborne & (opcode == GO) & go_args.all(axis=1) & (10 <= args[:, 3]) & (args[:, 3] <= 100)
+        curve = airborne & (opcode == CURVE) & (np.abs(args[:, :6]) <= 500).all(axis=1) & (10 <= args[:, 6]) & (
+            args[:, 6] <= CURVE_MAX_SPEED)
+        curves = np.flatnonzero(curve)
+        curve_start, vias = self.position[curves].copy(), args[curves, :3].copy()
+        radius = arc_geometry(curve_start, vias, args[curves, 3:6])[0]
+        curve[curves] = (CURVE_MIN_RADIUS <= radius) & (radius <= CURVE_MAX_RADIUS)  # False where collinear (NaN)
+        set_speed = ok & (opcode == SPEED) & speed_range
+        queries = ok & np.isin(opcode, (BATTERY_QUERY, SPEED_QUERY, TIME_QUERY, TOF_QUERY))
+        ok &= (takeoff | land | emergency | up | down | horizontal | turn | flip | go | curve | set_speed | queries |
+               (opcode == COMMAND))
+
+        ground = self.ground_heights(x, y)
+        z[takeoff] = ground[takeoff] + 100  # 1m hover
+        z[land | emergency] = ground[land | emergency]
+        flying[takeoff] = True
+        flying[land | emergency] = False
+        z[up] += arg[up]
+        z[down] = np.maximum(ground[down], z[down] - arg[down])
+        heading_offset = np.zeros(self.count)
+        for opcode_value, offset in _HORIZONTAL_HEADINGS.items():
+            heading_offset[opcode == opcode_value] = offset
+        rad = np.radians(self.yaw[horizontal] + heading_offset[horizontal])
+        x[horizontal] += arg[horizontal] * np.sin(rad)
+        y[horizontal] += arg[horizontal] * np.cos(rad)
+        self.yaw[turn] = (self.yaw[turn] + np.where(opcode[turn] == CW, arg[turn], -arg[turn])) % 360
+        go_start = self.position[go].copy()
+        x[go] = args[go, 0]
+        y[go] = args[go, 1]
+        z[go] = np.maximum(self.ground_heights(x[go], y[go]), args[go, 2])
+        self.speed[go] = args[go, 3]
+        kept = curve[curves]  # Rows of curves that passed the radius check
+        curves, curve_start, vias = curves[kept], curve_start[kept], vias[kept]
+        x[curves] = args[curves, 3]
+        y[curves] = args[curves, 4]
+        z[curves] = np.maximum(self.ground_heights(x[curves], y[curves]), args[curves, 5])
+        self.speed[curves] = args[curves, 6]
+        self.speed[set_speed] = arg[set_speed]
+
+        value[queries & (opcode == BATTERY_QUERY)] = np.floor(self.battery[queries & (opcode == BATTERY_QUERY)])
+        value[queries & (opcode == SPEED_QUERY)] = self.speed[queries & (opcode == SPEED_QUERY)]
+        value[queries & (opcode == TIME_QUERY)] = 0
+        tof = queries & (opcode == TOF_QUERY)
+        value[tof] = np.trunc((z[tof] - ground[tof]) * 10)  # mm, as the "NNNmm" answer
+
+        # Motion times as in MotionPlanner.calculate_move_time
+        linear = up | down | horizontal
+        duration[linear] = linear_move_times(arg[linear], self.speed[linear])
+        duration[go] = linear_move_times(np.sqrt(((self.position[go] - go_start) ** 2).sum(axis=1)), self.speed[go])
+        # Along the arc to the end raised to the ground, a straight line if that made it collinear (curve_path)
+        arc_length = arc_geometry(curve_start, vias, self.position[curves])[1]
+        chord = np.sqrt(((self.position[curves] - curve_start) ** 2).sum(axis=1))
+        duration[curves] = linear_move_times(np.where(np.isnan(arc_length), chord, arc_length), self.speed[curves])
+        duration[turn] = linear_move_times(arg[turn], ANGULAR_ACCEL, ANGULAR_ACCEL)
+        duration[flip] = FLIP_TIME
+        duration[takeoff] = TAKEOFF_TIME
+        duration[land] = LAND_TIME
+        return ok, duration, curves, vias
+
+    def _apply_velocities(self, actions):
+        """Integrate body-frame velocities over one step for every flying drone, like DroneEnv."""
+        actions = np.clip(np.asarray(actions, dtype=float).reshape(self.count, 4), -self.action_high,
+                          self.action_high)
+        right, forward, up, yaw_rate = actions.T
+        dt = self.step_time
+        flying = self.flying
+        heading = np.radians(self.yaw + yaw_rate * dt / 2)  # Mid-step heading
+        x, y, z = self.position.T
+        x += np.where(flying, (forward * np.sin(heading) + right * np.cos(heading)) * dt, 0)
+        y += np.where(flying, (forward * np.cos(heading) - right * np.sin(heading)) * dt, 0)
+        z[flying] = np.maximum(self.ground_heights(x[flying], y[flying]), z[flying] + up[flying] * dt)
+        self.yaw[flying] = (self.yaw[flying] + yaw_rate[flying] * dt) % 360
+        return flying.copy(), np.full(self.count, dt)
+
+    def _update_battery(self, elapsed):
+        """Drain every battery over `elapsed` seconds, as Drone.update_battery does per drone."""
+        drain_rate = np.where(self.flying, np.where(self.battery > 0, DRONE_FLYING_DRAIN_RATE, 0),
+                              DRONE_IDLE_DRAIN_RATE)
+        self.battery = np.maximum(0.0, self.battery - drain_rate * (1 + self.temp_factor) * elapsed)
+
+    def close(self):
+        self.collision_detector = None
+
+
+def _shard_worker(connection, count, options):
+    env = BatchDroneEnv(count, **options)
+    try:
+        while True:
+            method, args = connection.recv()
+            if method == "close":
+                break
+            connection.send(getattr(env, method)(*args))
+    finally:
+        env.close()
+        connection.close()
+
+
+"""BatchDroneEnv split into shards, each stepped by its own worker process.
+
+Every worker builds its own world and steps its slice of the K environments; step() sends each worker its
+actions first and then collects the results, so the shards run in parallel. Same interface as BatchDroneEnv.
+"""
+class ShardedBatchEnv:
+    def __init__(self, count, workers=None, **options):
+        """
+        Start the workers.
+
+        Args:
+            count: Total number of environments K
+            workers: Worker processes, defaults to the CPU count (at most K)
+            options: BatchDroneEnv keyword arguments other than collision_detector (workers build their own)
+        """
+        workers = min(workers or multiprocessing.cpu_count(), count)
+        self.count = count
+        self.bounds = np.linspace(0, count, workers + 1).astype(int)
+        self.connections = []
+        self.processes = []
+        for shard in range(workers):
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_shard_worker, name=f"batch-env-{shard}", daemon=True,
+                                              args=(child, int(self.bounds[shard + 1] - self.bounds[shard]), options))
+            process.start()
+            child.close()
+            self.connections.append(parent)
+            self.processes.append(process)
+
+    def _call(self, method, per_shard_args):
+        for connection, args in zip(self.connections, per_shard_args):
+            connection.send((method, args))
+        return [connection.recv() for connection in self.connections]
+
+    @staticmethod
+    def _merge(observations):
+        return {key: np.concatenate([obs[key] for obs in observations]) for key in observations[0]}
+
+    def _slices(self):
+        return [slice(self.bounds[i], self.bounds[i + 1]) for i in range(len(self.connections))]
+
+    def reset(self, seed=None, mask=None, flying=ENV_START_FLYING):
+        """Reset like BatchDroneEnv.reset; a seed is split into independent per-shard seeds."""
+        seeds = (np.random.SeedSequence(seed).spawn(len(self.connections)) if seed is not None
+                 else [None] * len(self.connections))
+        seeds = [None if s is None else int(s.generate_state(1)[0]) for s in seeds]
+        masks = [None if mask is None else np.asarray(mask)[part] for part in self._slices()]
+        return self._merge(self._call("reset", [(s, m, flying) for s, m in zip(seeds, masks)]))
+
+    def step(self, actions):
+        results = self._call("step", [(actions[part],) for part in self._slices()])
+        observation = self._merge([result[0] for result in results])
+        done = np.concatenate([result[1] for result in results])
+        info = {key: np.concatenate([result[2][key] for result in results]) for key in results[0][2]}
+        return observation, done, info
+
+    def close(self):
+        for connection in self.connections:
+            try:
+                connection.send(("close", ()))
+            except OSError:
+                pass
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self.connections = []
+        self.processes = []
@@ -1,15 +1,185 @@
-from OpenGL.GLU import gluLookAt
+import math
+import numpy as np
+from OpenGL.GL import glLoadMatrixf
+from pygame.locals import (KEYDOWN, MOUSEBUTTONDOWN, MOUSEBUTTONUP, MOUSEMOTION, MOUSEWHEEL,
+                           K_c, K_1, K_2, K_3, K_4, K_LEFT, K_RIGHT, K_UP, K_DOWN, K_EQUALS, K_MINUS)
+from config import (CAMERA_MODE, CAMERA_FOLLOW_DISTANCE, CAMERA_FOLLOW_HEIGHT, CAMERA_ORBIT_DISTANCE,
+                    CAMERA_ORBIT_PITCH, CAMERA_TOP_DOWN_HEIGHT, CAMERA_SMOOTHING_TIME,
+                    CAMERA_MOUSE_SENSITIVITY, CAMERA_KEY_ROTATE_STEP, CAMERA_ZOOM_STEP,
+                    CAMERA_MIN_DISTANCE, CAMERA_MAX_DISTANCE)
 
+CAMERA_MODES = ("fixed", "follow", "orbit", "top_down")
+MODE_KEYS = {K_1: "fixed", K_2: "follow", K_3: "orbit", K_4: "top_down"}
+
+"""Camera view in world units (cm). The view matrix is cached and only rebuilt when eye or target move."""
 class Camera:
-    def __init__(self, eye_x, eye_y, eye_z, target_x, target_y, target_z, up_x, up_y, up_z):
-        self.eye_position = (eye_x, eye_y, eye_z)
-        self.target_position = (target_x, target_y, target_z)
-        self.up_vector = (up_x, up_y, up_z)
+    def __init__(self, eye_x, eye_y, eye_z, target_x, target_y, target_z, up_x, up_y, up_z,
+                 world_scale=(1.0, 1.0, 1.0), mode=CAMERA_MODE):
+        """
+        Initialize the camera.
+
+        Args:
+            eye_x, eye_y, eye_z: Fixed-mode eye position in world units
+            target_x, target_y, target_z: Fixed-mode look-at target in world units
+            up_x, up_y, up_z: Up vector used by every mode except top-down
+            world_scale: Per-axis world-to-view scale folded into the view matrix
+            mode: One of CAMERA_MODES
+        """
+        if mode not in CAMERA_MODES:
+            raise ValueError(f"Unknown camera mode '{mode}', expected one of {CAMERA_MODES}")
+        self.fixed_eye = np.array((eye_x, eye_y, eye_z), dtype=float)
+        self.fixed_target = np.array((target_x, target_y, target_z), dtype=float)
+        self.up_vector = np.array((up_x, up_y, up_z), dtype=float)
+        self.world_scale = np.array(world_scale, dtype=float)
+        self.mode = mode
+
+        # Smoothed camera pose; snaps to the desired pose on the first update
+        self.eye_position = self.fixed_eye.copy()
+        self.target_position = self.fixed_target.copy()
+        self._needs_snap = True
+
+        # Operator-controlled orbit parameters
+        self.orbit_yaw = 0.0  # degrees, clockwise from north like drone yaw
+        self.orbit_pitch = CAMERA_ORBIT_PITCH
+        self.orbit_distance = CAMERA_ORBIT_DISTANCE
+        self._dragging = False
+
+        self._view_matrix = None
+        self._matrix_eye = None
+        self._matrix_target = None
+        self._matrix_mode = None
+
+    def set_mode(self, mode):
+        """Switch camera mode; the pose eases into the new mode over the smoothing time."""
+        if mode not in CAMERA_MODES:
+            raise ValueError(f"Unknown camera mode '{mode}', expected one of {CAMERA_MODES}")
+        self.mode = mode
+
+    def cycle_mode(self):
+        self.set_mode(CAMERA_MODES[(CAMERA_MODES.index(self.mode) + 1) % len(CAMERA_MODES)])
+
+    def handle_event(self, event):
+        """Handle a pygame keyboard or mouse event. Returns True if the camera consumed it."""
+        if event.type == KEYDOWN:
+            if event.key == K_c:
+                self.cycle_mode()
+            elif event.key in MODE_KEYS:
+                self.set_mode(MODE_KEYS[event.key])
+            elif event.key == K_LEFT:
+                self.orbit_yaw -= CAMERA_KEY_ROTATE_STEP
+            elif event.key == K_RIGHT:
+                self.orbit_yaw += CAMERA_KEY_ROTATE_STEP
+            elif event.key == K_UP:
+                self._add_pitch(CAMERA_KEY_ROTATE_STEP)
+            elif event.key == K_DOWN:
+                self._add_pitch(-CAMERA_KEY_ROTATE_STEP)
+            elif event.key == K_EQUALS:
+                self._zoom(1 / CAMERA_ZOOM_STEP)
+            elif event.key == K_MINUS:
+                self._zoom(CAMERA_ZOOM_STEP)
+            else:
+                return False
+            return True
+        if event.type == MOUSEBUTTONDOWN and event.button == 1:
+            self._dragging = True
+            return True
+        if event.type == MOUSEBUTTONUP and event.button == 1:
+            self._dragging = False
+            return True
+        if event.type == MOUSEMOTION and self._dragging:
+            dx, dy = event.rel
+            self.orbit_yaw += dx * CAMERA_MOUSE_SENSITIVITY
+            self._add_pitch(dy * CAMERA_MOUSE_SENSITIVITY)
+            if self.mode != "orbit":
+                self.set_mode("orbit")
+            return True
+        if event.type == MOUSEWHEEL:
+            self._zoom(CAMERA_ZOOM_STEP ** -event.y)
+            return True
+        return False
+
+    def _add_pitch(self, delta):
+        self.orbit_pitch = min(max(self.orbit_pitch + delta, -10.0), 89.0)
+
+    def _zoom(self, factor):
+        self.orbit_distance = min(max(self.orbit_distance * factor, CAMERA_MIN_DISTANCE), CAMERA_MAX_DISTANCE)
+
+    def _desired_pose(self, drone_state):
+        """Return the (eye, target) the current mode wants for the given drone state."""
+        if self.mode == "fixed" or drone_state is None:
+            return self.fixed_eye, self.fixed_target
+
+        target = np.array((drone_state["x"], drone_state["y"], drone_state["z"]), dtype=float)
+        if self.mode == "follow":
+            rad = math.radians(drone_state["yaw"])
+            offset = (-CAMERA_FOLLOW_DISTANCE * math.sin(rad),
+                      -CAMERA_FOLLOW_DISTANCE * math.cos(rad),
+                      CAMERA_FOLLOW_HEIGHT)
+        elif self.mode == "orbit":
+            yaw = math.radians(self.orbit_yaw)
+            pitch = math.radians(self.orbit_pitch)
+            horizontal = self.orbit_distance * math.cos(pitch)
+            offset = (-horizontal * math.sin(yaw),
+                      -horizontal * math.cos(yaw),
+                      self.orbit_distance * math.sin(pitch))
+        else:  # top_down
+            offset = (0.0, 0.0, CAMERA_TOP_DOWN_HEIGHT)
+        return target + offset, target
+
+    def update(self, drone_state, dt):
+        """
+        Advance camera smoothing by one physics tick.
+
+        Args:
+            drone_state: Dictionary with the drone state (x, y, z, yaw), or None for the fixed view
+            dt: Tick duration in seconds
+        """
+        desired_eye, desired_target = self._desired_pose(drone_state)
+        if self._needs_snap or CAMERA_SMOOTHING_TIME <= 0:
+            self.eye_position = np.array(desired_eye, dtype=float)
+            self.target_position = np.array(desired_target, dtype=float)
+            self._needs_snap = False
+            return
+
+        # Frame-rate independent exponential smoothing
+        alpha = 1.0 - math.exp(-max(dt, 0.0) / CAMERA_SMOOTHING_TIME)
+        self.eye_position = self.eye_position + (desired_eye - self.eye_position) * alpha
+        self.target_position = self.target_position + (desired_target - self.target_position) * alpha
+
+    def get_view_matrix(self):
+        """Return the cached column-major view matrix, rebuilding it only if the pose changed."""
+        if (self._view_matrix is None or self._matrix_mode != self.mode
+                or not np.allclose(self.eye_position, self._matrix_eye, atol=1e-3)
+                or not np.allclose(self.target_position, self._matrix_target, atol=1e-3)):
+            self._view_matrix = self._build_view_matrix()
+            self._matrix_eye = self.eye_position.copy()
+            self._matrix_target = self.target_position.copy()
+            self._matrix_mode = self.mode
+        return self._view_matrix
+
+    def _build_view_matrix(self):
+        """Equivalent of gluLookAt on scaled coordinates followed by glScale."""
+        eye = self.eye_position * self.world_scale
+        target = self.target_position * self.world_scale
+        up = np.array((0.0, 1.0, 0.0)) if self.mode == "top_down" else self.up_vector
+
+        forward = target - eye
+        norm = np.linalg.norm(forward)
+        forward = forward / norm if norm > 0 else np.array((0.0, 1.0, 0.0))
+        side = np.cross(forward, up)
+        if np.linalg.norm(side) < 1e-6:  # Looking along the up vector
+            side = np.cross(forward, (0.0, 1.0, 0.0))
+        side /= np.linalg.norm(side)
+        true_up = np.cross(side, forward)
+
+        view = np.identity(4)
+        view[0, :3] = side
+        view[1, :3] = true_up
+        view[2, :3] = -forward
+        view[:3, 3] = -view[:3, :3] @ eye
+        view[:3, :3] *= self.world_scale  # Fold the world-to-view scale into the matrix
+        return np.ascontiguousarray(view.T, dtype=np.float32)  # OpenGL expects column-major
 
     def apply(self):
         """Apply the camera's view transformation."""
-        gluLookAt(
-            *self.eye_position,
-            *self.target_position,
-            *self.up_vector
-        )
\ No newline at end of file
+        glLoadMatrixf(self.get_view_matrix())
@@ -1,17 +1,129 @@
 import math
+import numpy as np
 from obstruction_visuals import CylindricalObstruction, RectangularObstruction, PyramidalObstruction, SphereObstruction
-from config import DRONE_LENGTH, DRONE_WIDTH, DRONE_HEIGHT
+from primitives import PrimitiveTable, CYLINDER, PYRAMID, SPHERE
+from config import DRONE_LENGTH, DRONE_WIDTH, DRONE_HEIGHT, COLLISION_CELL_SIZE, TERRAIN_COLLISION_TOLERANCE
+
+_CELL_BIAS = 1 << 31  # Keeps packed cell keys non-negative
+
+
+def _cell_keys(ix, iy):
+    """Pack integer cell coordinates into sortable int64 keys."""
+    return ((ix.astype(np.int64) + _CELL_BIAS) << 32) | (iy.astype(np.int64) + _CELL_BIAS)
+
+
+"""Uniform XY grid over item bounds stored as sorted cell keys plus CSR item lists (cacheable arrays)"""
+class SpatialIndex:
+    def __init__(self, cell_size, keys, starts, items):
+        self.cell_size = float(cell_size)
+        self.keys = np.asarray(keys, dtype=np.int64)
+        self.starts = np.asarray(starts, dtype=np.int64)
+        self.items = np.asarray(items, dtype=np.int32)
+
+    @classmethod
+    def from_bounds(cls, mins, maxs, cell_size=COLLISION_CELL_SIZE):
+        """Build the index from per-item (N, 3) bounds."""
+        mins = np.asarray(mins, dtype=float).reshape(-1, 3)
+        maxs = np.asarray(maxs, dtype=float).reshape(-1, 3)
+        lo = np.floor(mins[:, :2] / cell_size).astype(np.int64)
+        hi = np.floor(maxs[:, :2] / cell_size).astype(np.int64)
+        span = hi - lo + 1
+        counts = span[:, 0] * span[:, 1]
+
+        # Expand every item into the cells its footprint covers
+        items = np.repeat(np.arange(len(mins), dtype=np.int32), counts)
+        local = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        span_y = np.repeat(span[:, 1], counts)
+        ix = np.repeat(lo[:, 0], counts) + local // span_y
+        iy = np.repeat(lo[:, 1], counts) + local % span_y
+        keys = _cell_keys(ix, iy)
+
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+        items = items[order]
+        unique_keys, starts = np.unique(keys, return_index=True)
+        starts = np.append(starts, len(keys))
+        return cls(cell_size, unique_keys, starts, items)
+
+    def query(self, box_min, box_max):
+        """Return the sorted unique items whose cells overlap the XY extent of the box."""
+        if len(self.keys) == 0:
+            return self.items[:0]
+        lo = np.floor(np.asarray(box_min[:2], dtype=float) / self.cell_size).astype(np.int64)
+        hi = np.floor(np.asarray(box_max[:2], dtype=float) / self.cell_size).astype(np.int64)
+        ix, iy = np.meshgrid(np.arange(lo[0], hi[0] + 1), np.arange(lo[1], hi[1] + 1), indexing="ij")
+        query_keys = _cell_keys(ix.ravel(), iy.ravel())
+        slots = np.minimum(np.searchsorted(self.keys, query_keys), len(self.keys) - 1)
+        slots = slots[self.keys[slots] == query_keys]
+        if len(slots) == 0:
+            return self.items[:0]
+        chunks = [self.items[self.starts[s]:self.starts[s + 1]] for s in slots]
+        return np.unique(np.concatenate(chunks))
+
+    def query_pairs(self, box_mins, box_maxs):
+        """
+        Vectorized query for many boxes at once.
+
+        Returns:
+            (boxes, items) index arrays, one pair per item whose cells overlap a box's XY extent; a pair repeats
+            when the item shares several cells with the box
+        """
+        box_mins = np.asarray(box_mins, dtype=float).reshape(-1, 3)
+        box_maxs = np.asarray(box_maxs, dtype=float).reshape(-1, 3)
+        if len(self.keys) == 0 or len(box_mins) == 0:
+            return np.zeros(0, dtype=np.int64), self.items[:0]
+        lo = np.floor(box_mins[:, :2] / self.cell_size).astype(np.int64)
+        hi = np.floor(box_maxs[:, :2] / self.cell_size).astype(np.int64)
+        span = hi - lo + 1
+        counts = span[:, 0] * span[:, 1]
+        boxes = np.repeat(np.arange(len(box_mins)), counts)
+        local = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        span_y = np.repeat(span[:, 1], counts)
+        query_keys = _cell_keys(np.repeat(lo[:, 0], counts) + local // span_y,
+                                np.repeat(lo[:, 1], counts) + local % span_y)
+        slots = np.minimum(np.searchsorted(self.keys, query_keys), len(self.keys) - 1)
+        found = self.keys[slots] == query_keys
+        boxes = boxes[found]
+        slots = slots[found]
+
+        # Expand each matched cell into its item list
+        sizes = self.starts[slots + 1] - self.starts[slots]
+        offsets = np.arange(sizes.sum()) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+        return np.repeat(boxes, sizes), self.items[np.repeat(self.starts[slots], sizes) + offsets]
+
+    def to_arrays(self, prefix=""):
+        return {prefix + "cell_size": np.array(self.cell_size), prefix + "keys": self.keys,
+                prefix + "starts": self.starts, prefix + "items": self.items}
+
+    @classmethod
+    def from_arrays(cls, arrays, prefix=""):
+        return cls(float(arrays[prefix + "cell_size"]), arrays[prefix + "keys"],
+                   arrays[prefix + "starts"], arrays[prefix + "items"])
+
 
 """For multiple collisions in a single command path - you will only be made aware of one"""
 class CollisionDetector:
-    def __init__(self, obstructions):
-        self.simple_obstructions = []
-        self.composite_obstructions = []
-        for o in obstructions:
-            if hasattr(o, 'components') and o.components:
-                self.composite_obstructions.append(o)
-            else:
-                self.simple_obstructions.append(o)
+    def __init__(self, obstructions, table=None, index=None, meshes=None, terrain=None):
+        """
+        Initialize the detector.
+
+        Args:
+            obstructions: Sequence of obstruction objects, indexed by table owner
+            table: Optional prebuilt PrimitiveTable for the obstructions (e.g. from a scene cache)
+            index: Optional prebuilt SpatialIndex over the table's primitive rows
+            meshes: Mesh obstructions to check; taken from `obstructions` when no table is given
+            terrain: Optional Terrain; paths dipping below the ground report a TerrainContact
+        """
+        self.obstructions = obstructions
+        self.terrain = terrain
+        if meshes is None:
+            meshes = [o for o in obstructions if hasattr(o, 'check_sweep')] if table is None else []
+        self.meshes = list(meshes)
+        self.table = table if table is not None else PrimitiveTable.from_obstructions(obstructions)
+        self.index = index if index is not None else SpatialIndex.from_bounds(*self.table.primitive_bounds())
+        # Simple obstructions are reported ahead of composites hit at the same path step
+        owner_is_composite = self.table.obstruction_is_composite[self.table.owner]
+        self.priority = self.table.owner + owner_is_composite * self.table.obstruction_count
         # Precompute drone dimension values
         self.drone_half_width = DRONE_WIDTH / 2
         self.drone_half_length = DRONE_LENGTH / 2
@@ -19,37 +131,232 @@ class CollisionDetector:
         self.min_dimension = min(DRONE_WIDTH, DRONE_LENGTH, DRONE_HEIGHT)
         self.max_horizontal = max(self.drone_half_width, self.drone_half_length)
         self.max_dimension = max(self.drone_half_width, self.drone_half_length, self.drone_half_height)
+        # Yaw-independent drone box for mesh sweeps, matching the horizontal reach used for cylinders
+        self.drone_half_extents = np.array((self.max_horizontal, self.max_horizontal, self.drone_half_height))
 
     def check_path_collision(self, current_state, target_state):
         """
         Check if a path from current_state to target_state would collide with any obstruction.
         Returns the colliding obstruction or None if no collision.
         """
-        # Calculate 3D path length
-        dx = target_state["x"] - current_state["x"]
-        dy = target_state["y"] - current_state["y"]
-        dz = target_state["z"] - current_state["z"]
-        path_length = (dx ** 2 + dy ** 2 + dz ** 2) ** 0.5
+        start = np.array((current_state["x"], current_state["y"], current_state["z"]), dtype=float)
+        end = np.array((target_state["x"], target_state["y"], target_state["z"]), dtype=float)
+        return self.check_polyline_collision(np.stack((start, end)))
 
-        # Use smallest drone dimension for step size
-        steps = max(1, math.ceil(path_length / self.min_dimension))
-
-        for i in range(steps + 1):
-            t = i / steps
-            x = current_state["x"] + t * dx
-            y = current_state["y"] + t * dy
-            z = current_state["z"] + t * dz
-
-            # Check each obstruction
-            for obstruction in self.simple_obstructions:
-                if self.check_point_collision(x, y, z, obstruction):
-                    return obstruction
-            for obstruction in self.composite_obstructions:
-                for component in obstruction.components:
-                    if self.check_point_collision(x, y, z, component):
-                        return obstruction
+    def check_polyline_collision(self, vertices):
+        """
+        check_path_collision along a polyline, e.g. the chords of a curved path (CurvePath.chords).
+
+        Args:
+            vertices: (N, 3) positions the drone passes through in order
+        Returns:
+            The colliding obstruction (the earliest primitive hit along the path first) or None
+        """
+        vertices = np.asarray(vertices, dtype=float).reshape(-1, 3)
+        hit = self._check_primitives(vertices)
+        if hit is not None:
+            return hit
+        if self.terrain is not None:
+            for start, end in zip(vertices[:-1], vertices[1:]):
+                hit = self.terrain.check_path(start, end)
+                if hit is not None:
+                    return hit
+        for mesh in self.meshes:
+            for start, end in zip(vertices[:-1], vertices[1:]):
+                if mesh.check_sweep(start, end, self.drone_half_extents):
+                    return mesh
         return None
 
+    def _check_primitives(self, vertices):
+        # Broadphase: only primitives whose cells overlap the swept drone bounds
+        candidates = self.index.query(vertices.min(axis=0) - self.max_dimension,
+                                      vertices.max(axis=0) + self.max_dimension)
+        if len(candidates) == 0:
+            return None
+
+        # Use smallest drone dimension for step size
+        delta = vertices[1:] - vertices[:-1]
+        if len(delta) == 1:  # Straight path
+            steps = max(1, math.ceil(math.sqrt(delta[0] @ delta[0]) / self.min_dimension))
+            points = vertices[0] + np.linspace(0.0, 1.0, steps + 1)[:, None] * delta[0]
+        else:  # Every segment of a polyline in one array
+            steps = np.maximum(1, np.ceil(np.sqrt((delta ** 2).sum(axis=1)) / self.min_dimension)).astype(np.int64)
+            segment = np.repeat(np.arange(len(delta)), steps)
+            local = np.arange(steps.sum()) - np.repeat(np.cumsum(steps) - steps, steps)
+            points = np.vstack((vertices[segment] + (local / steps[segment])[:, None] * delta[segment],
+                                vertices[-1:]))
+
+        hits = self.check_points_collision(points, candidates)
+        hit_steps = np.flatnonzero(hits.any(axis=1))
+        if len(hit_steps) == 0:
+            return None
+        hit_rows = candidates[hits[hit_steps[0]]]
+        row = hit_rows[np.argmin(self.priority[hit_rows])]
+        return self.obstructions[self.table.owner[row]]
+
+    def check_paths_collision(self, starts, ends):
+        """
+        Batched variant of check_path_collision for independent paths.
+
+        Args:
+            starts: (K, 3) path start positions
+            ends: (K, 3) path end positions
+        Returns:
+            (K,) boolean array, True where a path hits an obstruction or dips below the terrain
+        """
+        starts = np.asarray(starts, dtype=float).reshape(-1, 3)
+        ends = np.asarray(ends, dtype=float).reshape(-1, 3)
+        delta = ends - starts
+        steps = np.maximum(1, np.ceil(np.sqrt((delta ** 2).sum(axis=1)) / self.min_dimension)).astype(np.int64)
+
+        # Sample every path at the same spacing as check_path_collision, all paths in one array
+        counts = steps + 1
+        path = np.repeat(np.arange(len(starts)), counts)
+        local = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        points = starts[path] + (local / steps[path])[:, None] * delta[path]
+
+        hit = np.zeros(len(starts), dtype=bool)
+        point_ids, rows = self.index.query_pairs(points - self.max_dimension, points + self.max_dimension)
+        if len(rows):
+            pair_hits = self.check_pairs_collision(points[point_ids], rows)
+            hit[path[point_ids[pair_hits]]] = True
+        if self.terrain is not None:
+            below = points[:, 2] < self.terrain.heights_at(points[:, 0], points[:, 1]) - TERRAIN_COLLISION_TOLERANCE
+            hit[path[below]] = True
+        for mesh in self.meshes:
+            for k in np.flatnonzero(~hit):
+                hit[k] = mesh.check_sweep(starts[k], ends[k], self.drone_half_extents)
+        return hit
+
+    def check_points_collision(self, points, rows):
+        """
+        Vectorized point test against primitive rows.
+
+        Args:
+            points: (S, 3) array of drone center positions
+            rows: (C,) array of primitive table rows to test
+        Returns:
+            (S, C) boolean array, True where the drone at a point overlaps a primitive
+        """
+        hits = np.zeros((len(points), len(rows)), dtype=bool)
+        kinds = self.table.kind[rows]
+        for kind in np.unique(kinds):
+            columns = np.flatnonzero(kinds == kind)
+            hits[:, columns] = self._overlaps(kind, points[:, 0:1], points[:, 1:2], points[:, 2:3], rows[columns])
+        return hits
+
+    def check_pairs_collision(self, points, rows):
+        """Elementwise variant of check_points_collision: (P,) booleans for points[i] against rows[i]."""
+        hits = np.zeros(len(rows), dtype=bool)
+        kinds = self.table.kind[rows]
+        for kind in np.unique(kinds):
+            mask = kinds == kind
+            hits[mask] = self._overlaps(kind, points[mask, 0], points[mask, 1], points[mask, 2], rows[mask])
+        return hits
+
+    def _overlaps(self, kind, x, y, z, sel):
+        """Drone at (x, y, z) against primitive rows `sel` of one kind, broadcasting like NumPy arithmetic."""
+        table = self.table
+        z_min = z - self.drone_half_height
+        z_max = z + self.drone_half_height
+        pos_x, pos_y, pos_z = table.position[sel].T
+        size = table.size[sel]
+        rel_x = x - pos_x
+        rel_y = y - pos_y
+
+        if kind == SPHERE:
+            radius = size[:, 0]
+            rel_z = z - pos_z
+            in_z = (z_max >= pos_z - radius) & (z_min <= pos_z + radius)
+            inside = rel_x ** 2 + rel_y ** 2 + rel_z ** 2 <= (radius + self.max_dimension) ** 2
+            return in_z & inside
+
+        height = size[:, 2]
+        in_z = (z_max >= pos_z) & (z_min <= pos_z + height)
+        if kind == CYLINDER:
+            inside = np.sqrt(rel_x ** 2 + rel_y ** 2) <= size[:, 0] + self.max_horizontal
+        else:
+            angle_rad = -np.radians(table.rotation[sel])
+            cos_rad = np.cos(angle_rad)
+            sin_rad = np.sin(angle_rad)
+            rot_x = rel_x * cos_rad - rel_y * sin_rad
+            rot_y = rel_x * sin_rad + rel_y * cos_rad
+            half_width = size[:, 0] / 2
+            half_depth = size[:, 1] / 2
+            if kind == PYRAMID:
+                shrink = 1 - np.clip((z - pos_z) / height, 0, 1)
+                half_width = half_width * shrink
+                half_depth = half_depth * shrink
+            inside = ((np.abs(rot_x) <= half_width + self.drone_half_width) &
+                      (np.abs(rot_y) <= half_depth + self.drone_half_length))
+        return in_z & inside
+
+    def obstacle_distances(self, position, count, max_range):
+        """
+        Clearance from the drone to its nearest obstructions, one value per obstruction.
+
+        Primitives are measured to their exact shape except pyramids (their base box); meshes to their bounds.
+        Clearance is the distance from the drone center minus its largest half extent, floored at 0.
+
+        Args:
+            position: (x, y, z) drone center
+            count: Number of distances returned
+            max_range: Obstructions farther than this are ignored
+        Returns:
+            (count,) ascending array padded with max_range
+        """
+        return self.obstacle_distances_batch(np.asarray(position, dtype=float)[None], count, max_range)[0]
+
+    def obstacle_distances_batch(self, positions, count, max_range):
+        """obstacle_distances for (K, 3) drone positions at once; returns a (K, count) array."""
+        points = np.asarray(positions, dtype=float).reshape(-1, 3)
+        result = np.full((len(points), count), float(max_range))
+        point_ids, rows = self.index.query_pairs(points - max_range, points + max_range)
+        distances = [self._primitive_distances(points[point_ids], rows)]
+        owners = [self.table.owner[rows]]
+        for owner, mesh in enumerate(self.meshes, start=self.table.obstruction_count):
+            mesh_min, mesh_max = mesh.bounds()
+            gap = np.maximum(np.maximum(mesh_min - points, points - mesh_max), 0)
+            point_ids = np.concatenate((point_ids, np.arange(len(points))))
+            distances.append(np.sqrt((gap ** 2).sum(axis=1)))
+            owners.append(np.full(len(points), owner))
+        distances = np.maximum(np.concatenate(distances) - self.max_dimension, 0)
+        owners = np.concatenate(owners)
+        keep = distances <= max_range
+        point_ids, owners, distances = point_ids[keep], owners[keep], distances[keep]
+        if len(distances) == 0:
+            return result
+
+        # Closest part of each obstruction per point, then the nearest `count` obstructions per point
+        order = np.lexsort((distances, owners, point_ids))
+        point_ids, owners, distances = point_ids[order], owners[order], distances[order]
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = (point_ids[1:] != point_ids[:-1]) | (owners[1:] != owners[:-1])
+        point_ids, distances = point_ids[first], distances[first]
+        order = np.lexsort((distances, point_ids))
+        point_ids, distances = point_ids[order], distances[order]
+        rank = np.arange(len(point_ids)) - np.searchsorted(point_ids, point_ids)
+        keep = rank < count
+        result[point_ids[keep], rank[keep]] = distances[keep]
+        return result
+
+    def _primitive_distances(self, points, rows):
+        """Elementwise distance from points[i] to the surface of primitive rows[i] (0 inside)."""
+        table = self.table
+        kinds = table.kind[rows]
+        size = table.size[rows]
+        rel = points - table.position[rows]
+        gap_z = np.maximum(np.maximum(-rel[:, 2], rel[:, 2] - size[:, 2]), 0)
+        angle_rad = -np.radians(table.rotation[rows])
+        rot_x = rel[:, 0] * np.cos(angle_rad) - rel[:, 1] * np.sin(angle_rad)
+        rot_y = rel[:, 0] * np.sin(angle_rad) + rel[:, 1] * np.cos(angle_rad)
+        gap_x = np.maximum(np.abs(rot_x) - size[:, 0] / 2, 0)
+        gap_y = np.maximum(np.abs(rot_y) - size[:, 1] / 2, 0)
+        box = np.sqrt(gap_x ** 2 + gap_y ** 2 + gap_z ** 2)
+        cylinder = np.hypot(np.maximum(np.hypot(rel[:, 0], rel[:, 1]) - size[:, 0], 0), gap_z)
+        sphere = np.maximum(np.sqrt((rel ** 2).sum(axis=1)) - size[:, 0], 0)
+        return np.where(kinds == CYLINDER, cylinder, np.where(kinds == SPHERE, sphere, box))
+
     def check_point_collision(self, x, y, z, obstruction):
         """
         Check if a point (x, y, z) collides with a specific obstruction.
@@ -107,4 +414,4 @@ class CollisionDetector:
                 return (abs(rot_x) <= allowed_width and abs(rot_y) <= allowed_depth)
 
             return False
-        return False  # Default case if obstruction type is not recognized
\ No newline at end of file
+        return False  # Default case if obstruction type is not recognized
@@ -1,9 +1,19 @@
 """Operator-modifiable configurations"""
 IS_SIM = True  # Toggle if we are running simulation
+SIM_MODE = "windowed"  # "windowed" renders in real time, "headless" runs with collision checks and no window, "analysis" only checks command timing
 HAS_WEATHER_DETAILS = True  # Toggle for if we want printed METAR details
 IS_REAL_WEATHER = True  # Toggle if we want to simulate real weather from relevant station
 CRIT_BATTERY_LVL = 20  # Minimal battery level considered hazardous (percent)
 ICAO = 'KJFK'  # Select ICAO Weather Station code
+RESPONSE_DRIVEN_MISSION = True  # Real mode: send commands on acknowledgement + predicted motion time instead of COMMANDS delays
+MISSION_COMMAND_MARGIN = 0.5  # Seconds added to each predicted motion time in response-driven missions
+MISSION_BATTERY_POLL_INTERVAL = 1.0  # Seconds between battery checks during a real mission
+WEATHER_OFFLINE = False  # Never fetch METARs; use the cache, fixture or static profile
+WEATHER_CACHE_FILE = ".cache/weather.json"  # METAR cache shared by every run; None disables caching
+WEATHER_CACHE_TTL = 1800  # Seconds before a cached METAR is refreshed in the background
+WEATHER_FIXTURE_FILE = None  # JSON observation used when nothing is cached (offline machines)
+WEATHER_STATIC_PROFILE = {"wind_speed": 0, "wind_direction": 0, "wind_gust": None, "temperature": 20,
+                          "precipitation": False}  # Last-resort weather
 
 """Operator-modifiable commands"""
 COMMANDS = [
@@ -79,5 +89,197 @@ CAMERA_TARGET_Z = 0    # New
 CAMERA_UP_X = 0        # New
 CAMERA_UP_Y = 0        # New
 CAMERA_UP_Z = 1        # New
+CAMERA_MODE = "follow"  # fixed, follow, orbit or top_down (cycle with C, select with 1-4)
+CAMERA_FOLLOW_DISTANCE = 400   # cm behind the drone in follow mode
+CAMERA_FOLLOW_HEIGHT = 150     # cm above the drone in follow mode
+CAMERA_ORBIT_DISTANCE = 600    # cm from the drone in orbit mode
+CAMERA_ORBIT_PITCH = 30        # Degrees above the horizon in orbit mode
+CAMERA_TOP_DOWN_HEIGHT = 1500  # cm above the drone in top-down mode
+CAMERA_MIN_DISTANCE = 100      # cm, closest orbit zoom
+CAMERA_MAX_DISTANCE = 3000     # cm, farthest orbit zoom
+CAMERA_SMOOTHING_TIME = 0.25   # Seconds for the camera to close ~63% of the gap to its target pose
+CAMERA_MOUSE_SENSITIVITY = 0.3 # Degrees of orbit per pixel of mouse drag
+CAMERA_KEY_ROTATE_STEP = 5     # Degrees of orbit per arrow key press
+CAMERA_ZOOM_STEP = 1.1         # Zoom factor per wheel notch or +/- key press
+
+"""Scene and collision constants"""
+SCENE_FILE = None  # Declarative scene (JSON/TOML), e.g. "scenes/default.json"; None to use create_obstructions()
+SCENE_CACHE_DIR = ".cache/scenes"  # Compiled scene cache keyed by content hash; None disables caching
+SCENE_SEED = 1234  # Seed for the random trees in create_obstructions()
+SCENE_BATCH_TILE_SIZE = 1000  # cm, obstructions in one tile share a display list
+COLLISION_CELL_SIZE = 200  # cm, spatial index cell size for collision broadphase
+MESH_CACHE_DIR = ".cache/meshes"  # Triangle BVH cache for OBJ/STL obstructions keyed by file content
+MESH_BVH_LEAF_SIZE = 8  # Triangles per BVH leaf
+
+"""World streaming constants (large outdoor missions)"""
+WORLD_STREAMING = False  # Stream procedural/authored tiles around the drone instead of using SCENE_FILE
+WORLD_TILE_SIZE = 2000  # cm, edge length of a world tile
+WORLD_LOAD_RADIUS = 1  # Tiles around the drone's tile that are active (1 -> 3x3 tiles)
+WORLD_CACHE_TILES = 36  # Built tiles kept in memory (LRU); must be >= (2 * WORLD_LOAD_RADIUS + 1) ** 2
+WORLD_SEED = 1234  # Seed for procedural tiles
+WORLD_TILE_DIR = "scenes/tiles"  # Authored tiles named "<tx>_<ty>.json" override generated ones
+WORLD_MAX_TREES_PER_TILE = 40  # Upper bound of generated trees per tile
+WORLD_HOUSE_PROBABILITY = 0.3  # Chance a generated tile contains a house
+WORLD_OBJECT_MARGIN = 400  # cm, largest obstruction reach beyond its tile (for collision tile lookup)
+WORLD_SPAWN_CLEARANCE = 300  # cm, generated obstructions keep clear of the drone start position
+WORLD_MAX_UPLOADS_PER_FRAME = 1  # Display lists compiled per frame while tiles stream in
+
+"""Terrain constants"""
+TERRAIN_FILE = None  # Heightmap (.npy array or grayscale image); None keeps the flat z=0 ground plane
+TERRAIN_CELL_SIZE = 50  # cm between neighbouring heightmap samples
+TERRAIN_HEIGHT_SCALE = 2.0  # cm per heightmap unit (0-255 image -> 0-510 cm)
+TERRAIN_ORIGIN = None  # (x, y) of the first heightmap sample in cm; None centers the map on the origin
+TERRAIN_COLLISION_TOLERANCE = 1  # cm the drone may sit below the interpolated ground before a path collides
+TERRAIN_CHUNK_CELLS = 64  # Heightmap cells per render chunk edge
+TERRAIN_LOD_LEVELS = 5  # LOD k draws every 2**k-th sample
+TERRAIN_LOD_DISTANCE = 1500  # cm, chunks beyond this use LOD 1, beyond twice this LOD 2, ...
+TERRAIN_SKIRT_DEPTH = 100  # cm, skirts below chunk edges hide cracks between LODs
+TERRAIN_MAX_UPLOADS_PER_FRAME = 4  # Chunk display lists compiled per frame
+TERRAIN_MAX_CHUNK_LISTS = 2048  # Compiled chunk display lists kept (LRU)
+TERRAIN_LOW_COLOR = (0.35, 0.5, 0.25)  # Color at the lowest point of the map
+TERRAIN_HIGH_COLOR = (0.55, 0.47, 0.38)  # Color at the highest point of the map
+
+"""Tello connection constants (real mode)"""
+TELLO_IP = "192.168.10.1"  # Drone address on its own Wi-Fi network
+TELLO_COMMAND_PORT = 8889  # UDP port the drone receives SDK commands on
+TELLO_STATE_PORT = 8890  # Local UDP port the drone broadcasts state to
+TELLO_RESPONSE_TIMEOUT = 7  # Seconds to wait for a command response
+TELLO_LATE_RESPONSE_WINDOW = 10  # Seconds a timed-out command's late reply is still expected and discarded
+TELLO_STATE_BUFFER_SIZE = 256  # State samples kept in the ring buffer (~25 s at 10 Hz)
+TELLO_VIDEO_PORT = 11111  # Local UDP port the drone streams video to
+TELLO_CONNECT_RETRIES = 5  # Connection attempts before giving up
+TELLO_CONNECT_TIMEOUT = 1.0  # Seconds for the first connection attempt, doubling per retry up to TELLO_RESPONSE_TIMEOUT
+TELLO_QUERY_RETRIES = 2  # Retries for read-only "?" commands (movement commands are never retried)
+TELLO_ADAPTIVE_MIN_SAMPLES = 5  # Responses observed before timeouts adapt to measured round trips
+TELLO_TIMEOUT_FACTOR = 3.0  # Adaptive timeout = expected motion time + factor * p99 response overhead
+TELLO_MIN_TIMEOUT = 1.0  # Seconds, floor for the adaptive response overhead allowance
+TELLO_MIN_BACKOFF = 0.1  # Seconds, first retry delay (grows from the observed p90 round trip when known)
+TELLO_MAX_BACKOFF = 2.0  # Seconds, retry delay cap
+TELLO_STATS_DIR = "logs"  # Link statistics JSON is written here when the connection closes; None disables
+
+"""Tello emulator constants (python tello_emulator.py; point TELLO_IP at TELLO_EMULATOR_HOST)"""
+TELLO_EMULATOR_HOST = "127.0.0.1"  # Address the virtual drones bind to
+TELLO_EMULATOR_DRONES = 1  # Number of virtual drones
+TELLO_EMULATOR_PORT_STRIDE = 10  # Port offset between consecutive virtual drones
+TELLO_EMULATOR_STATE_INTERVAL = 0.1  # Seconds between state broadcasts (the real drone sends ~10 Hz)
+TELLO_EMULATOR_VIDEO = False  # Send synthetic JPEG frames to the video port after "streamon"
+TELLO_EMULATOR_VIDEO_FPS = 15  # Synthetic frames per second per streaming drone
+TELLO_EMULATOR_VIDEO_SIZE = (320, 240)  # Synthetic frame (width, height)
+
+"""Video pipeline constants"""
+VIDEO_SOURCE = "tello"  # "tello" (djitellopy decoder), "udp_jpeg" (tello_emulator video) or "synthetic"
+VIDEO_RING_SLOTS = 4  # Frame buffers per ring: newest + one per consumer + one being written
+VIDEO_WAIT_TIMEOUT = 0.03  # Seconds a consumer waits for a new frame before yielding control (GUI event pumping)
+VIDEO_POLL_INTERVAL = 0.002  # Seconds between checks of djitellopy's frame reader (it has no notification)
+VIDEO_LATENCY_WINDOW = 512  # Recent frames used for latency percentiles
+VIDEO_STATS_INTERVAL = 10  # Seconds between pipeline statistics printouts
+VIDEO_SYNTHETIC_FPS = 30  # Synthetic source frame rate
+VIDEO_SYNTHETIC_SIZE = (960, 720)  # Synthetic source (width, height), matches the Tello camera
+VIDEO_RECORD = False  # Record the displayed feed to VIDEO_RECORD_DIR
+VIDEO_RECORD_DIR = "recordings"  # Output directory for recordings and their timestamp CSVs
+VIDEO_RECORD_FPS = 30  # Frame rate written to the recording
+VIDEO_RECORD_CODEC = "mp4v"  # OpenCV software FourCC ("mp4v", "MJPG", "XVID")
+VIDEO_RECORD_QUEUE = 32  # Frames buffered for the encoder (preallocated)
+VIDEO_RECORD_POLICY = "downscale"  # Under backpressure: "downscale" then drop, or "drop" only
+VIDEO_RECORD_DOWNSCALE_WATERMARK = 0.5  # Queue fill fraction above which frames are stored at half resolution
+VIDEO_RECORD_POLL_INTERVAL = 0.005  # Seconds the launcher's recorder process waits for a new shared frame
+
+"""Launcher shared-memory constants"""
+IPC_FRAME_SHAPE = (720, 960, 3)  # Frames shared between processes (height, width, channels), the Tello camera size
+IPC_FRAME_SLOTS = 4  # Frame slots in the shared ring
+IPC_SHUTDOWN_TIMEOUT = 5  # Seconds the video process gets to stop after main finishes
+
+"""Wind constants (wind.py); the field is built from the METAR wind when weather data is used"""
+WIND_ENABLED = False  # Let METAR wind drift the simulated drone
+WIND_DRIFT_FACTOR = 0.2  # Fraction of the horizontal wind the drone's position hold fails to cancel
+WIND_CELL_SIZE = 200  # cm, horizontal spacing of the precomputed wind grid
+WIND_VERTICAL_CELL_SIZE = 100  # cm, vertical spacing of the wind grid
+WIND_MAX_ALTITUDE = 3000  # cm, top of the wind grid
+WIND_EXTENT = 3000  # cm, grid half-size around the drone start (grown to cover the obstructions)
+WIND_MARGIN = 1000  # cm, grid padding around the obstructions
+WIND_MAX_CELLS = 2000000  # The horizontal spacing doubles until the grid fits
+WIND_REFERENCE_HEIGHT = 1000  # cm, METAR wind is measured 10 m above ground
+WIND_MIN_HEIGHT = 50  # cm, the height profile is held constant below this
+WIND_SHEAR_EXPONENT = 0.14  # Power-law exponent of wind speed with height (open terrain)
+WIND_TURBULENCE_INTENSITY = 0.15  # Gust standard deviation as a fraction of the mean wind without a reported gust
+WIND_GUST_PEAK_FACTOR = 3.0  # Reported gust = mean + this many standard deviations
+WIND_GUST_GRID = (32, 32, 8)  # Cells of the periodic turbulence tile
+WIND_GUST_CELL_SIZE = 200  # cm, turbulence tile spacing
+WIND_GUST_LENGTH_SCALE = 1500  # cm, size of the largest gust eddies
+WIND_SHELTER_LENGTH = 5  # Wake length behind an obstruction in multiples of its height
+WIND_SHELTER_STRENGTH = 0.8  # Wind reduction right behind an obstruction, fading to 0 at the end of the wake
+WIND_SEED = 7  # Turbulence seed; the same seed gives the same gusts
+
+"""Flight dynamics constants (dynamics.py)"""
+DYNAMICS_ENABLED = False  # Simulator: fly with the point-mass dynamics instead of the kinematic trapezoid profile
+DYNAMICS_INTEGRATOR = "semi_implicit"  # "semi_implicit" (Euler) or "rk4"
+DYNAMICS_SUBSTEP_RATE = 200  # Integration substeps per simulated second, independent of FRAME_RATE
+DYNAMICS_DRAG = 0.5  # 1/s, linear drag on the air-relative velocity
+DYNAMICS_POSITION_GAIN = 1.2  # 1/s, velocity setpoint per cm of position error
+DYNAMICS_VELOCITY_GAIN = 3.0  # 1/s, commanded acceleration per cm/s of velocity error
+DYNAMICS_MAX_ACCEL = 250  # cm/s², thrust limit (matches LINEAR_ACCEL)
+DYNAMICS_YAW_GAIN = 2.0  # 1/s, yaw rate setpoint per degree of heading error
+DYNAMICS_YAW_RATE_GAIN = 8.0  # 1/s, yaw acceleration per degree/s of yaw rate error
+DYNAMICS_MAX_YAW_RATE = 100  # degrees/s
+
+"""Simulation environment constants (sim_env.DroneEnv)"""
+ENV_STEP_TIME = 0.1  # Seconds a velocity action is held (the Tello takes rc commands at ~10 Hz)
+ENV_MAX_SPEED = 100  # cm/s limit for velocity actions
+ENV_MAX_YAW_RATE = 100  # degrees/s limit for velocity actions
+ENV_OBSTACLE_COUNT = 8  # Nearest obstructions reported in each observation
+ENV_OBSTACLE_RANGE = 1000  # cm beyond which obstructions are not observed
+ENV_MAX_EPISODE_TIME = 600  # Simulated seconds per episode, None for no limit
+ENV_START_JITTER = 0  # cm, random start offset in x and y on each reset
+ENV_START_FLYING = True  # Episodes start hovering at takeoff height instead of landed
+ENV_END_ON_COLLISION = True  # End the episode when a step's path hits an obstruction
+ENV_RANGE_SENSORS = False  # Add each RANGE_SENSORS reading (sensors.py) to the observations, keyed by sensor name
+
+"""Import benchmark constants"""
+IMPORT_BENCHMARK_RUNS = 5  # Fresh interpreters started per mode; the median is reported
+IMPORT_BENCHMARK_LOG = "logs/import_times.jsonl"  # Results appended per benchmark run, None to not keep history
+
+"""Range sensor constants (sensors.py)"""
+SENSORS_ENABLED = True  # Simulator: read the range sensors every frame (headless and windowed modes)
+SENSOR_SEED = 11  # Noise seed; the same seed gives the same readings
+# Sensor name -> ray fan (pitch, yaw_span, pitch_span in degrees; yaw_rays, pitch_rays) and reading model
+# (max_range and noise_std in cm, noise_fraction per cm of distance, dropout probability per ray)
+RANGE_SENSORS = {
+    "tof": {"pitch": -90, "max_range": 800, "noise_std": 1.0, "noise_fraction": 0.01, "dropout": 0.0},
+    "forward": {"pitch": 0, "yaw_span": 60, "pitch_span": 20, "yaw_rays": 61, "pitch_rays": 5,
+                "max_range": 1200, "noise_std": 2.0, "noise_fraction": 0.02, "dropout": 0.01},
+}
+
+"""Mission report constants (mission_report.py)"""
+MISSION_REPORT_FILE = "logs/mission_reports.jsonl"  # Report rows appended per simulator run, None to not write
+MISSION_REPORT_ECHO = "live"  # Console lines: "live" as they happen, "buffered" in blocks, or "off"
+MISSION_REPORT_BUFFER_LINES = 200  # Buffered console lines written per block
+MISSION_REPORT_CLEARANCE_RANGE = 1000  # cm, min clearance is capped at this distance
+
+"""Mission cache constants (mission_cache.py)"""
+MISSION_CACHE_DIR = ".cache/missions"  # Compiled missions keyed by commands, scene and physics config; None disables
+MISSION_CACHE_MAX_BYTES = 64 * 1024 * 1024  # Least recently used entries are evicted beyond this size
+MISSION_TRAJECTORY_RATE = 10  # Predicted trajectory samples per second of motion
+
+"""Hot reload constants (hot_reload.py)"""
+HOT_RELOAD = False  # Windowed simulator: apply edits to config.py and the scene without reopening the window
+HOT_RELOAD_INTERVAL = 0.2  # Seconds between checks of the watched files
+
+"""Telemetry constants (telemetry.py; view with python telemetry_viewer.py)"""
+TELEMETRY_ENABLED = False  # Simulator: stream the scene and drone state to local viewers and recorders
+TELEMETRY_HOST = "127.0.0.1"  # Address the stream is served on
+TELEMETRY_PORT = 8895  # TCP port of the stream
+TELEMETRY_POSITION_STEP = 0.1  # cm, positions are sent as multiples of this step
+TELEMETRY_YAW_STEP = 0.1  # degrees, yaw is sent as multiples of this step
+TELEMETRY_KEYFRAME_INTERVAL = 100  # Frames between full states; the frames in between only carry changes
+TELEMETRY_VIEWER_SIZE = (900, 700)  # Viewer window (width, height)
+TELEMETRY_VIEWER_TRAIL = 2000  # Drone positions drawn as the viewer's trail
+
+"""Curve constants (curves.py; "curve x1 y1 z1 x2 y2 z2 speed" and MotionPlanner.smooth_path_commands)"""
+CURVE_MIN_RADIUS = 50  # cm, "curve" answers error when its arc radius is below 0.5 m (Tello SDK)
+CURVE_MAX_RADIUS = 1000  # cm, or above 10 m
+CURVE_MAX_SPEED = 60  # cm/s, fastest speed "curve" accepts
+CURVE_CHORD_ERROR = 1.0  # cm, farthest the chords swept by the collision check may stray from an arc
+CURVE_CORNER_DISTANCE = 100  # cm, smooth paths start rounding a waypoint this far before reaching it
+CURVE_DELAY_MARGIN = 0.1  # Seconds added to each smooth path command's predicted time
 
 """Operator Insertable Obstructions Instructions in obstruction_visuals"""
\ No newline at end of file
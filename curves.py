@@ -0,0 +1,193 @@
+import bisect
+import math
+from config import CURVE_CHORD_ERROR
+
+# Pure-Python geometry: the drone model and the analysis import this without NumPy
+
+
+def _sub(a, b):
+    return (a[0] - b[0], a[1] - b[1], a[2] - b[2])
+
+
+def _dot(a, b):
+    return a[0] * b[0] + a[1] * b[1] + a[2] * b[2]
+
+
+def _cross(a, b):
+    return (a[1] * b[2] - a[2] * b[1], a[2] * b[0] - a[0] * b[2], a[0] * b[1] - a[1] * b[0])
+
+
+def _norm(a):
+    return math.sqrt(_dot(a, a))
+
+
+def _lerp(a, b, t):
+    return (a[0] + (b[0] - a[0]) * t, a[1] + (b[1] - a[1]) * t, a[2] + (b[2] - a[2]) * t)
+
+
+def circle_through(a, b, c):
+    """Return (center, radius) of the circle through three points, or None when they are (nearly) collinear."""
+    ab, ac = _sub(b, a), _sub(c, a)
+    normal = _cross(ab, ac)
+    normal_sq = _dot(normal, normal)
+    if normal_sq <= 1e-9 * _dot(ab, ab) * _dot(ac, ac):
+        return None
+    first = _cross(normal, ab)
+    second = _cross(ac, normal)
+    ab_sq, ac_sq = _dot(ab, ab), _dot(ac, ac)
+    center = tuple(a[k] + (ac_sq * first[k] + ab_sq * second[k]) / (2 * normal_sq) for k in range(3))
+    return center, _norm(_sub(a, center))
+
+
+class LineSegment:
+    def __init__(self, start, end):
+        self.start = tuple(float(v) for v in start)
+        self.end = tuple(float(v) for v in end)
+        self.length = _norm(_sub(self.end, self.start))
+
+    def point_at(self, s):
+        return _lerp(self.start, self.end, s / self.length if self.length > 0 else 1.0)
+
+    def chord_count(self, max_error):
+        return 1
+
+
+"""Circular arc from start through via to end, as flown by the Tello "curve" command.
+
+Arc length is proportional to the swept angle, so the point at a distance s along the arc is found in O(1)
+(one sine and cosine) without integrating the curve.
+"""
+class ArcSegment:
+    def __init__(self, start, via, end, circle=None):
+        """
+        Initialize the arc; raises ValueError when the points are collinear.
+
+        Args:
+            start: First point of the arc
+            via: Point the arc passes through between start and end
+            end: Last point of the arc
+            circle: (center, radius) from circle_through, when already computed
+        """
+        self.start = tuple(float(v) for v in start)
+        self.via = tuple(float(v) for v in via)
+        self.end = tuple(float(v) for v in end)
+        circle = circle or circle_through(self.start, self.via, self.end)
+        if circle is None:
+            raise ValueError("Arc points are collinear")
+        self.center, self.radius = circle
+        # In-plane basis: u toward the start, v a quarter turn ahead in the direction of travel
+        normal = _cross(_sub(self.via, self.start), _sub(self.end, self.start))
+        normal = tuple(n / _norm(normal) for n in normal)
+        self.u = tuple(d / self.radius for d in _sub(self.start, self.center))
+        self.v = _cross(normal, self.u)
+        self.sweep = self._angle(self.end)  # Radians from start to end, through via
+        self.length = self.radius * self.sweep
+
+    def _angle(self, point):
+        offset = _sub(point, self.center)
+        return math.atan2(_dot(offset, self.v), _dot(offset, self.u)) % (2 * math.pi)
+
+    def point_at(self, s):
+        angle = s / self.radius
+        along_u, along_v = math.cos(angle) * self.radius, math.sin(angle) * self.radius
+        return tuple(self.center[k] + along_u * self.u[k] + along_v * self.v[k] for k in range(3))
+
+    def chord_count(self, max_error):
+        """Chords needed so none strays more than max_error (its sagitta) from the arc."""
+        if max_error >= self.radius:
+            return max(1, math.ceil(self.sweep / math.pi))
+        step = 2 * math.acos(1 - max_error / self.radius)
+        return max(1, math.ceil(self.sweep / step))
+
+
+"""Path of line and arc segments with a precomputed arc-length table.
+
+`starts` holds the distance along the path at which each segment begins, built once when the path is planned.
+point_at(s) finds the segment by binary search (O(log n) in the segment count) and evaluates it in closed form,
+so the per-frame interpolation and the collision sweep never integrate the curve.
+"""
+class CurvePath:
+    def __init__(self, segments):
+        """
+        Initialize the path.
+
+        Args:
+            segments: LineSegment and ArcSegment objects, each starting where the previous one ends
+        """
+        self.segments = list(segments)
+        self.starts = [0.0]
+        for segment in self.segments:
+            self.starts.append(self.starts[-1] + segment.length)
+        self.length = self.starts.pop()
+        self.start = self.segments[0].start
+        self.end = self.segments[-1].end
+        self._chords = {}
+
+    def point_at(self, s):
+        """Point at distance s along the path (clamped to the path)."""
+        if s <= 0:
+            return self.start
+        if s >= self.length:
+            return self.end
+        index = bisect.bisect_right(self.starts, s) - 1
+        return self.segments[index].point_at(s - self.starts[index])
+
+    def chords(self, max_error=CURVE_CHORD_ERROR):
+        """
+        Polyline within max_error of the path, for sweeping it with straight-path collision checks.
+
+        Returns:
+            (distances, points): the distance along the path of every polyline vertex, and the vertices
+        """
+        if max_error not in self._chords:
+            distances, points = [0.0], [self.start]
+            for start, segment in zip(self.starts, self.segments):
+                count = segment.chord_count(max_error)
+                for k in range(1, count + 1):
+                    s = segment.length * k / count
+                    distances.append(start + s)
+                    points.append(segment.point_at(s) if k < count else segment.end)
+            self._chords[max_error] = (distances, points)
+        return self._chords[max_error]
+
+
+def curve_path(start, via, end):
+    """Path of a "curve" command: the arc through start, via and end, or a straight line if they are collinear."""
+    circle = circle_through(start, via, end)
+    if circle is None:
+        return CurvePath([LineSegment(start, end)])
+    return CurvePath([ArcSegment(start, via, end, circle)])
+
+
+def fillet(previous, corner, following, distance, min_radius, max_radius):
+    """
+    Arc rounding the corner of previous -> corner -> following, tangent to both legs.
+
+    The arc starts `distance` before the corner (shortened so its radius stays within max_radius and it uses at
+    most half of either leg).
+
+    Returns:
+        (start, via, end) points of the arc, or None when the legs are (nearly) straight or the turn is too
+        sharp for an arc of at least min_radius
+    """
+    incoming, outgoing = _sub(corner, previous), _sub(following, corner)
+    in_length, out_length = _norm(incoming), _norm(outgoing)
+    if in_length == 0 or out_length == 0:
+        return None
+    a = tuple(d / in_length for d in incoming)
+    b = tuple(d / out_length for d in outgoing)
+    turn = math.acos(max(-1.0, min(1.0, _dot(a, b))))
+    if turn < 1e-3 or turn > math.pi - 1e-3:
+        return None
+    half_tan = math.tan(turn / 2)
+    distance = min(distance, in_length / 2, out_length / 2, max_radius * half_tan)
+    radius = distance / half_tan
+    if radius < min_radius:
+        return None
+    bisector = _sub(b, a)
+    bisector = tuple(d / _norm(bisector) for d in bisector)
+    start = tuple(corner[k] - a[k] * distance for k in range(3))
+    end = tuple(corner[k] + b[k] * distance for k in range(3))
+    via_offset = math.hypot(distance, radius) - radius  # From the corner to the middle of the arc
+    via = tuple(corner[k] + bisector[k] * via_offset for k in range(3))
+    return start, via, end
@@ -1,27 +1,42 @@
 import time
 import math
+from curves import circle_through
 from config import (DRONE_DEFAULT_SPEED,DRONE_INITIAL_BATTERY,DRONE_IDLE_DRAIN_RATE,
     DRONE_FLYING_DRAIN_RATE,DRONE_HIGH_POWER_DRAIN_RATE,
-    DRONE_INITIAL_X,DRONE_INITIAL_Y,DRONE_INITIAL_Z,DRONE_INITIAL_YAW)
+    DRONE_INITIAL_X,DRONE_INITIAL_Y,DRONE_INITIAL_Z,DRONE_INITIAL_YAW,
+    CURVE_MIN_RADIUS,CURVE_MAX_RADIUS,CURVE_MAX_SPEED)
 
 """Handles Drone related physics and command logic"""
 class Drone:
-    def __init__(self, weather_data=None):
-        self.x = DRONE_INITIAL_X  # cm, right is positive
-        self.y = DRONE_INITIAL_Y  # cm, forward is positive
-        self.z = DRONE_INITIAL_Z  # cm, up is positive
-        self.yaw = DRONE_INITIAL_YAW  # degrees, clockwise from north (0°)
-        self.battery = DRONE_INITIAL_BATTERY  # percent, float for precision
-        self.speed = DRONE_DEFAULT_SPEED  # cm/s
-        self.connected = False
-        self.flying = False
-        self.last_update_time = time.time()  # Track time for battery updates
+    def __init__(self, weather_data=None, terrain=None, clock=time.time):
+        self.terrain = terrain  # Optional Terrain; None means flat ground at z=0
+        self.clock = clock  # Time source for battery drain; environments pass a simulated clock
+        self.range_finder = None  # Optional callable returning the downward ToF distance in cm, for "tof?"
+        self.reset()
         self.IDLE_DRAIN_RATE = DRONE_IDLE_DRAIN_RATE
         self.FLYING_DRAIN_RATE = DRONE_FLYING_DRAIN_RATE
         self.HIGH_POWER_DRAIN_RATE = DRONE_HIGH_POWER_DRAIN_RATE
         self.weather_data = weather_data if weather_data else {}
         self.temperature = self.weather_data.get("temperature", 20)  # Default 20°C
 
+    def reset(self, x=DRONE_INITIAL_X, y=DRONE_INITIAL_Y, yaw=DRONE_INITIAL_YAW):
+        """Return to the initial landed state (position, battery, speed) without rebuilding the drone."""
+        self.x = x  # cm, right is positive
+        self.y = y  # cm, forward is positive
+        self.z = max(DRONE_INITIAL_Z, self.ground_height())  # cm, up is positive
+        self.yaw = yaw  # degrees, clockwise from north (0°)
+        self.battery = DRONE_INITIAL_BATTERY  # percent, float for precision
+        self.speed = DRONE_DEFAULT_SPEED  # cm/s
+        self.connected = False
+        self.flying = False
+        self.last_update_time = self.clock()  # Track time for battery updates
+
+    def ground_height(self, x=None, y=None):
+        """Ground height below (x, y), defaulting to the drone's position."""
+        if self.terrain is None:
+            return 0
+        return self.terrain.height_at(self.x if x is None else x, self.y if y is None else y)
+
     def update_battery(self, current_time):
         """Update battery based on elapsed time, state, and temperature."""
         if self.last_update_time is None:
@@ -54,7 +69,7 @@ class Drone:
 
     def execute_command(self, cmd):
         """Execute Tello SDK commands and return appropriate responses."""
-        current_time = time.time()
+        current_time = self.clock()
         self.update_battery(current_time)
 
         parts = cmd.strip().split()
@@ -74,14 +89,14 @@ class Drone:
             if self.flying:
                 return "error"
             self.flying = True
-            self.z = 100 #1m hover
+            self.z = self.ground_height() + 100 #1m hover
             return "ok"
 
         elif command == "land":
             if not self.flying:
                 return "error"
             self.flying = False
-            self.z = 0
+            self.z = self.ground_height()
             return "ok"
 
         elif command in ["up", "down", "left", "right", "forward", "back"]:
@@ -95,7 +110,7 @@ class Drone:
                 if command == "up":
                     self.z += dist
                 elif command == "down":
-                    self.z = max(0, self.z - dist)
+                    self.z = max(self.ground_height(), self.z - dist)
                 elif command == "forward":
                     rad = math.radians(self.yaw)  # Convert yaw to radians
                     self.x += dist * math.sin(rad)  # East-west movement
@@ -151,7 +166,28 @@ class Drone:
                     return "error"
                 self.x = x
                 self.y = y
-                self.z = max(0, z)
+                self.z = max(self.ground_height(x, y), z)
+                self.speed = speed
+                return "ok"
+            except (IndexError, ValueError):
+                return "error"
+
+        elif command == "curve":
+            # Arc from the current position through (x1, y1, z1) to (x2, y2, z2), coordinates as for "go"
+            if not self.flying:
+                return "error"
+            try:
+                x1, y1, z1, x2, y2, z2, speed = map(int, parts[1:8])
+                if not all(-500 <= value <= 500 for value in (x1, y1, z1, x2, y2, z2)):
+                    return "error"
+                if not (10 <= speed <= CURVE_MAX_SPEED):
+                    return "error"
+                circle = circle_through((self.x, self.y, self.z), (x1, y1, z1), (x2, y2, z2))
+                if circle is None or not (CURVE_MIN_RADIUS <= circle[1] <= CURVE_MAX_RADIUS):
+                    return "error"
+                self.x = x2
+                self.y = y2
+                self.z = max(self.ground_height(x2, y2), z2)
                 self.speed = speed
                 return "ok"
             except (IndexError, ValueError):
@@ -176,9 +212,14 @@ class Drone:
         elif command == "time?":
             return "0"
 
+        elif command == "tof?":
+            # Height above the ground below the drone unless a simulated ToF sensor is attached
+            distance = self.range_finder() if self.range_finder else self.z - self.ground_height()
+            return f"{int(distance * 10)}mm"
+
         elif command == "emergency":
             self.flying = False
-            self.z = 0
+            self.z = self.ground_height()
             return "ok"
 
         return "error"
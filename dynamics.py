@@ -0,0 +1,148 @@
+import math
+import numpy as np
+from config import (DYNAMICS_INTEGRATOR, DYNAMICS_SUBSTEP_RATE, DYNAMICS_DRAG, DYNAMICS_POSITION_GAIN,
+                    DYNAMICS_VELOCITY_GAIN, DYNAMICS_MAX_ACCEL, DYNAMICS_YAW_GAIN, DYNAMICS_YAW_RATE_GAIN,
+                    DYNAMICS_MAX_YAW_RATE, ANGULAR_ACCEL, DRONE_DEFAULT_SPEED)
+
+INTEGRATORS = ("semi_implicit", "rk4")
+
+
+def _clip_norm(vectors, limits):
+    """Scale (N, 3) vectors down so their lengths do not exceed (N,) limits."""
+    norms = np.sqrt((vectors ** 2).sum(axis=1))
+    scale = np.minimum(1.0, limits / np.maximum(norms, 1e-9))
+    return vectors * scale[:, None]
+
+
+"""Point-mass flight dynamics for N drones, integrated together.
+
+Each drone has a position, velocity, yaw and yaw rate in (N, ...) arrays. A cascaded controller tracks SDK-style
+setpoints: a position target (move commands, capped at the drone's speed) or a velocity target (rc), producing
+a commanded acceleration limited to DYNAMICS_MAX_ACCEL. Linear drag acts on the air-relative velocity, so wind
+pushes the drones and the controller leans into it with a small steady-state error; the velocity loop's lag
+gives the overshoot a kinematic profile lacks. Every step() runs fixed substeps at DYNAMICS_SUBSTEP_RATE,
+independent of the frame rate, with semi-implicit Euler or RK4.
+"""
+class PointMassDynamics:
+    def __init__(self, count, substep_rate=DYNAMICS_SUBSTEP_RATE, integrator=DYNAMICS_INTEGRATOR, drag=DYNAMICS_DRAG):
+        """
+        Initialize N drones at rest at the origin.
+
+        Args:
+            count: Number of drones N
+            substep_rate: Integration substeps per simulated second
+            integrator: One of INTEGRATORS
+            drag: Linear drag coefficient (1/s) on the air-relative velocity
+        """
+        if integrator not in INTEGRATORS:
+            raise ValueError(f"Unknown integrator '{integrator}', expected one of {INTEGRATORS}")
+        self.count = count
+        self.substep_rate = substep_rate
+        self.integrator = integrator
+        self.drag = drag
+        self.position = np.zeros((count, 3))
+        self.velocity = np.zeros((count, 3))
+        self.yaw = np.zeros(count)  # degrees, clockwise from north
+        self.yaw_rate = np.zeros(count)  # degrees/s
+        # Setpoints: position mode tracks target/target_yaw, velocity mode tracks velocity_setpoint/yaw_rate_setpoint
+        self.position_mode = np.ones(count, dtype=bool)
+        self.target = np.zeros((count, 3))
+        self.target_yaw = np.zeros(count)
+        self.max_speed = np.full(count, float(DRONE_DEFAULT_SPEED))
+        self.velocity_setpoint = np.zeros((count, 3))
+        self.yaw_rate_setpoint = np.zeros(count)
+
+    def reset(self, position, yaw=0.0, mask=None):
+        """Place drones at rest, holding their position."""
+        envs = slice(None) if mask is None else np.flatnonzero(mask)
+        self.position[envs] = position
+        self.velocity[envs] = 0
+        self.yaw[envs] = yaw
+        self.yaw_rate[envs] = 0
+        self.target[envs] = self.position[envs]
+        self.target_yaw[envs] = self.yaw[envs]
+        self.position_mode[envs] = True
+
+    def set_targets(self, target, target_yaw, max_speed, mask=None):
+        """Fly to position targets (N, 3) and headings (N,) at up to max_speed cm/s (move/go/cw commands)."""
+        envs = slice(None) if mask is None else np.flatnonzero(mask)
+        self.target[envs] = target
+        self.target_yaw[envs] = target_yaw
+        self.max_speed[envs] = max_speed
+        self.position_mode[envs] = True
+
+    def set_velocities(self, velocity, yaw_rate, mask=None):
+        """Track world-frame velocities (N, 3) in cm/s and yaw rates (N,) in degrees/s (rc command)."""
+        envs = slice(None) if mask is None else np.flatnonzero(mask)
+        self.velocity_setpoint[envs] = velocity
+        self.yaw_rate_setpoint[envs] = yaw_rate
+        self.position_mode[envs] = False
+
+    def _acceleration(self, position, velocity, wind):
+        """Controller thrust plus drag for the given state, (N, 3) cm/s²."""
+        setpoint = np.where(self.position_mode[:, None],
+                            _clip_norm(DYNAMICS_POSITION_GAIN * (self.target - position), self.max_speed),
+                            self.velocity_setpoint)
+        # Velocity loop with drag feedforward (the controller assumes still air)
+        thrust = DYNAMICS_VELOCITY_GAIN * (setpoint - velocity) + self.drag * setpoint
+        thrust = _clip_norm(thrust, np.full(self.count, float(DYNAMICS_MAX_ACCEL)))
+        air_velocity = velocity if wind is None else velocity - wind
+        return thrust - self.drag * air_velocity
+
+    def _yaw_acceleration(self, yaw, yaw_rate):
+        error = (self.target_yaw - yaw + 180) % 360 - 180
+        setpoint = np.where(self.position_mode,
+                            np.clip(DYNAMICS_YAW_GAIN * error, -DYNAMICS_MAX_YAW_RATE, DYNAMICS_MAX_YAW_RATE),
+                            self.yaw_rate_setpoint)
+        return np.clip(DYNAMICS_YAW_RATE_GAIN * (setpoint - yaw_rate), -ANGULAR_ACCEL, ANGULAR_ACCEL)
+
+    def step(self, dt, wind=None, ground=None):
+        """
+        Advance all drones by dt seconds in fixed substeps.
+
+        Args:
+            dt: Seconds to simulate
+            wind: (N, 3) wind velocities in cm/s held over the step, or None for still air
+            ground: (N,) ground heights the drones cannot sink below, or None for z = 0
+        """
+        substeps = max(1, math.ceil(dt * self.substep_rate - 1e-9))
+        h = dt / substeps
+        ground = 0.0 if ground is None else ground
+        for _ in range(substeps):
+            if self.integrator == "rk4":
+                self._rk4(h, wind)
+            else:
+                self.velocity += self._acceleration(self.position, self.velocity, wind) * h
+                self.position += self.velocity * h
+                self.yaw_rate += self._yaw_acceleration(self.yaw, self.yaw_rate) * h
+                self.yaw = (self.yaw + self.yaw_rate * h) % 360
+            below = self.position[:, 2] < ground
+            if below.any():
+                self.position[below, 2] = ground if np.isscalar(ground) else ground[below]
+                self.velocity[below, 2] = np.maximum(self.velocity[below, 2], 0)
+
+    def _rk4(self, h, wind):
+        p, v = self.position, self.velocity
+        k1v = self._acceleration(p, v, wind)
+        k2v = self._acceleration(p + v * (h / 2), v + k1v * (h / 2), wind)
+        k3v = self._acceleration(p + (v + k1v * (h / 2)) * (h / 2), v + k2v * (h / 2), wind)
+        k4v = self._acceleration(p + (v + k2v * (h / 2)) * h, v + k3v * h, wind)
+        k2p = v + k1v * (h / 2)
+        k3p = v + k2v * (h / 2)
+        k4p = v + k3v * h
+        self.position = p + (v + 2 * k2p + 2 * k3p + k4p) * (h / 6)
+        self.velocity = v + (k1v + 2 * k2v + 2 * k3v + k4v) * (h / 6)
+
+        yaw, rate = self.yaw, self.yaw_rate
+        k1r = self._yaw_acceleration(yaw, rate)
+        k2r = self._yaw_acceleration(yaw + rate * (h / 2), rate + k1r * (h / 2))
+        k3r = self._yaw_acceleration(yaw + (rate + k1r * (h / 2)) * (h / 2), rate + k2r * (h / 2))
+        k4r = self._yaw_acceleration(yaw + (rate + k2r * (h / 2)) * h, rate + k3r * h)
+        self.yaw = (yaw + (rate + 2 * (rate + k1r * (h / 2)) + 2 * (rate + k2r * (h / 2)) + rate + k3r * h)
+                    * (h / 6)) % 360
+        self.yaw_rate = rate + (k1r + 2 * k2r + 2 * k3r + k4r) * (h / 6)
+
+    def states(self):
+        """Drone state dicts (x, y, z, yaw), as used by the simulator and collision checks."""
+        return [{"x": x, "y": y, "z": z, "yaw": yaw}
+                for (x, y, z), yaw in zip(self.position.tolist(), self.yaw.tolist())]
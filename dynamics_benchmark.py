@@ -0,0 +1,85 @@
+import sys
+import time
+import numpy as np
+from drone import Drone
+from motion_planner import MotionPlanner
+from dynamics import PointMassDynamics, INTEGRATORS
+from config import FRAME_RATE, LINEAR_ACCEL, ANGULAR_ACCEL, DYNAMICS_SUBSTEP_RATE
+
+COUNTS = (1, 16, 256, 4096)
+MOVE_DISTANCE = 200  # cm, the "forward 200" used for the trajectory comparison
+
+
+def time_per_frame(step, min_seconds=0.5):
+    """Mean seconds per call of step(), repeated for at least min_seconds."""
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        step()
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return elapsed / calls
+
+
+def kinematic_frame_cost(count):
+    """One frame of MotionPlanner.interpolate_state for `count` drones, the simulator's per-drone path."""
+    planner = MotionPlanner(Drone(), LINEAR_ACCEL, ANGULAR_ACCEL)
+    start = {"x": 0.0, "y": 0.0, "z": 100.0, "yaw": 0.0}
+    target = {"x": 0.0, "y": float(MOVE_DISTANCE), "z": 100.0, "yaw": 0.0}
+    total_time = planner.calculate_move_time(f"forward {MOVE_DISTANCE}", start, target, planner.drone.speed)
+    accel_time = min(planner.drone.speed / LINEAR_ACCEL, total_time / 2)
+    coast_time = max(0, total_time - 2 * accel_time)
+
+    def step():
+        for _ in range(count):
+            planner.interpolate_state(start.copy(), target, total_time / 2, total_time, accel_time, coast_time)
+    return time_per_frame(step)
+
+
+def dynamics_frame_cost(count, integrator):
+    dynamics = PointMassDynamics(count, integrator=integrator)
+    dynamics.reset(np.array((0.0, 0.0, 100.0)))
+    dynamics.set_targets(np.array((0.0, float(MOVE_DISTANCE), 100.0)), 0.0, 75.0)
+    wind = np.tile((100.0, 0.0, 0.0), (count, 1))
+    return time_per_frame(lambda: dynamics.step(1.0 / FRAME_RATE, wind))
+
+
+def trajectory(integrator):
+    """Settle time and overshoot of one dynamics drone flying the benchmark move in still air."""
+    dynamics = PointMassDynamics(1, integrator=integrator)
+    dynamics.reset((0.0, 0.0, 100.0))
+    dynamics.set_targets((0.0, float(MOVE_DISTANCE), 100.0), 0.0, 75.0)
+    peak, settled = 0.0, None
+    for frame in range(FRAME_RATE * 10):
+        dynamics.step(1.0 / FRAME_RATE)
+        y = dynamics.position[0, 1]
+        peak = max(peak, y)
+        if abs(y - MOVE_DISTANCE) > 1:
+            settled = None
+        elif settled is None:
+            settled = (frame + 1) / FRAME_RATE
+    return peak - MOVE_DISTANCE, settled
+
+
+def run_benchmark(counts=COUNTS):
+    planner = MotionPlanner(Drone(), LINEAR_ACCEL, ANGULAR_ACCEL)
+    kinematic_time = planner.calculate_move_time(f"forward {MOVE_DISTANCE}", {"x": 0, "y": 0, "z": 100},
+                                                 {"x": 0, "y": MOVE_DISTANCE, "z": 100}, planner.drone.speed)
+    print(f"forward {MOVE_DISTANCE}: kinematic profile {kinematic_time:.2f} s, no overshoot")
+    for integrator in INTEGRATORS:
+        overshoot, settled = trajectory(integrator)
+        print(f"forward {MOVE_DISTANCE}: {integrator} dynamics settles within 1 cm after {settled:.2f} s, "
+              f"overshoot {overshoot:.2f} cm")
+
+    print(f"\nCost per {FRAME_RATE} Hz frame ({DYNAMICS_SUBSTEP_RATE} Hz substeps for dynamics):")
+    print(f"  {'drones':>6} {'kinematic':>14} " + " ".join(f"{name:>14}" for name in INTEGRATORS))
+    for count in counts:
+        costs = [kinematic_frame_cost(count)] + [dynamics_frame_cost(count, name) for name in INTEGRATORS]
+        print(f"  {count:>6} " + " ".join(f"{cost * 1e6:>11.1f} us" for cost in costs) +
+              f"   per drone: " + ", ".join(f"{cost * 1e6 / count:.2f}" for cost in costs) + " us")
+
+
+if __name__ == "__main__":
+    # Usage: python dynamics_benchmark.py [drone counts ...]
+    run_benchmark([int(arg) for arg in sys.argv[1:]] or COUNTS)
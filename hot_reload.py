@@ -0,0 +1,196 @@
+import importlib
+import os
+import time
+import config
+from paths import resolve_path
+from config import HOT_RELOAD_INTERVAL
+
+# Config constants applied without a restart; edits to any other constant are reported as needing one
+LIVE_CONFIG = ("COMMANDS", "FRAME_RATE", "LINEAR_ACCEL", "ANGULAR_ACCEL", "SCENE_FILE")
+
+
+def _signature(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+"""Polls file modification times; cheap enough to call every frame."""
+class FileWatcher:
+    def __init__(self, paths=()):
+        self.signatures = {}
+        for path in paths:
+            self.watch(path)
+
+    def watch(self, path):
+        self.signatures[path] = _signature(path)
+
+    def unwatch(self, path):
+        self.signatures.pop(path, None)
+
+    def changed(self):
+        """Paths whose modification time or size changed since the last call."""
+        changed = []
+        for path, signature in self.signatures.items():
+            current = _signature(path)
+            if current != signature:
+                self.signatures[path] = current
+                changed.append(path)
+        return changed
+
+
+def _reuse_batches(old_batches, old_keys, new_batches, new_keys):
+    """
+    Keep old render batches whose content key is unchanged, so their compiled GL objects survive a reload.
+
+    Returns:
+        (batches, rebuilt): new_batches with unchanged entries swapped for their old batch, and how many are new;
+        old batches that are not reused are deleted
+    """
+    available = dict(zip(old_keys, old_batches))
+    batches = []
+    for batch, key in zip(new_batches, new_keys):
+        kept = available.pop(key, None)
+        batches.append(kept if kept is not None else batch)
+    for batch in available.values():
+        batch.delete()
+    return batches, sum(1 for batch in batches if batch in new_batches)
+
+
+def _renderable_keys(obstructions):
+    """Content keys matching create_renderables(obstructions): the primitive batch, then one per mesh."""
+    import hashlib
+    from primitives import PrimitiveTable
+    meshes = [o for o in obstructions if hasattr(o, 'check_sweep')]
+    primitives = [o for o in obstructions if not hasattr(o, 'check_sweep')]
+    digests = PrimitiveTable.from_obstructions(primitives).obstruction_digests()
+    return ([hashlib.sha1("".join(digests).encode()).hexdigest()] +
+            [repr((mesh.path, tuple(mesh.position), mesh.scale, mesh.color)) for mesh in meshes])
+
+
+"""Watch mode for the windowed simulator.
+
+Polls config.py and the scene (SCENE_FILE, or obstruction_visuals.py for create_obstructions()) and applies an edit
+without reopening the window or refetching the weather:
+    COMMANDS          the mission restarts; the analysis reuses every command before the first edited one
+    physics constants the mission restarts with a full analysis
+    scene             only render batches whose obstructions changed are recompiled, the collision index is
+                      rebuilt from the new table, and the mission restarts
+Other config constants need a restart of the program and are reported as such.
+"""
+class HotReloader:
+    def __init__(self, simulator, interval=HOT_RELOAD_INTERVAL):
+        """
+        Initialize the watcher.
+
+        Args:
+            simulator: Simulator whose mission and world are reloaded
+            interval: Seconds between file checks
+        """
+        self.simulator = simulator
+        self.interval = interval
+        self.config_path = os.path.abspath(config.__file__)
+        self.scene_path = None
+        self.watcher = FileWatcher([self.config_path])
+        self.batch_keys = None  # Content keys of the simulator's render batches, computed on the first reload
+        self.last_poll = time.monotonic()
+        self._watch_scene(config.SCENE_FILE)
+
+    def _watch_scene(self, scene_file):
+        if self.scene_path:
+            self.watcher.unwatch(self.scene_path)
+        if config.WORLD_STREAMING:
+            self.scene_path = None  # Streamed tiles are generated, not authored
+        elif scene_file:
+            self.scene_path = resolve_path(scene_file)
+        else:
+            self.scene_path = resolve_path("obstruction_visuals.py")
+        if self.scene_path:
+            self.watcher.watch(self.scene_path)
+
+    def poll(self):
+        """Apply any edits made since the last check; called once per frame."""
+        now = time.monotonic()
+        if now - self.last_poll < self.interval:
+            return
+        self.last_poll = now
+        for path in self.watcher.changed():
+            start = time.perf_counter()
+            if path == self.config_path:
+                summary = self._reload_config()
+            else:
+                summary = self._reload_scene()
+            if summary:
+                self.simulator.report.log(f"Reloaded {os.path.basename(path)} in "
+                                          f"{(time.perf_counter() - start) * 1000:.0f} ms: {summary}")
+        self.simulator.report.flush()
+
+    def _reload_config(self):
+        old = {name: value for name, value in vars(config).items() if name.isupper()}
+        try:
+            importlib.reload(config)
+        except Exception as e:  # Any error in the edited file; keep running with the previous values
+            self.simulator.report.log(f"config.py not reloaded: {e}")
+            return None
+        new = {name: value for name, value in vars(config).items() if name.isupper()}
+        changed = sorted(name for name in old.keys() | new.keys() if old.get(name) != new.get(name))
+        if not changed:
+            return "no constants changed"
+        sim = self.simulator
+        live = [name for name in changed if name in LIVE_CONFIG]
+        pending = [name for name in changed if name not in LIVE_CONFIG]
+        if pending:
+            # The cache key would describe constants the running modules do not use
+            sim.use_mission_cache = False
+            sim.report.log(f"  Restart to apply: {', '.join(pending)}")
+        if "SCENE_FILE" in live:
+            self._watch_scene(config.SCENE_FILE)
+            self.batch_keys = None
+            self._reload_scene()
+        if any(name in live for name in ("FRAME_RATE", "LINEAR_ACCEL", "ANGULAR_ACCEL")):
+            sim.set_physics(config.FRAME_RATE, config.LINEAR_ACCEL, config.ANGULAR_ACCEL)
+            sim.request_restart(incremental=False)
+        if "COMMANDS" in live:
+            sim.commands = list(config.COMMANDS)
+            sim.request_restart(incremental=True)
+        return ", ".join(changed)
+
+    def _reload_scene(self):
+        sim = self.simulator
+        try:
+            if config.SCENE_FILE:
+                from scene import load_scene
+                scene = load_scene(config.SCENE_FILE)
+                obstructions = scene.obstructions
+                collision_detector = scene.create_collision_detector(sim.terrain)
+            else:
+                import obstruction_visuals
+                from collision_detector import CollisionDetector
+                scene = None
+                obstructions = importlib.reload(obstruction_visuals).create_obstructions()
+                collision_detector = CollisionDetector(obstructions, terrain=sim.terrain)
+        except Exception as e:  # Any error in the edited scene or code; keep the current world
+            sim.report.log(f"Scene not reloaded: {e}")
+            return None
+
+        batches, rebuilt = sim.render_batches, 0
+        if sim.visualizer:
+            new_keys = scene.batch_keys() if scene is not None else _renderable_keys(obstructions)
+            if self.batch_keys is None:
+                self.batch_keys = sim.scene.batch_keys() if sim.scene is not None else _renderable_keys(sim.obstructions)
+            if scene is not None:
+                from obstruction_renderer import create_scene_batches
+                new_batches = create_scene_batches(scene)
+            else:
+                from obstruction_renderer import create_renderables
+                new_batches = create_renderables(obstructions)
+            batches, rebuilt = _reuse_batches(sim.render_batches, self.batch_keys, new_batches, new_keys)
+            self.batch_keys = new_keys
+        sim.replace_world(obstructions, collision_detector, batches, scene)
+        sim.request_restart(incremental=False)
+        summary = f"{len(obstructions)} obstructions"
+        if sim.visualizer:
+            summary += f", {rebuilt} of {len(batches)} render batches rebuilt"
+        return summary
@@ -0,0 +1,94 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from paths import resolve_path
+from config import IMPORT_BENCHMARK_RUNS, IMPORT_BENCHMARK_LOG
+
+# What each mode does before its first frame or command; run in a fresh interpreter per sample
+MODE_SNIPPETS = {
+    "analysis": "from simulator import Simulator; from config import COMMANDS; Simulator(COMMANDS, mode='analysis')",
+    "headless": "from simulator import Simulator; from config import COMMANDS; Simulator(COMMANDS, mode='headless')",
+    # Constructing the windowed simulator opens a window, so only its imports are measured
+    "windowed": "import simulator, visuals, obstruction_renderer",
+    "real": "import tello_wrapper, mission_executor",
+}
+
+
+def parse_importtime(stderr):
+    """Return {module: (self_us, cumulative_us)} from `python -X importtime` output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def measure(mode, runs=IMPORT_BENCHMARK_RUNS):
+    """
+    Cold-start a mode `runs` times.
+
+    Returns:
+        Dict with the median wall time and total import time (ms), module count and the slowest modules
+    """
+    root = os.path.dirname(os.path.abspath(__file__))
+    walls, imports, samples = [], [], None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", MODE_SNIPPETS[mode]], cwd=root,
+                                capture_output=True, text=True)
+        walls.append((time.perf_counter() - start) * 1000)
+        if result.returncode != 0:
+            error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else result.returncode
+            return {"error": str(error)}
+        samples = parse_importtime(result.stderr)
+        imports.append(sum(self_us for self_us, _ in samples.values()) / 1000)
+    slowest = sorted(samples.items(), key=lambda item: item[1][0], reverse=True)[:5]
+    return {
+        "wall_ms": round(statistics.median(walls), 1),
+        "import_ms": round(statistics.median(imports), 1),
+        "modules": len(samples),
+        "slowest": {name: round(self_us / 1000, 1) for name, (self_us, _) in slowest},
+    }
+
+
+def previous_record(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        lines = [line for line in f if line.strip()]
+    return json.loads(lines[-1]) if lines else None
+
+
+def run_benchmark(modes=None, runs=IMPORT_BENCHMARK_RUNS, log_path=IMPORT_BENCHMARK_LOG):
+    """Measure each mode, print it next to the previous run and append the results to the log (JSON lines)."""
+    modes = modes or list(MODE_SNIPPETS)
+    path = resolve_path(log_path) if log_path else None
+    previous = (previous_record(path) or {}).get("modes", {}) if path else {}
+    record = {"time": time.time(), "python": sys.version.split()[0], "runs": runs, "modes": {}}
+    print(f"Cold start per mode (median of {runs} runs):")
+    for mode in modes:
+        result = record["modes"][mode] = measure(mode, runs)
+        if "error" in result:
+            print(f"  {mode:9} failed: {result['error']}")
+            continue
+        change = ""
+        if "wall_ms" in previous.get(mode, {}):
+            change = f" ({result['wall_ms'] - previous[mode]['wall_ms']:+.1f} ms vs last run)"
+        slowest = ", ".join(f"{name} {ms}" for name, ms in result["slowest"].items())
+        print(f"  {mode:9} {result['wall_ms']:7.1f} ms wall, {result['import_ms']:7.1f} ms importing "
+              f"{result['modules']} modules{change}\n            slowest: {slowest}")
+    if path:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+    return record
+
+
+if __name__ == "__main__":
+    # Usage: python import_benchmark.py [mode ...]
+    run_benchmark(sys.argv[1:] or None)
@@ -1,18 +1,56 @@
 import multiprocessing
-import os
+from shared_ipc import SharedFrameRing, SharedDroneState
+from config import IPC_SHUTDOWN_TIMEOUT, VIDEO_RECORD
 
-def run_main():
-    os.system("python main.py")
+def run_main(state_name):
+    import main
+    main.main(state_name=state_name)
 
-def run_video():
-    os.system("python video.py")
+def run_video(frame_ring_name, state_name, stop_event):
+    import video
+    # With a frame ring the recorder process encodes the frames, not the video process
+    video.run_video(record=False if frame_ring_name else VIDEO_RECORD, frame_ring_name=frame_ring_name,
+                    state_name=state_name, stop_event=stop_event)
+
+def run_recorder(frame_ring_name, stop_event):
+    from video_recorder import record_shared_frames
+    record_shared_frames(frame_ring_name, stop_event)
 
 if __name__ == "__main__":
-    main_process = multiprocessing.Process(target=run_main)
-    video_process = multiprocessing.Process(target=run_video)
+    # Shared memory is created (and finally unlinked) here; the children attach by name
+    # Frames cross processes only when something reads them: recording runs in its own process
+    frames = SharedFrameRing.create() if VIDEO_RECORD else None
+    state = SharedDroneState.create()
+    stop_event = multiprocessing.Event()
+    record_stop_event = multiprocessing.Event()
+
+    main_process = multiprocessing.Process(target=run_main, args=(state.name,), name="main")
+    video_process = multiprocessing.Process(target=run_video,
+                                            args=(frames.name if frames else None, state.name, stop_event),
+                                            name="video")
+    processes = [main_process, video_process]
+    recorder_process = None
+    if frames:
+        recorder_process = multiprocessing.Process(target=run_recorder, args=(frames.name, record_stop_event),
+                                                   name="recorder")
+        processes.append(recorder_process)
 
-    main_process.start()
-    video_process.start()
+    for process in processes:
+        process.start()
 
-    main_process.join()  # Wait for main to finish
-    video_process.terminate()  # Stop video when main ends
\ No newline at end of file
+    try:
+        main_process.join()  # Wait for main to finish
+    finally:
+        stop_event.set()  # Ask the video process to wind down
+        video_process.join(timeout=IPC_SHUTDOWN_TIMEOUT)
+        record_stop_event.set()  # The recorder finishes once no more frames can arrive
+        if recorder_process:
+            recorder_process.join(timeout=IPC_SHUTDOWN_TIMEOUT)
+        for process in processes:
+            if process.is_alive():
+                print(f"{process.name} process did not stop in time, terminating.")
+                process.terminate()
+                process.join()
+        if frames:
+            frames.close()
+        state.close()
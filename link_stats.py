@@ -0,0 +1,143 @@
+import bisect
+import json
+import os
+import time
+from paths import resolve_path
+from config import (TELLO_RESPONSE_TIMEOUT, TELLO_MIN_TIMEOUT, TELLO_TIMEOUT_FACTOR, TELLO_ADAPTIVE_MIN_SAMPLES,
+                    TELLO_MIN_BACKOFF, TELLO_MAX_BACKOFF)
+
+# Log-spaced RTT bin upper edges in seconds: 1 ms .. ~65 s, 8 bins per doubling
+RTT_BIN_EDGES = [0.001 * 2 ** (i / 8) for i in range(129)]
+
+
+class RttHistogram:
+    """Fixed log-spaced histogram; recording is one bisect and one increment."""
+    __slots__ = ("counts", "total", "sum", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(RTT_BIN_EDGES) + 1)  # Last bin holds overflow
+        self.total = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        self.counts[bisect.bisect_left(RTT_BIN_EDGES, seconds)] += 1
+        self.total += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q):
+        """Upper bin edge at or below which q percent of samples fall (None if empty)."""
+        if self.total == 0:
+            return None
+        target = self.total * q / 100
+        running = 0
+        for i, count in enumerate(self.counts):
+            running += count
+            if running >= target:
+                return RTT_BIN_EDGES[i] if i < len(RTT_BIN_EDGES) else self.max
+        return self.max
+
+    def to_dict(self):
+        return {"count": self.total, "mean": self.sum / self.total if self.total else None, "max": self.max,
+                "p50": self.percentile(50), "p90": self.percentile(90), "p99": self.percentile(99),
+                "bins": {f"{RTT_BIN_EDGES[i] if i < len(RTT_BIN_EDGES) else float('inf'):.4f}": count
+                         for i, count in enumerate(self.counts) if count}}
+
+
+"""Round-trip statistics for the Tello command link.
+
+RTT histograms are kept per command type. Movement commands are only acknowledged once the move is done,
+so the adaptive timeout is learned from the response overhead (RTT minus the expected motion time) across all
+commands, then added back on top of each command's own expected duration.
+"""
+class LinkStats:
+    def __init__(self):
+        self.rtt = {}  # command type -> RttHistogram of raw round trips
+        self.overhead = RttHistogram()
+        self.sent = {}
+        self.timeouts = {}
+        self.retries = {}
+        self.late_responses = 0  # Replies that arrived after their command timed out
+        self.lost_responses = 0  # Timed-out commands whose reply never arrived
+        self.started = time.time()
+
+    @staticmethod
+    def command_type(command):
+        return command.split()[0].lower() if command.strip() else ""
+
+    def record_sent(self, command):
+        kind = self.command_type(command)
+        self.sent[kind] = self.sent.get(kind, 0) + 1
+
+    def record_response(self, command, rtt, expected_duration=0):
+        kind = self.command_type(command)
+        histogram = self.rtt.get(kind)
+        if histogram is None:
+            histogram = self.rtt[kind] = RttHistogram()
+        histogram.record(rtt)
+        if expected_duration is not None:  # An unknown motion time would be counted as link overhead
+            self.overhead.record(max(rtt - expected_duration, 0.0))
+
+    def record_timeout(self, command):
+        kind = self.command_type(command)
+        self.timeouts[kind] = self.timeouts.get(kind, 0) + 1
+
+    def record_retry(self, command):
+        kind = self.command_type(command)
+        self.retries[kind] = self.retries.get(kind, 0) + 1
+
+    def record_late(self):
+        self.late_responses += 1
+
+    def record_lost(self):
+        self.lost_responses += 1
+
+    def packet_loss(self):
+        """Estimated fraction of commands or replies lost on the link."""
+        sent = sum(self.sent.values())
+        return self.lost_responses / sent if sent else 0.0
+
+    def timeout_for(self, expected_duration=0):
+        """
+        Response timeout: expected motion time plus a multiple of the observed p99 overhead.
+
+        expected_duration None means a command whose motion time is unknown; it gets the fixed
+        TELLO_RESPONSE_TIMEOUT, since the learned overhead alone would cut off its motion.
+        """
+        if expected_duration is None:
+            return TELLO_RESPONSE_TIMEOUT
+        if self.overhead.total < TELLO_ADAPTIVE_MIN_SAMPLES:
+            return expected_duration + TELLO_RESPONSE_TIMEOUT
+        learned = self.overhead.percentile(99) * TELLO_TIMEOUT_FACTOR
+        return expected_duration + min(max(learned, TELLO_MIN_TIMEOUT), TELLO_RESPONSE_TIMEOUT)
+
+    def backoff(self, attempt):
+        """Delay before retry `attempt` (0-based): exponential from the typical round trip."""
+        base = self.overhead.percentile(90) if self.overhead.total >= TELLO_ADAPTIVE_MIN_SAMPLES else None
+        base = max(base or TELLO_MIN_BACKOFF, TELLO_MIN_BACKOFF)
+        return min(base * 2 ** attempt, TELLO_MAX_BACKOFF)
+
+    def to_dict(self):
+        return {
+            "started": self.started,
+            "duration": time.time() - self.started,
+            "sent": self.sent,
+            "timeouts": self.timeouts,
+            "retries": self.retries,
+            "late_responses": self.late_responses,
+            "lost_responses": self.lost_responses,
+            "packet_loss": self.packet_loss(),
+            "adaptive_timeout": self.timeout_for(),
+            "overhead": self.overhead.to_dict(),
+            "rtt": {kind: histogram.to_dict() for kind, histogram in self.rtt.items()},
+        }
+
+    def export_json(self, path):
+        """Write the statistics to a JSON file."""
+        path = resolve_path(path)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
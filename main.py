@@ -1,27 +1,52 @@
 import time
-from simulator import Simulator
-from tello_wrapper import TelloWrapper
-from weather import Weather
-from config import (IS_SIM, HAS_WEATHER_DETAILS, IS_REAL_WEATHER, CRIT_BATTERY_LVL, ICAO, COMMANDS)
+from config import (IS_SIM, HAS_WEATHER_DETAILS, IS_REAL_WEATHER, CRIT_BATTERY_LVL, ICAO, COMMANDS,
+                    RESPONSE_DRIVEN_MISSION)
 
-def main():
-    weather = Weather(ICAO)
+def main(state_name=None):
+    """
+    Run the mission in the simulator or on the drone.
+
+    Args:
+        state_name: Shared memory block (SharedDroneState) to publish drone state to, set by launcher.py
+    """
+    # Each mode imports only what it uses (see import_benchmark.py)
+    state_publisher = None
+    if state_name:
+        from shared_ipc import SharedDroneState
+        state_publisher = SharedDroneState.attach(state_name)
+    weather = None
+    if HAS_WEATHER_DETAILS or (IS_SIM and IS_REAL_WEATHER):
+        from weather import Weather
+        weather = Weather(ICAO)
     if HAS_WEATHER_DETAILS:
         weather.print_summary()
 
     if IS_SIM:
-        simulator = Simulator(COMMANDS, weather.get_weather_data() if IS_REAL_WEATHER else None)
+        from simulator import Simulator
+        simulator = Simulator(COMMANDS, weather.get_weather_data() if IS_REAL_WEATHER else None, state_publisher)
         simulator.run()
     else:
+        from tello_wrapper import TelloWrapper
         drone = TelloWrapper()
-        battery = drone.execute_command("battery?")
-        if battery.isdigit() and int(battery) < CRIT_BATTERY_LVL:
-            print(f"Battery too low ({battery}%). Aborting.")
-            return
-        for cmd, delay in COMMANDS:
-            response = drone.execute_command(cmd)
-            print(f"{cmd}: {response}")
-            time.sleep(delay)
+        try:
+            if RESPONSE_DRIVEN_MISSION:
+                from mission_executor import MissionExecutor
+                MissionExecutor(drone, COMMANDS, state_publisher=state_publisher).run()
+                return
+            battery = drone.execute_command("battery?")
+            if battery.isdigit() and int(battery) < CRIT_BATTERY_LVL:
+                print(f"Battery too low ({battery}%). Aborting.")
+                return
+            from mission_executor import MotionPredictor
+            predictor = MotionPredictor()  # Predicted motion times set the response timeouts
+            for cmd, delay in COMMANDS:
+                response = drone.execute_command(cmd, expected_duration=predictor.predict(cmd))
+                print(f"{cmd}: {response}")
+                if state_publisher:
+                    state_publisher.write(drone.get_state())
+                time.sleep(delay)
+        finally:
+            drone.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,283 @@
+import hashlib
+import os
+import struct
+import numpy as np
+from obstructions import Obstruction
+from paths import resolve_path
+from config import MESH_CACHE_DIR, MESH_BVH_LEAF_SIZE
+
+MESH_CACHE_VERSION = 1  # Bump whenever the cached BVH layout changes
+
+
+def load_mesh_file(path):
+    """Load an OBJ or STL (ASCII or binary) file into a (T, 3, 3) float32 triangle array."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if path.lower().endswith(".obj"):
+        return _parse_obj(data)
+    if path.lower().endswith(".stl"):
+        return _parse_stl(data)
+    raise ValueError(f"Unsupported mesh format: {path}")
+
+
+def _parse_obj(data):
+    vertices = []
+    faces = []
+    for line in data.decode("utf-8", errors="replace").splitlines():
+        parts = line.split()
+        if not parts:
+            continue
+        if parts[0] == "v":
+            vertices.append([float(v) for v in parts[1:4]])
+        elif parts[0] == "f":
+            # "f 1 2 3", "f 1/1/1 2/2/2 3/3/3", negative indices count from the end
+            indices = []
+            for token in parts[1:]:
+                index = int(token.split("/")[0])
+                indices.append(index - 1 if index > 0 else len(vertices) + index)
+            for i in range(1, len(indices) - 1):  # Fan-triangulate polygons
+                faces.append((indices[0], indices[i], indices[i + 1]))
+    vertices = np.array(vertices, dtype=np.float32).reshape(-1, 3)
+    faces = np.array(faces, dtype=np.int64).reshape(-1, 3)
+    return vertices[faces]
+
+
+def _parse_stl(data):
+    # Binary STL: 80-byte header, uint32 count, 50 bytes per triangle
+    if len(data) >= 84:
+        count = struct.unpack_from("<I", data, 80)[0]
+        if len(data) == 84 + 50 * count:
+            records = np.frombuffer(data, dtype=np.dtype([("normal", "<f4", 3), ("vertices", "<f4", (3, 3)),
+                                                          ("attribute", "<u2")]), count=count, offset=84)
+            return np.ascontiguousarray(records["vertices"], dtype=np.float32)
+    vertices = [line.split()[1:4] for line in data.decode("utf-8", errors="replace").splitlines()
+                if line.strip().startswith("vertex")]
+    return np.array(vertices, dtype=np.float32).reshape(-1, 3, 3)
+
+
+"""Bounding volume hierarchy over triangles stored as flat arrays.
+
+Children of a node are allocated next to each other, so an inner node only stores its left child
+(right = left + 1). Leaves have left == -1 and reference triangles[start:start + count] in `order`.
+"""
+class TriangleBVH:
+    ARRAYS = ("node_min", "node_max", "node_left", "node_start", "node_count", "order")
+
+    def __init__(self, node_min, node_max, node_left, node_start, node_count, order):
+        # Stored as float32 on disk, float64 in memory so queries avoid per-call upcasts
+        self.node_min = np.asarray(node_min, dtype=float)
+        self.node_max = np.asarray(node_max, dtype=float)
+        self.node_left = node_left
+        self.node_start = node_start
+        self.node_count = node_count
+        self.order = order
+
+    @classmethod
+    def build(cls, triangles, leaf_size=MESH_BVH_LEAF_SIZE):
+        """Median-split build along the longest centroid axis."""
+        tri_min = triangles.min(axis=1)
+        tri_max = triangles.max(axis=1)
+        centroids = (tri_min + tri_max) * 0.5
+        order = np.arange(len(triangles), dtype=np.int32)
+
+        node_min, node_max, node_left, node_start, node_count = [], [], [], [], []
+
+        def new_node():
+            node_min.append(None)
+            node_max.append(None)
+            node_left.append(-1)
+            node_start.append(0)
+            node_count.append(0)
+            return len(node_min) - 1
+
+        stack = [(new_node(), 0, len(order))]
+        while stack:
+            node, start, end = stack.pop()
+            members = order[start:end]
+            node_min[node] = tri_min[members].min(axis=0)
+            node_max[node] = tri_max[members].max(axis=0)
+            if end - start <= leaf_size:
+                node_start[node] = start
+                node_count[node] = end - start
+                continue
+            member_centroids = centroids[members]
+            axis = int(np.argmax(member_centroids.max(axis=0) - member_centroids.min(axis=0)))
+            half = (end - start) // 2
+            split = np.argpartition(member_centroids[:, axis], half)
+            order[start:end] = members[split]
+            left = new_node()
+            new_node()
+            node_left[node] = left
+            stack.append((left, start, start + half))
+            stack.append((left + 1, start + half, end))
+
+        return cls(np.array(node_min, dtype=np.float32).reshape(-1, 3),
+                   np.array(node_max, dtype=np.float32).reshape(-1, 3),
+                   np.array(node_left, dtype=np.int32), np.array(node_start, dtype=np.int32),
+                   np.array(node_count, dtype=np.int32), order)
+
+    def query_segment(self, start, delta, half_extents):
+        """
+        Return triangle indices in leaves touched by a box swept along a segment.
+
+        Args:
+            start: (3,) box center at the start of the sweep
+            delta: (3,) sweep displacement
+            half_extents: (3,) box half extents
+        """
+        frontier = np.zeros(1, dtype=np.int32)
+        leaves = []
+        while len(frontier):
+            hit = segment_hits_boxes(start, delta, self.node_min[frontier] - half_extents,
+                                     self.node_max[frontier] + half_extents)
+            frontier = frontier[hit]
+            is_leaf = self.node_left[frontier] < 0
+            leaves.append(frontier[is_leaf])
+            inner_left = self.node_left[frontier[~is_leaf]]
+            frontier = np.concatenate((inner_left, inner_left + 1))
+        leaves = np.concatenate(leaves)
+        if len(leaves) == 0:
+            return self.order[:0]
+        counts = self.node_count[leaves]
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        return self.order[np.repeat(self.node_start[leaves], counts) + offsets]
+
+    def to_arrays(self):
+        arrays = {name: getattr(self, name) for name in self.ARRAYS}
+        arrays["node_min"] = self.node_min.astype(np.float32)
+        arrays["node_max"] = self.node_max.astype(np.float32)
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        return cls(*(arrays[name] for name in cls.ARRAYS))
+
+
+def segment_hits_boxes(start, delta, box_min, box_max):
+    """Vectorized slab test of one segment (start + t * delta, t in [0, 1]) against (N, 3) boxes."""
+    # A tiny displacement stands in for zero so axis-parallel segments need no special case
+    inv_delta = 1.0 / np.where(np.abs(delta) < 1e-12, 1e-12, delta)
+    t1 = (box_min - start) * inv_delta
+    t2 = (box_max - start) * inv_delta
+    enter = np.maximum(np.minimum(t1, t2).max(axis=1), 0.0)
+    leave = np.minimum(np.maximum(t1, t2).min(axis=1), 1.0)
+    return enter <= leave
+
+
+def _cross(a, b):
+    """Row-wise cross product of (N, 3) arrays (np.cross has high per-call overhead for small inputs)."""
+    return np.stack((a[:, 1] * b[:, 2] - a[:, 2] * b[:, 1],
+                     a[:, 2] * b[:, 0] - a[:, 0] * b[:, 2],
+                     a[:, 0] * b[:, 1] - a[:, 1] * b[:, 0]), axis=1)
+
+
+def swept_box_hits_triangles(start, delta, half_extents, triangles):
+    """
+    Exact separating-axis test of an axis-aligned box swept along a segment against (C, 3, 3) triangles.
+
+    The swept box is the Minkowski sum of the box and the segment, so candidate axes are the box normals,
+    the triangle normal, box-edge x triangle-edge, and the sweep direction crossed with both edge sets.
+    Meshes are treated as surfaces: a sweep entirely inside a closed mesh does not touch it.
+    """
+    verts = triangles - start  # (C, 3, 3)
+    edges = np.roll(verts, -1, axis=1) - verts  # (C, 3 edges, 3)
+    count = len(triangles)
+    zeros = np.zeros(count)
+
+    axes = [np.broadcast_to(axis, (count, 3)) for axis in np.identity(3)]
+    axes.append(_cross(edges[:, 0], edges[:, 1]))
+    for j in range(3):
+        fx, fy, fz = edges[:, j, 0], edges[:, j, 1], edges[:, j, 2]
+        # Unit box axes crossed with the triangle edge
+        axes.append(np.stack((zeros, -fz, fy), axis=1))
+        axes.append(np.stack((fz, zeros, -fx), axis=1))
+        axes.append(np.stack((-fy, fx, zeros), axis=1))
+    if np.any(delta):
+        delta_rows = np.broadcast_to(delta, (count, 3))
+        axes.extend(np.broadcast_to(np.cross(delta, axis), (count, 3)) for axis in np.identity(3))
+        axes.extend(_cross(delta_rows, edges[:, j]) for j in range(3))
+    axes = np.stack(axes, axis=1)  # (C, A, 3)
+
+    projections = axes @ verts.transpose(0, 2, 1)  # (C, A, 3 vertices)
+    tri_low = projections.min(axis=2)
+    tri_high = projections.max(axis=2)
+
+    radius = np.abs(axes) @ half_extents
+    sweep = axes @ delta
+    box_low = np.minimum(sweep, 0.0) - radius
+    box_high = np.maximum(sweep, 0.0) + radius
+    separated = (tri_high < box_low) | (tri_low > box_high)
+    return ~separated.any(axis=1)
+
+
+def load_mesh_data(path, cache_dir=MESH_CACHE_DIR):
+    """
+    Return (triangles, bvh) for a mesh file, building the BVH once and caching it by content hash.
+
+    Raises ValueError naming the file when it holds no triangles.
+    """
+    with open(path, "rb") as f:
+        digest = hashlib.sha256(f.read())
+    digest.update(f"|{MESH_CACHE_VERSION}|{MESH_BVH_LEAF_SIZE}".encode())
+    cache_dir = resolve_path(cache_dir) if cache_dir else None
+    cache_path = os.path.join(cache_dir, digest.hexdigest() + ".npz") if cache_dir else None
+    if cache_path and os.path.exists(cache_path):
+        try:
+            with np.load(cache_path, allow_pickle=False) as data:
+                return data["triangles"], TriangleBVH.from_arrays(data)
+        except (OSError, KeyError, ValueError) as e:
+            print(f"Mesh cache {cache_path} unreadable ({e}), rebuilding.")
+
+    triangles = load_mesh_file(path)
+    if len(triangles) == 0:
+        raise ValueError(f"Mesh file {path} contains no triangles")
+    bvh = TriangleBVH.build(triangles)
+    if cache_path:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.savez(f, triangles=triangles, **bvh.to_arrays())
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            print(f"Could not write mesh cache {cache_path}: {e}")
+    return triangles, bvh
+
+
+class MeshObstruction(Obstruction):
+    """Triangle-mesh obstruction (OBJ/STL) with a BVH for collision queries."""
+    __slots__ = ("path", "scale", "triangles", "bvh")
+
+    def __init__(self, position, path, scale=1.0, color=(0.5, 0.5, 0.5), cache_dir=MESH_CACHE_DIR):
+        """
+        Initialize a mesh obstruction.
+
+        Args:
+            position: Tuple/list (x, y, z) added to the mesh's model coordinates
+            path: OBJ or STL file
+            scale: Uniform scale from model units to cm
+            color: Tuple (r, g, b) for the color
+            cache_dir: Directory for the BVH cache, or None to disable caching
+        """
+        super().__init__(position, color)
+        self.path = path
+        self.scale = float(scale)
+        self.triangles, self.bvh = load_mesh_data(resolve_path(path), cache_dir)
+
+    def bounds(self):
+        """Return world-space (min, max) of the mesh."""
+        return (self.bvh.node_min[0] * self.scale + self.position,
+                self.bvh.node_max[0] * self.scale + self.position)
+
+    def check_sweep(self, start, end, half_extents):
+        """Return True if a box with `half_extents` swept from `start` to `end` (world space) touches the mesh."""
+        # Query in model space rather than transforming the mesh
+        model_start = (np.asarray(start, dtype=float) - self.position) / self.scale
+        model_delta = (np.asarray(end, dtype=float) - np.asarray(start, dtype=float)) / self.scale
+        model_half = np.asarray(half_extents, dtype=float) / self.scale
+        candidates = self.bvh.query_segment(model_start, model_delta, model_half)
+        if len(candidates) == 0:
+            return False
+        hits = swept_box_hits_triangles(model_start, model_delta, model_half,
+                                        self.triangles[candidates].astype(float))
+        return bool(hits.any())
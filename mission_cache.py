@@ -0,0 +1,156 @@
+import hashlib
+import json
+import os
+import config
+from paths import resolve_path
+from config import MISSION_CACHE_DIR, MISSION_CACHE_MAX_BYTES
+
+MISSION_CACHE_VERSION = 3  # Bump whenever the compiled mission layout changes so stale entries are ignored
+
+# Config constants that change the analysis, predicted trajectory or collision results
+KEY_CONFIG = ("FRAME_RATE", "LINEAR_ACCEL", "ANGULAR_ACCEL", "MIN_SPEED", "DRONE_DEFAULT_SPEED", "DRONE_INITIAL_X",
+              "DRONE_INITIAL_Y", "DRONE_INITIAL_Z", "DRONE_INITIAL_YAW", "DRONE_WIDTH", "DRONE_LENGTH",
+              "DRONE_HEIGHT", "DEFAULT_MOVE_TIME", "FLIP_TIME", "TAKEOFF_TIME", "LAND_TIME", "DYNAMICS_ENABLED",
+              "SCENE_FILE", "SCENE_SEED", "COLLISION_CELL_SIZE", "WORLD_STREAMING", "WORLD_SEED", "WORLD_TILE_SIZE",
+              "WORLD_TILE_DIR", "WORLD_MAX_TREES_PER_TILE", "WORLD_HOUSE_PROBABILITY", "WORLD_OBJECT_MARGIN",
+              "WORLD_SPAWN_CLEARANCE", "TERRAIN_FILE", "TERRAIN_CELL_SIZE", "TERRAIN_HEIGHT_SCALE",
+              "TERRAIN_ORIGIN", "TERRAIN_COLLISION_TOLERANCE", "MISSION_TRAJECTORY_RATE", "CURVE_MIN_RADIUS",
+              "CURVE_MAX_RADIUS", "CURVE_MAX_SPEED", "CURVE_CHORD_ERROR")
+
+# Wind field and drift constants, keyed only when the analysis drifts the drone
+KEY_WIND_CONFIG = ("WIND_DRIFT_FACTOR", "WIND_CELL_SIZE", "WIND_VERTICAL_CELL_SIZE", "WIND_MAX_ALTITUDE",
+                   "WIND_EXTENT", "WIND_MARGIN", "WIND_MAX_CELLS", "WIND_REFERENCE_HEIGHT", "WIND_MIN_HEIGHT",
+                   "WIND_SHEAR_EXPONENT", "WIND_TURBULENCE_INTENSITY", "WIND_GUST_PEAK_FACTOR", "WIND_GUST_GRID",
+                   "WIND_GUST_CELL_SIZE", "WIND_GUST_LENGTH_SCALE", "WIND_SHELTER_LENGTH", "WIND_SHELTER_STRENGTH",
+                   "WIND_SEED")
+
+# Files whose content shapes the result: the drone model and planner, the collision checks, scene compilation,
+# the obstructions defined in code, the wind drift, the terrain and the streamed world
+KEY_SOURCES = ("drone.py", "motion_planner.py", "curves.py", "collision_detector.py", "primitives.py", "scene.py",
+               "mesh.py", "obstruction_visuals.py", "wind.py", "terrain.py", "world_streaming.py")
+
+
+def _file_digest(path):
+    with open(resolve_path(path), "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _scene_mesh_paths(path):
+    """OBJ/STL files referenced by a scene file, including mesh templates of scatter groups."""
+    from scene import parse_scene
+    with open(resolve_path(path), "rb") as f:
+        scene = parse_scene(f.read(), path)
+    paths = []
+
+    def visit(value):
+        if isinstance(value, dict):
+            if value.get("type") == "mesh" or value.get("template") == "mesh":
+                mesh_path = value.get("path", value.get("params", {}).get("path"))
+                if isinstance(mesh_path, str) and mesh_path not in paths:
+                    paths.append(mesh_path)
+            for item in value.values():
+                visit(item)
+        elif isinstance(value, list):
+            for item in value:
+                visit(item)
+
+    visit(scene)
+    return tuple(paths)
+
+
+def mission_key(commands, weather_data=None):
+    """
+    Content hash of everything a compiled mission depends on.
+
+    The command list, the scene and terrain files and the meshes the scene references (by content), the
+    KEY_CONFIG constants, the KEY_SOURCES files and the wind, so editing any of them compiles the mission again
+    while unchanged launches reuse the cached one.
+
+    Args:
+        commands: List of (command, delay) tuples
+        weather_data: Weather whose wind drifts the analyzed drone, or None when there is no wind
+    """
+    digest = hashlib.sha256(f"{MISSION_CACHE_VERSION}|".encode())
+    digest.update(json.dumps([[cmd, delay] for cmd, delay in commands]).encode())
+    digest.update(json.dumps({name: getattr(config, name) for name in KEY_CONFIG}, sort_keys=True).encode())
+    paths = KEY_SOURCES + tuple(path for path in (config.SCENE_FILE, config.TERRAIN_FILE) if path)
+    if config.SCENE_FILE:
+        paths += _scene_mesh_paths(config.SCENE_FILE)
+    for path in paths:
+        digest.update(f"|{path}:{_file_digest(path)}".encode())
+    if weather_data:
+        wind = {name: weather_data.get(name) for name in ("wind_speed", "wind_direction", "wind_gust")}
+        wind.update({name: getattr(config, name) for name in KEY_WIND_CONFIG})
+        digest.update(json.dumps(wind, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+"""Persistent cache of compiled missions, one JSON file per mission_key.
+
+Entries hold the command timeline from the analysis, the predicted trajectory and the collisions along it.
+A hit refreshes the entry's modification time; every store evicts the least recently used entries until the
+directory is under max_bytes.
+"""
+class MissionCache:
+    def __init__(self, cache_dir=MISSION_CACHE_DIR, max_bytes=MISSION_CACHE_MAX_BYTES):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory of the cache entries, relative paths resolve from the project directory
+            max_bytes: Total size the entries are trimmed to after each store
+        """
+        self.cache_dir = resolve_path(cache_dir)
+        self.max_bytes = max_bytes
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + ".json")
+
+    def get(self, key):
+        """Compiled mission for key, or None when it is not cached."""
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                mission = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Mission cache {path} unreadable ({e}), recompiling.")
+            return None
+        try:
+            os.utime(path)  # Mark as recently used
+        except OSError:
+            pass
+        return mission
+
+    def put(self, key, mission):
+        """Store a compiled mission (atomic replace), then evict old entries."""
+        path = self._path(key)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(mission, f, separators=(",", ":"))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Could not write mission cache {path}: {e}")
+            return
+        self.evict()
+
+    def evict(self):
+        """Delete least recently used entries until the cache is no larger than max_bytes."""
+        entries = []
+        with os.scandir(self.cache_dir) as scan:
+            for entry in scan:
+                if entry.name.endswith(".json"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
@@ -0,0 +1,147 @@
+import threading
+import time
+from drone import Drone
+from motion_planner import MotionPlanner
+from config import (LINEAR_ACCEL, ANGULAR_ACCEL, MIN_SPEED, CRIT_BATTERY_LVL, MISSION_COMMAND_MARGIN,
+                    MISSION_BATTERY_POLL_INTERVAL)
+
+MOVEMENT_COMMANDS = {"takeoff", "land", "up", "down", "left", "right", "forward", "back", "cw", "ccw", "flip", "go",
+                     "curve"}
+
+
+"""Predicts how long commands sent to a real drone keep it moving.
+
+Each command is replayed on a shadow Drone, so the MotionPlanner sees the same start and target states as in
+the simulator. Call predict() for every command sent, in order, including the ones that get no prediction.
+"""
+class MotionPredictor:
+    def __init__(self, linear_accel=LINEAR_ACCEL, angular_accel=ANGULAR_ACCEL):
+        """
+        Initialize the shadow drone and its planner.
+
+        Args:
+            linear_accel: Linear acceleration of the planner (cm/s^2)
+            angular_accel: Angular acceleration of the planner (deg/s^2)
+        """
+        self.shadow_drone = Drone()
+        self.motion_planner = MotionPlanner(self.shadow_drone, linear_accel, angular_accel)
+
+    def predict(self, cmd):
+        """Predicted motion time of a command from the shadow drone's current state, 0 if it does not move."""
+        start_state = self.shadow_drone.get_state()
+        max_speed = max(self.shadow_drone.speed, MIN_SPEED)
+        self.shadow_drone.execute_command(cmd)
+        if cmd.split()[0].lower() not in MOVEMENT_COMMANDS:
+            return 0
+        return self.motion_planner.calculate_move_time(cmd, start_state, self.shadow_drone.get_state(), max_speed)
+
+
+"""Runs a command list against a real (or emulated) drone without fixed sleeps.
+
+Each command is sent once the previous one has been acknowledged and its predicted motion time (from a
+MotionPredictor, as in the simulator) plus MISSION_COMMAND_MARGIN has passed. A background thread watches the
+battery; below CRIT_BATTERY_LVL the mission is aborted and the drone lands.
+"""
+class MissionExecutor:
+    def __init__(self, drone, commands, margin=MISSION_COMMAND_MARGIN, critical_battery=CRIT_BATTERY_LVL,
+                 poll_interval=MISSION_BATTERY_POLL_INTERVAL, state_publisher=None):
+        """
+        Initialize the executor.
+
+        Args:
+            drone: Object with execute_command(cmd, expected_duration=None) -> response, execute_if_idle(cmd)
+                -> response or None while another command is in flight, and get_state() (e.g. TelloWrapper)
+            commands: List of (command, delay) tuples; the delays are ignored
+            margin: Seconds added to every predicted motion time
+            critical_battery: Battery percent that aborts the mission
+            poll_interval: Seconds between battery checks
+            state_publisher: Optional SharedDroneState updated with telemetry on every battery check
+        """
+        self.drone = drone
+        self.commands = commands
+        self.margin = margin
+        self.critical_battery = critical_battery
+        self.poll_interval = poll_interval
+        self.state_publisher = state_publisher
+        self.predictor = MotionPredictor()
+        self.abort = threading.Event()
+        self.battery = None
+        self._finished = threading.Event()
+        self._monitor = None
+
+    def read_battery(self):
+        """Battery percent from streamed telemetry, falling back to a battery? query when the link is idle."""
+        battery = self.drone.get_state().get("battery")
+        if battery is None:
+            # Skipped while a mission command is pending; the next poll tries again
+            response = self.drone.execute_if_idle("battery?")
+            battery = int(response) if response and response.isdigit() else None
+        return battery
+
+    def _monitor_battery(self):
+        while not self._finished.is_set():
+            try:
+                battery = self.read_battery()
+            except Exception as e:
+                print(f"Battery check failed: {e!r}")
+                battery = None
+            if self.state_publisher:
+                self.state_publisher.write(self.drone.get_state(), battery)
+            if battery is not None:
+                self.battery = battery
+                if battery < self.critical_battery and not self.abort.is_set():
+                    print(f"Battery critical ({battery}%). Aborting mission.")
+                    self.abort.set()
+            self._finished.wait(self.poll_interval)
+
+    def _land(self):
+        landing = self.predictor.predict("land")
+        print(f"land: {self.drone.execute_command('land', expected_duration=landing)}")
+
+    def run(self):
+        """Execute the mission. Returns True if every command was sent, False if it was aborted."""
+        battery = self.read_battery()
+        if battery is not None and battery < self.critical_battery:
+            print(f"Battery too low ({battery}%). Aborting.")
+            return False
+
+        self._monitor = threading.Thread(target=self._monitor_battery, name="battery-monitor", daemon=True)
+        self._monitor.start()
+        mission_start = time.monotonic()
+        flying = False
+        try:
+            for i, (cmd, _) in enumerate(self.commands, 1):
+                if self.abort.is_set():
+                    break
+                predicted = self.predictor.predict(cmd)
+                sent = time.monotonic()
+                response = self.drone.execute_command(cmd, expected_duration=predicted)
+                acked = time.monotonic()
+                print(f"[{i}] {cmd}: {response} ({acked - sent:.2f}s, predicted {predicted:.2f}s)")
+
+                command = cmd.split()[0].lower()
+                if response == "ok":
+                    if command == "takeoff":
+                        flying = True
+                    elif command in ("land", "emergency"):
+                        flying = False
+                # A slow ack already covers the motion; otherwise wait out the rest of the prediction
+                remaining = sent + predicted + self.margin - time.monotonic() if predicted > 0 else 0
+                if remaining > 0:
+                    self.abort.wait(remaining)
+        except BaseException:
+            # A crash or Ctrl+C must not leave the drone hovering unattended
+            if flying:
+                print("Mission failed while flying. Landing.")
+                self._land()
+            raise
+        finally:
+            self._finished.set()
+            self._monitor.join(timeout=self.poll_interval + 1)
+
+        if self.abort.is_set():
+            if flying:
+                self._land()
+            return False
+        print(f"Mission completed in {time.monotonic() - mission_start:.1f}s.")
+        return True
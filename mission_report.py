@@ -0,0 +1,129 @@
+import json
+import os
+import sys
+import uuid
+from paths import resolve_path
+from config import MISSION_REPORT_ECHO, MISSION_REPORT_BUFFER_LINES
+
+# One value per command and phase; None where a field does not apply
+COLUMNS = (
+    "run",              # Report id shared by every row of one simulator run
+    "phase",            # "analysis" (predicted) or "execution" (simulated)
+    "index",            # 1-based position of the command in the sequence
+    "command",
+    "delay",            # Seconds scheduled before the next command
+    "start_time",       # Seconds after the start of the sequence
+    "duration",         # Predicted motion time in seconds, 0 for instant commands
+    "response",         # Drone response (predicted in analysis), None when ignored
+    "ignored",          # Command arrived while the drone was still moving
+    "suggested_delay",  # Analysis: delay the previous command needs so this one is not ignored
+    "collision_id",     # Execution: index of the obstruction hit in the world's obstruction list, when known
+    "collision_type",   # Class of the obstruction hit (TerrainContact for the ground), None without a collision
+    "collision_x",
+    "collision_y",
+    "collision_z",
+    "min_clearance",    # Execution: smallest obstruction clearance (cm) while the command ran
+    "battery",          # Battery percent when the command started
+)
+ECHO_MODES = ("live", "buffered", "off")
+
+
+"""Structured record of a simulated mission.
+
+The simulator adds one row per command and phase instead of only printing it, and keeps the rows as columns
+(one list per field), so they can be written as JSON Lines or handed to a columnar format in one call. The
+human-readable lines still go to the console, either as they happen ("live"), collected and written in blocks
+("buffered", so batch runs are not bound by stdout) or not at all ("off").
+"""
+class MissionReport:
+    def __init__(self, echo=MISSION_REPORT_ECHO, stream=None, buffer_lines=MISSION_REPORT_BUFFER_LINES, run=None):
+        """
+        Initialize an empty report.
+
+        Args:
+            echo: One of ECHO_MODES
+            stream: File the console lines are written to, sys.stdout when None
+            buffer_lines: Buffered lines kept before they are written in one block
+            run: Id stored in every row, a random one when None
+        """
+        if echo not in ECHO_MODES:
+            raise ValueError(f"Unknown echo mode '{echo}', expected one of {ECHO_MODES}")
+        self.echo = echo
+        self.stream = stream
+        self.buffer_lines = buffer_lines
+        self.run = run if run is not None else uuid.uuid4().hex[:12]
+        self.columns = {name: [] for name in COLUMNS}
+        self._lines = []
+
+    def __len__(self):
+        return len(self.columns["run"])
+
+    def add(self, **fields):
+        """Append a row and return its index; fields not given are None."""
+        unknown = set(fields) - set(COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown report fields: {sorted(unknown)}")
+        fields["run"] = self.run
+        for name, column in self.columns.items():
+            column.append(fields.get(name))
+        return len(self) - 1
+
+    def update(self, row, **fields):
+        """Set fields of an existing row."""
+        for name, value in fields.items():
+            self.columns[name][row] = value
+
+    def log(self, line):
+        """Console line for a human reader, written according to the echo mode."""
+        if self.echo == "live":
+            print(line, file=self.stream or sys.stdout)
+        elif self.echo == "buffered":
+            self._lines.append(line)
+            if len(self._lines) >= self.buffer_lines:
+                self.flush()
+
+    def flush(self):
+        """Write the buffered console lines in one call."""
+        if self._lines:
+            stream = self.stream or sys.stdout
+            stream.write("\n".join(self._lines) + "\n")
+            stream.flush()
+            self._lines = []
+
+    def rows(self, phase=None):
+        """Rows as dictionaries, optionally only those of one phase."""
+        names = list(self.columns)
+        rows = (dict(zip(names, values)) for values in zip(*self.columns.values()))
+        return [row for row in rows if phase is None or row["phase"] == phase]
+
+    def summary(self):
+        """Counts and extremes of the execution phase (the analysis phase when nothing was executed)."""
+        rows = self.rows("execution") or self.rows("analysis")
+        clearances = [row["min_clearance"] for row in rows if row["min_clearance"] is not None]
+        batteries = [row["battery"] for row in rows if row["battery"] is not None]
+        return {
+            "run": self.run,
+            "commands": len(rows),
+            "ignored": sum(1 for row in rows if row["ignored"]),
+            "collisions": sum(1 for row in rows if row["collision_type"] is not None),
+            "min_clearance": min(clearances) if clearances else None,
+            "final_battery": batteries[-1] if batteries else None,
+        }
+
+    def to_jsonl(self, path, append=True):
+        """Write one JSON object per row, in a single write; appends by default so runs accumulate."""
+        path = resolve_path(path)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        text = "".join(json.dumps(row) + "\n" for row in self.rows())
+        with open(path, "a" if append else "w") as f:
+            f.write(text)
+        return path
+
+    def to_parquet(self, path):
+        """Write the columns as a Parquet file (requires pyarrow)."""
+        import pyarrow
+        import pyarrow.parquet
+        path = resolve_path(path)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        pyarrow.parquet.write_table(pyarrow.table(self.columns), path)
+        return path
@@ -1,5 +1,7 @@
 import math
-from config import (DEFAULT_MOVE_TIME, FLIP_TIME, TAKEOFF_TIME, LAND_TIME)
+from curves import curve_path, fillet
+from config import (DEFAULT_MOVE_TIME, FLIP_TIME, TAKEOFF_TIME, LAND_TIME, CURVE_MIN_RADIUS, CURVE_MAX_RADIUS,
+                    CURVE_MAX_SPEED, CURVE_CORNER_DISTANCE, CURVE_DELAY_MARGIN)
 
 class MotionPlanner:
     def __init__(self, drone, linear_accel, angular_accel):
@@ -7,9 +9,15 @@ class MotionPlanner:
         self.linear_accel = linear_accel
         self.angular_accel = angular_accel
 
-    def interpolate_state(self, current, target, elapsed, total_time, accel_time, coast_time):
-        """Interpolate with trapezoidal velocity profile, handling zero distance."""
-        distance = self.get_distance(current, target)
+    def interpolate_state(self, current, target, elapsed, total_time, accel_time, coast_time, path=None):
+        """
+        Interpolate with trapezoidal velocity profile, handling zero distance.
+
+        With a path (see plan_path) the profile runs along its arc length. The path is shifted by the offsets of
+        `current` from its start and of `target` from its end, blended by progress like Simulator._check_motion,
+        so drift applied to the start and target states carries over to the curve.
+        """
+        distance = path.length if path is not None else self.get_distance(current, target)
         if distance == 0 or total_time <= 0:
             return target.copy()
 
@@ -20,14 +28,22 @@ class MotionPlanner:
             coast_elapsed = elapsed - accel_time
             coast_speed = self.drone.speed
             progress = (accel_dist + coast_speed * coast_elapsed) / distance
-        else:  # Deceleration
+        else:  # Deceleration: mirror of the acceleration, measured back from the end of the move
             decel_elapsed = total_time - elapsed
-            decel_dist = 0.5 * self.linear_accel * (accel_time ** 2)
-            total_dist = distance
-            progress = (total_dist - decel_dist + 0.5 * self.linear_accel * (decel_elapsed ** 2)) / total_dist
+            progress = (distance - 0.5 * self.linear_accel * (decel_elapsed ** 2)) / distance
 
         progress = min(max(progress, 0.0), 1.0)
 
+        if path is not None:
+            point = path.point_at(progress * distance)
+            for key, value, origin, end in zip(("x", "y", "z"), point, path.start, path.end):
+                start_offset = current[key] - origin
+                end_offset = target[key] - end
+                current[key] = value + start_offset + (end_offset - start_offset) * progress
+            if progress == 1.0:
+                current.update(target)
+            return current
+
         for key in current:
             current[key] = current[key] + (target[key] - current[key]) * progress
             if abs(current[key] - target[key]) < 0.1:
@@ -50,6 +66,12 @@ class MotionPlanner:
             distance = self.get_distance(start_state, end_state)
             return self._calc_linear_time(distance, self.linear_accel)
 
+        def curve_time():
+            path = self.plan_path(cmd, start_state, end_state)
+            if path is None:  # Malformed curve
+                return DEFAULT_MOVE_TIME
+            return self._calc_linear_time(path.length, self.linear_accel)
+
         def linear_time():
             try:
                 distance = int(parts[1])
@@ -66,6 +88,7 @@ class MotionPlanner:
 
         COMMAND_TIMES = {
             "go": go_time,
+            "curve": curve_time,
             "up": linear_time,
             "down": linear_time,
             "left": linear_time,
@@ -81,16 +104,86 @@ class MotionPlanner:
 
         return COMMAND_TIMES.get(command, lambda: DEFAULT_MOVE_TIME)()
 
-    def _calc_linear_time(self, distance, accel):
-        """Calculate time for linear movement with acceleration."""
+    def plan_path(self, cmd, start_state, end_state):
+        """
+        Path of a command that does not fly straight, or None.
+
+        "curve" gives the arc from start_state through its first point to end_state (its second point, raised
+        to the ground like "go"); the arc-length table is built here once, not per frame.
+        """
+        parts = cmd.split()
+        if not parts or parts[0].lower() != "curve":
+            return None
+        try:
+            via = tuple(int(value) for value in parts[1:4])
+        except ValueError:
+            return None
+        if len(via) != 3:
+            return None
+        return curve_path(tuple(start_state[key] for key in ("x", "y", "z")), via,
+                          tuple(end_state[key] for key in ("x", "y", "z")))
+
+    def smooth_path_commands(self, start_state, waypoints, speed, corner_distance=CURVE_CORNER_DISTANCE):
+        """
+        Commands flying through waypoints along straight legs joined by tangent arcs.
+
+        Each corner is rounded with a "curve" that starts up to corner_distance before the waypoint; corners
+        too sharp for the smallest curve radius are flown through with "go". Coordinates are those of "go".
+
+        Args:
+            start_state: Drone state the path starts from
+            waypoints: (x, y, z) positions to fly through, the last one is reached exactly
+            speed: cm/s for the legs ("go"), curves are capped at CURVE_MAX_SPEED
+            corner_distance: How far before a waypoint its corner starts being rounded (cm)
+        Returns:
+            List of (command, delay) tuples; each delay is the command's predicted time plus CURVE_DELAY_MARGIN
+        """
+        curve_speed = min(speed, CURVE_MAX_SPEED)
+        # Rounded coordinates move the arc slightly, so stay clear of the radius limits the drone checks
+        min_radius, max_radius = CURVE_MIN_RADIUS * 1.05, CURVE_MAX_RADIUS * 0.95
+        position = tuple(start_state[key] for key in ("x", "y", "z"))
+        points = [position] + [tuple(waypoint) for waypoint in waypoints]
+        commands = []
+
+        def add(cmd, path_length, cmd_speed):
+            duration = self._calc_linear_time(path_length, self.linear_accel, cmd_speed)
+            commands.append((cmd, round(duration + CURVE_DELAY_MARGIN, 2)))
+
+        def go(point):
+            target = tuple(int(round(value)) for value in point)
+            length = math.dist(position, target)
+            if length >= 1:
+                add(f"go {target[0]} {target[1]} {target[2]} {speed}", length, speed)
+            return target if length >= 1 else position
+
+        for i in range(1, len(points)):
+            corner = None
+            if i + 1 < len(points):
+                corner = fillet(points[i - 1], points[i], points[i + 1], corner_distance, min_radius, max_radius)
+            if corner is None:
+                position = go(points[i])
+                continue
+            arc_start, via, arc_end = corner
+            position = go(arc_start)
+            via = tuple(int(round(value)) for value in via)
+            arc_end = tuple(int(round(value)) for value in arc_end)
+            length = curve_path(position, via, arc_end).length
+            add(f"curve {' '.join(str(value) for value in via + arc_end)} {curve_speed}", length, curve_speed)
+            position = arc_end
+            points[i] = arc_end  # The next leg starts where the arc ends
+        return commands
+
+    def _calc_linear_time(self, distance, accel, speed=None):
+        """Calculate time for linear movement with acceleration (at the drone's speed unless given)."""
         if distance == 0:
             return DEFAULT_MOVE_TIME
-        accel_time = self.drone.speed / accel
+        speed = speed or self.drone.speed
+        accel_time = speed / accel
         accel_dist = 0.5 * accel * (accel_time ** 2)
         if distance <= 2 * accel_dist:
             return 2 * math.sqrt(distance / accel)
         coast_dist = distance - 2 * accel_dist
-        coast_time = coast_dist / self.drone.speed
+        coast_time = coast_dist / speed
         return 2 * accel_time + coast_time
 
     def _calc_angular_time(self, angle, accel):
@@ -0,0 +1,304 @@
+import ctypes
+import math
+import numpy as np
+from OpenGL.GL import *
+from OpenGL.GLU import *
+from obstructions import (CylindricalObstruction, RectangularObstruction, PyramidalObstruction,
+                          SphereObstruction, CompositeObstruction)
+
+"""Render-side adapter for the pure-data obstructions; all GL resources are created lazily here"""
+
+_quadric = None
+
+
+def _get_quadric():
+    """Shared GLU quadric, created on first sphere draw."""
+    global _quadric
+    if _quadric is None:
+        _quadric = gluNewQuadric()
+        gluQuadricDrawStyle(_quadric, GLU_FILL)
+        gluQuadricNormals(_quadric, GLU_SMOOTH)
+    return _quadric
+
+
+def _draw_cylinder(obstruction):
+    """Draw the cylindrical shape using OpenGL."""
+    glColor3f(*obstruction.color)
+
+    # Draw the cylinder body
+    glBegin(GL_QUAD_STRIP)
+    for i in range(obstruction.segments + 1):
+        angle = 2.0 * math.pi * i / obstruction.segments
+        x = obstruction.radius * math.cos(angle)
+        y = obstruction.radius * math.sin(angle)
+
+        # Bottom vertex
+        glVertex3f(x, y, 0)
+        # Top vertex
+        glVertex3f(x, y, obstruction.height)
+    glEnd()
+
+    # Draw top and bottom caps
+    for cap_z in [0, obstruction.height]:
+        glBegin(GL_TRIANGLE_FAN)
+        glVertex3f(0, 0, cap_z)  # Center point
+        for i in range(obstruction.segments + 1):
+            angle = 2.0 * math.pi * i / obstruction.segments
+            x = obstruction.radius * math.cos(angle)
+            y = obstruction.radius * math.sin(angle)
+            glVertex3f(x, y, cap_z)
+        glEnd()
+
+
+def _draw_box(obstruction):
+    """Draw the rectangular prism using OpenGL."""
+    glColor3f(*obstruction.color)
+
+    # Apply rotation
+    glRotatef(obstruction.rotation, 0, 0, 1)
+
+    # Half dimensions for centered drawing
+    half_width = obstruction.half_width
+    half_depth = obstruction.half_depth
+    height = obstruction.height
+
+    # Define vertices for a box centered at origin
+    vertices = [
+        # Bottom face
+        (-half_width, -half_depth, 0),
+        (half_width, -half_depth, 0),
+        (half_width, half_depth, 0),
+        (-half_width, half_depth, 0),
+
+        # Top face
+        (-half_width, -half_depth, height),
+        (half_width, -half_depth, height),
+        (half_width, half_depth, height),
+        (-half_width, half_depth, height)
+    ]
+
+    # Define faces using vertex indices
+    faces = [
+        (0, 1, 2, 3),  # Bottom
+        (4, 5, 6, 7),  # Top
+        (0, 1, 5, 4),  # Front
+        (2, 3, 7, 6),  # Back
+        (0, 3, 7, 4),  # Left
+        (1, 2, 6, 5)  # Right
+    ]
+
+    # Draw each face as a quad
+    glBegin(GL_QUADS)
+    for face in faces:
+        for vertex_idx in face:
+            glVertex3fv(vertices[vertex_idx])
+    glEnd()
+
+    # Draw borders
+    glEnable(GL_POLYGON_OFFSET_LINE)
+    glPolygonOffset(-1.0, -1.0)  # Push lines slightly forward to avoid z-fighting
+    glLineWidth(1.5)  # Thicker lines for visibility
+    glColor3f(1.0, 1.0, 1.0)  # Black borders (adjust as needed)
+
+    glBegin(GL_LINE_LOOP)
+    for face in faces:
+        for vertex_idx in face:
+            glVertex3fv(vertices[vertex_idx])
+        glEnd()  # End after each face to restart GL_LINE_LOOP
+        glBegin(GL_LINE_LOOP)  # Start new loop for next face
+    glEnd()  # Final end for the last face
+
+    glDisable(GL_POLYGON_OFFSET_LINE)
+
+
+def _draw_pyramid(obstruction):
+    """Draw the pyramid using OpenGL."""
+    glColor3f(*obstruction.color)
+
+    # Apply rotation
+    glRotatef(obstruction.rotation, 0, 0, 1)
+
+    # Half dimensions for centered drawing
+    half_width = obstruction.half_width
+    half_depth = obstruction.half_depth
+
+    # Define base vertices
+    base_vertices = [
+        (-half_width, -half_depth, 0),
+        (half_width, -half_depth, 0),
+        (half_width, half_depth, 0),
+        (-half_width, half_depth, 0)
+    ]
+
+    # Define apex
+    apex = (0, 0, obstruction.height)
+
+    # Draw base (one quad)
+    glBegin(GL_QUADS)
+    for vertex in base_vertices:
+        glVertex3fv(vertex)
+    glEnd()
+
+    # Draw triangular faces (four triangles)
+    glBegin(GL_TRIANGLES)
+    for i in range(4):
+        # Get current and next vertex
+        v1 = base_vertices[i]
+        v2 = base_vertices[(i + 1) % 4]
+
+        # Draw triangle from v1 to v2 to apex
+        glVertex3fv(v1)
+        glVertex3fv(v2)
+        glVertex3fv(apex)
+    glEnd()
+
+
+def _draw_sphere(obstruction):
+    """Draw the sphere using OpenGL."""
+    glColor3f(*obstruction.color)
+    gluSphere(_get_quadric(), obstruction.radius, obstruction.slices, obstruction.stacks)
+
+
+SHAPE_DRAWERS = {
+    CylindricalObstruction: _draw_cylinder,
+    RectangularObstruction: _draw_box,
+    PyramidalObstruction: _draw_pyramid,
+    SphereObstruction: _draw_sphere,
+}
+
+
+def draw_obstruction(obstruction):
+    """Draw an obstruction (or every component of a composite) at its world position in immediate mode."""
+    if isinstance(obstruction, CompositeObstruction):
+        for component in obstruction.components:
+            draw_obstruction(component)
+        return
+    glPushMatrix()
+    glTranslatef(*obstruction.position)
+    SHAPE_DRAWERS[type(obstruction)](obstruction)
+    glPopMatrix()
+
+
+class ObstructionBatch:
+    """Static group of obstructions compiled into a single display list."""
+
+    def __init__(self, obstructions):
+        """
+        Initialize a batch.
+
+        Args:
+            obstructions: Sequence of obstructions, or a callable returning one; it is only
+                evaluated when the display list is first compiled
+        """
+        self._obstructions = obstructions
+        self.display_list = None
+
+    @property
+    def uploaded(self):
+        """Whether the display list is compiled; the first render() compiles it."""
+        return self.display_list is not None
+
+    def create_display_list(self):
+        """Compile every obstruction of the batch into one display list."""
+        obstructions = self._obstructions() if callable(self._obstructions) else self._obstructions
+        list_id = glGenLists(1)
+        glNewList(list_id, GL_COMPILE)
+        for obstruction in obstructions:
+            draw_obstruction(obstruction)
+        glEndList()
+        return list_id
+
+    def render(self):
+        """Render the whole batch with one call."""
+        if self.display_list is None:
+            self.display_list = self.create_display_list()
+        glCallList(self.display_list)
+
+    def delete(self):
+        """Clean up OpenGL resources."""
+        if self.display_list is not None:
+            glDeleteLists(self.display_list, 1)
+            self.display_list = None
+
+
+class MeshRenderer:
+    """Renders a mesh obstruction from a vertex buffer object (interleaved positions and flat normals)."""
+
+    def __init__(self, mesh):
+        self.mesh = mesh
+        self.vbo = None
+        self.vertex_count = 0
+
+    @property
+    def uploaded(self):
+        """Whether the vertex buffer is on the GPU; the first render() uploads it."""
+        return self.vbo is not None
+
+    def _upload(self):
+        triangles = np.asarray(self.mesh.triangles, dtype=np.float32)
+        normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+        lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+        normals /= np.where(lengths > 0, lengths, 1.0)
+        vertices = np.empty((len(triangles), 3, 6), dtype=np.float32)
+        vertices[:, :, :3] = triangles
+        vertices[:, :, 3:] = normals[:, None, :]
+
+        self.vbo = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glBufferData(GL_ARRAY_BUFFER, vertices.nbytes, vertices, GL_STATIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        self.vertex_count = len(triangles) * 3
+
+    def render(self):
+        """Draw the mesh, uploading its vertex buffer on first use."""
+        if self.vbo is None:
+            self._upload()
+        stride = 6 * 4
+        glPushMatrix()
+        glTranslatef(*self.mesh.position)
+        glScalef(self.mesh.scale, self.mesh.scale, self.mesh.scale)
+        glEnable(GL_NORMALIZE)  # Keep lighting correct under scaling
+        glColor3f(*self.mesh.color)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_NORMAL_ARRAY)
+        glVertexPointer(3, GL_FLOAT, stride, ctypes.c_void_p(0))
+        glNormalPointer(GL_FLOAT, stride, ctypes.c_void_p(12))
+        glDrawArrays(GL_TRIANGLES, 0, self.vertex_count)
+        glDisableClientState(GL_NORMAL_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glDisable(GL_NORMALIZE)
+        glPopMatrix()
+
+    def delete(self):
+        """Clean up OpenGL resources."""
+        if self.vbo is not None:
+            glDeleteBuffers(1, [self.vbo])
+            self.vbo = None
+
+
+def create_renderables(obstructions):
+    """One batch for all primitive obstructions plus a vertex-buffer renderer per mesh."""
+    meshes = [o for o in obstructions if hasattr(o, 'check_sweep')]
+    primitives = [o for o in obstructions if not hasattr(o, 'check_sweep')]
+    return [ObstructionBatch(primitives)] + [MeshRenderer(mesh) for mesh in meshes]
+
+
+def create_scene_batches(scene):
+    """One ObstructionBatch per scene tile; obstruction objects are created when a batch first compiles."""
+    batches = []
+    for start, end in zip(scene.batch_starts[:-1], scene.batch_starts[1:]):
+        members = scene.batch_order[start:end]
+        batches.append(ObstructionBatch(lambda members=members: [scene.obstructions[i] for i in members]))
+    for owner in scene.mesh_owners:
+        batches.append(MeshRenderer(scene.obstructions[owner]))
+    return batches
+
+
+def cleanup():
+    """Release shared GL helpers."""
+    global _quadric
+    if _quadric is not None:
+        gluDeleteQuadric(_quadric)
+        _quadric = None
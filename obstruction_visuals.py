@@ -1,8 +1,9 @@
 import random
+from config import SCENE_SEED
 from obstructions import (CylindricalObstruction, RectangularObstruction,
                          PyramidalObstruction, SphereObstruction, CompositeObstruction)
 
-"""This method is used to create visual obstructions for the simulation"""
+"""This method is used to create visual obstructions for the simulation (used when config.SCENE_FILE is None)"""
 def create_obstructions():
     obstructions = []
     obstructions.append(CylindricalObstruction((100, -700, 0), 20, 150, color=(0.6, 0.7, 0.6)))
@@ -11,15 +12,16 @@ def create_obstructions():
     obstructions.append(create_basic_house_1((-500, 200, 0)))
     obstructions.append(create_basic_tree_1((0, -700, 0)))
 
-    # Generate random trees near y=1000
+    # Generate random trees near y=1000 (seeded so every run builds the same world)
+    rng = random.Random(SCENE_SEED)
     num_trees = 20  # Adjust as desired
     for _ in range(num_trees):
-        x = random.uniform(-1000, 1000)  # Random x within 2000x2000 grid
-        y = random.uniform(600, 1000)  # y between 800 and 1000 (900 ± 100)
+        x = rng.uniform(-1000, 1000)  # Random x within 2000x2000 grid
+        y = rng.uniform(600, 1000)  # y between 800 and 1000 (900 ± 100)
         z = 0  # Ground level
-        trunk_height = random.uniform(100, 400)  # Random height between 300 and 700
-        trunk_radius = random.uniform(10, 20)  # Slightly varied trunk width
-        canopy_radius = random.uniform(40, 75)  # Varied canopy size
+        trunk_height = rng.uniform(100, 400)  # Random height between 300 and 700
+        trunk_radius = rng.uniform(10, 20)  # Slightly varied trunk width
+        canopy_radius = rng.uniform(40, 75)  # Varied canopy size
         tree = create_basic_tree_1((x, y, z), trunk_radius, trunk_height, canopy_radius)
         obstructions.append(tree)
 
@@ -1,12 +1,16 @@
 import numpy as np
-from OpenGL.GL import *
-from abc import ABC, abstractmethod
 import math
-from OpenGL.GLU import *
 
+"""Pure-data obstruction geometry.
 
-class Obstruction(ABC):
-    """Abstract base class for all obstructions in the simulation."""
+These classes hold no OpenGL state, so collision, analysis and planning code can build and pickle them
+without a GL context (worker processes, tests, headless runs). Rendering lives in obstruction_renderer.
+"""
+
+
+class Obstruction:
+    """Base class for all obstructions in the simulation."""
+    __slots__ = ("position", "color")
 
     def __init__(self, position, color=(0.5, 0.5, 0.5)):
         """
@@ -17,41 +21,16 @@ class Obstruction(ABC):
             color: Tuple (r, g, b) for the color of the obstruction
         """
         self.position = np.array(position, dtype=float)
-        self.color = color
-        # Each obstruction type must create its own display list
-        self.display_list = None
-
-    def create_display_list(self):
-        """Create an OpenGL display list for efficient rendering."""
-        list_id = glGenLists(1)
-        glNewList(list_id, GL_COMPILE)
-        self._draw_shape()
-        glEndList()
-        return list_id
-
-    def render(self):
-        """Render the obstruction using its display list."""
-        if self.display_list is None:
-            self.display_list = self.create_display_list()
-
-        glPushMatrix()
-        glTranslatef(*self.position)
-        glCallList(self.display_list)
-        glPopMatrix()
-
-    @abstractmethod
-    def _draw_shape(self):
-        """Draw the shape - must be implemented by subclasses."""
-        pass
-
-    def delete(self):
-        """Clean up OpenGL resources."""
-        if self.display_list is not None:
-            glDeleteLists(self.display_list, 1)
+        self.color = tuple(color)
+
+    def __repr__(self):
+        x, y, z = self.position
+        return f"{type(self).__name__}(position=({x:g}, {y:g}, {z:g}))"
 
 
 class CylindricalObstruction(Obstruction):
     """Cylindrical obstruction with configurable radius and height."""
+    __slots__ = ("radius", "height", "segments")
 
     def __init__(self, position, radius, height, color=(0.5, 0.5, 0.5), segments=16):
         """
@@ -68,38 +47,11 @@ class CylindricalObstruction(Obstruction):
         self.radius = radius
         self.height = height
         self.segments = segments
-        self.display_list = self.create_display_list()
-
-    def _draw_shape(self):
-        """Draw the cylindrical shape using OpenGL."""
-        glColor3f(*self.color)
-
-        # Draw the cylinder body
-        glBegin(GL_QUAD_STRIP)
-        for i in range(self.segments + 1):
-            angle = 2.0 * math.pi * i / self.segments
-            x = self.radius * math.cos(angle)
-            y = self.radius * math.sin(angle)
-
-            # Bottom vertex
-            glVertex3f(x, y, 0)
-            # Top vertex
-            glVertex3f(x, y, self.height)
-        glEnd()
-
-        # Draw top and bottom caps
-        for cap_z in [0, self.height]:
-            glBegin(GL_TRIANGLE_FAN)
-            glVertex3f(0, 0, cap_z)  # Center point
-            for i in range(self.segments + 1):
-                angle = 2.0 * math.pi * i / self.segments
-                x = self.radius * math.cos(angle)
-                y = self.radius * math.sin(angle)
-                glVertex3f(x, y, cap_z)
-            glEnd()
+
 
 class RectangularObstruction(Obstruction):
     """Rectangular prism obstruction with configurable dimensions."""
+    __slots__ = ("dimensions", "rotation", "half_width", "half_depth", "height", "rot_matrix")
 
     def __init__(self, position, dimensions, color=(0.5, 0.5, 0.5), rotation=0):
         """
@@ -114,7 +66,6 @@ class RectangularObstruction(Obstruction):
         super().__init__(position, color)
         self.dimensions = np.array(dimensions, dtype=float)
         self.rotation = rotation
-        self.display_list = self.create_display_list()
 
         # Pre-compute half-dimensions for collision detection
         self.half_width = self.dimensions[0] / 2
@@ -128,68 +79,10 @@ class RectangularObstruction(Obstruction):
             [math.sin(angle_rad), math.cos(angle_rad)]
         ])
 
-    def _draw_shape(self):
-        """Draw the rectangular prism using OpenGL."""
-        glColor3f(*self.color)
-
-        # Apply rotation
-        glRotatef(self.rotation, 0, 0, 1)
-
-        # Half dimensions for centered drawing
-        half_width = self.dimensions[0] / 2
-        half_depth = self.dimensions[1] / 2
-        height = self.dimensions[2]
-
-        # Define vertices for a box centered at origin
-        vertices = [
-            # Bottom face
-            (-half_width, -half_depth, 0),
-            (half_width, -half_depth, 0),
-            (half_width, half_depth, 0),
-            (-half_width, half_depth, 0),
-
-            # Top face
-            (-half_width, -half_depth, height),
-            (half_width, -half_depth, height),
-            (half_width, half_depth, height),
-            (-half_width, half_depth, height)
-        ]
-
-        # Define faces using vertex indices
-        faces = [
-            (0, 1, 2, 3),  # Bottom
-            (4, 5, 6, 7),  # Top
-            (0, 1, 5, 4),  # Front
-            (2, 3, 7, 6),  # Back
-            (0, 3, 7, 4),  # Left
-            (1, 2, 6, 5)  # Right
-        ]
-
-        # Draw each face as a quad
-        glBegin(GL_QUADS)
-        for face in faces:
-            for vertex_idx in face:
-                glVertex3fv(vertices[vertex_idx])
-        glEnd()
-
-        # Draw borders
-        glEnable(GL_POLYGON_OFFSET_LINE)
-        glPolygonOffset(-1.0, -1.0)  # Push lines slightly forward to avoid z-fighting
-        glLineWidth(1.5)  # Thicker lines for visibility
-        glColor3f(1.0, 1.0, 1.0)  # Black borders (adjust as needed)
-
-        glBegin(GL_LINE_LOOP)
-        for face in faces:
-            for vertex_idx in face:
-                glVertex3fv(vertices[vertex_idx])
-            glEnd()  # End after each face to restart GL_LINE_LOOP
-            glBegin(GL_LINE_LOOP)  # Start new loop for next face
-        glEnd()  # Final end for the last face
-
-        glDisable(GL_POLYGON_OFFSET_LINE)
 
 class PyramidalObstruction(Obstruction):
     """Pyramidal obstruction with a rectangular base and a point at the top."""
+    __slots__ = ("base_dimensions", "height", "rotation", "half_width", "half_depth", "rot_matrix")
 
     def __init__(self, position, base_dimensions, height, color=(0.5, 0.5, 0.5), rotation=0):
         """
@@ -206,7 +99,6 @@ class PyramidalObstruction(Obstruction):
         self.base_dimensions = np.array(base_dimensions, dtype=float)
         self.height = height
         self.rotation = rotation
-        self.display_list = self.create_display_list()
 
         # Pre-compute half-dimensions for collision detection
         self.half_width = self.base_dimensions[0] / 2
@@ -219,50 +111,10 @@ class PyramidalObstruction(Obstruction):
             [math.sin(angle_rad), math.cos(angle_rad)]
         ])
 
-    def _draw_shape(self):
-        """Draw the pyramid using OpenGL."""
-        glColor3f(*self.color)
-
-        # Apply rotation
-        glRotatef(self.rotation, 0, 0, 1)
-
-        # Half dimensions for centered drawing
-        half_width = self.base_dimensions[0] / 2
-        half_depth = self.base_dimensions[1] / 2
-
-        # Define base vertices
-        base_vertices = [
-            (-half_width, -half_depth, 0),
-            (half_width, -half_depth, 0),
-            (half_width, half_depth, 0),
-            (-half_width, half_depth, 0)
-        ]
-
-        # Define apex
-        apex = (0, 0, self.height)
-
-        # Draw base (one quad)
-        glBegin(GL_QUADS)
-        for vertex in base_vertices:
-            glVertex3fv(vertex)
-        glEnd()
-
-        # Draw triangular faces (four triangles)
-        glBegin(GL_TRIANGLES)
-        for i in range(4):
-            # Get current and next vertex
-            v1 = base_vertices[i]
-            v2 = base_vertices[(i + 1) % 4]
-
-            # Draw triangle from v1 to v2 to apex
-            glVertex3fv(v1)
-            glVertex3fv(v2)
-            glVertex3fv(apex)
-        glEnd()
-
 
 class SphereObstruction(Obstruction):
     """Spherical obstruction with configurable radius."""
+    __slots__ = ("radius", "slices", "stacks")
 
     def __init__(self, position, radius, color=(0.5, 0.5, 0.5), slices=16, stacks=16):
         """
@@ -279,26 +131,11 @@ class SphereObstruction(Obstruction):
         self.radius = radius
         self.slices = slices
         self.stacks = stacks
-        self.quadric = gluNewQuadric()  # Initialize quadric immediately
-        self.display_list = None  # Defer display list creation
-
-    def _draw_shape(self):
-        """Draw the sphere using OpenGL."""
-        glColor3f(*self.color)
-        gluQuadricDrawStyle(self.quadric, GLU_FILL)
-        gluQuadricNormals(self.quadric, GLU_SMOOTH)
-        gluSphere(self.quadric, self.radius, self.slices, self.stacks)
-
-    def delete(self):
-        """Clean up OpenGL resources."""
-        if self.display_list is not None:
-            glDeleteLists(self.display_list, 1)
-        if self.quadric is not None:  # Check to be safe
-            gluDeleteQuadric(self.quadric)
 
 
 class CompositeObstruction(Obstruction):
     """Composite obstruction combining multiple basic shapes."""
+    __slots__ = ("components",)
 
     def __init__(self, position, color=(0.5, 0.5, 0.5)):
         """
@@ -311,9 +148,6 @@ class CompositeObstruction(Obstruction):
         super().__init__(position, color)
         self.components = []
 
-        # No display list for composite - we'll use the components' lists
-        self.display_list = None
-
     def add_component(self, obstruction_class, offset_position, *args, **kwargs):
         """
         Add a component obstruction to this composite.
@@ -337,17 +171,3 @@ class CompositeObstruction(Obstruction):
         component = obstruction_class(abs_position, *args, **kwargs)
         self.components.append(component)
         return component
-
-    def _draw_shape(self):
-        """Draw shape - not used for composite as we render components directly."""
-        pass
-
-    def render(self):
-        """Render all component obstructions."""
-        for component in self.components:
-            component.render()
-
-    def delete(self):
-        """Clean up OpenGL resources for all components."""
-        for component in self.components:
-            component.delete()
\ No newline at end of file
@@ -0,0 +1,8 @@
+import os
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def resolve_path(path):
+    """Resolve paths relative to the project directory, so data and caches load from any working directory."""
+    return path if os.path.isabs(path) else os.path.join(PROJECT_DIR, path)
@@ -0,0 +1,182 @@
+import hashlib
+import numpy as np
+from obstructions import (CylindricalObstruction, RectangularObstruction, PyramidalObstruction,
+                          SphereObstruction, CompositeObstruction)
+
+CYLINDER, BOX, PYRAMID, SPHERE = 0, 1, 2, 3
+DEFAULT_DETAIL = 16  # Cylinder segments / sphere slices and stacks
+
+"""Flat NumPy table of obstruction primitives shared by scene caching and collision indexing.
+
+One row per primitive (composite obstructions contribute one row per component). Columns:
+    kind:     CYLINDER, BOX, PYRAMID or SPHERE
+    position: base center (sphere: center)
+    size:     cylinder (radius, radius, height), box (width, depth, height),
+              pyramid (width, depth, height), sphere (radius, radius, radius)
+    rotation: degrees around the z-axis (boxes and pyramids)
+    color:    (r, g, b)
+    detail:   cylinder segments or sphere slices/stacks
+    owner:    index of the top-level obstruction the row belongs to
+Rows are grouped by owner in ascending order; mesh obstructions own no rows.
+"""
+class PrimitiveTable:
+    COLUMNS = ("kind", "position", "size", "rotation", "color", "detail", "owner",
+               "obstruction_position", "obstruction_color", "obstruction_is_composite")
+
+    def __init__(self, kind, position, size, rotation, color, detail, owner,
+                 obstruction_position, obstruction_color, obstruction_is_composite):
+        self.kind = np.asarray(kind, dtype=np.int8)
+        self.position = np.asarray(position, dtype=float).reshape(-1, 3)
+        self.size = np.asarray(size, dtype=float).reshape(-1, 3)
+        self.rotation = np.asarray(rotation, dtype=float)
+        self.color = np.asarray(color, dtype=np.float32).reshape(-1, 3)
+        self.detail = np.asarray(detail, dtype=np.int16)
+        self.owner = np.asarray(owner, dtype=np.int32)
+        self.obstruction_position = np.asarray(obstruction_position, dtype=float).reshape(-1, 3)
+        self.obstruction_color = np.asarray(obstruction_color, dtype=np.float32).reshape(-1, 3)
+        self.obstruction_is_composite = np.asarray(obstruction_is_composite, dtype=bool)
+        # Row range of each obstruction (rows are grouped by owner)
+        self.owner_starts = np.searchsorted(self.owner, np.arange(len(self.obstruction_position) + 1))
+
+    def __len__(self):
+        return len(self.kind)
+
+    @property
+    def obstruction_count(self):
+        return len(self.obstruction_position)
+
+    @classmethod
+    def from_rows(cls, rows, obstructions):
+        """
+        Build a table from Python rows.
+
+        Args:
+            rows: Iterable of (kind, position, size, rotation, color, detail, owner) tuples
+            obstructions: Iterable of (position, color, is_composite) tuples, one per owner
+        """
+        rows = list(rows)
+        obstructions = list(obstructions)
+        if rows:
+            kind, position, size, rotation, color, detail, owner = zip(*rows)
+        else:
+            kind, position, size, rotation, color, detail, owner = ((),) * 7
+        if obstructions:
+            obstruction_position, obstruction_color, obstruction_is_composite = zip(*obstructions)
+        else:
+            obstruction_position, obstruction_color, obstruction_is_composite = (), (), ()
+        return cls(kind, position, size, rotation, color, detail, owner,
+                   obstruction_position, obstruction_color, obstruction_is_composite)
+
+    @classmethod
+    def from_obstructions(cls, obstructions):
+        """Flatten obstruction objects (simple or composite) into a table."""
+        rows = []
+        parents = []
+        for owner, obstruction in enumerate(obstructions):
+            components = getattr(obstruction, 'components', None)
+            parents.append((obstruction.position, obstruction.color, bool(components)))
+            if hasattr(obstruction, 'check_sweep'):
+                continue  # Meshes keep their own BVH and contribute no primitive rows
+            for primitive in (components if components else [obstruction]):
+                rows.append(primitive_row(primitive, owner))
+        return cls.from_rows(rows, parents)
+
+    def obstruction_digests(self):
+        """Content hash of every top-level obstruction (its rows plus its own position and color)."""
+        digests = []
+        for index in range(self.obstruction_count):
+            start, end = self.owner_starts[index], self.owner_starts[index + 1]
+            digest = hashlib.sha1(self.obstruction_position[index].tobytes())
+            digest.update(self.obstruction_color[index].tobytes())
+            for column in (self.kind, self.position, self.size, self.rotation, self.color, self.detail):
+                digest.update(column[start:end].tobytes())
+            digests.append(digest.hexdigest())
+        return digests
+
+    def primitive_bounds(self):
+        """Return (mins, maxs) axis-aligned bounds of every primitive row."""
+        half = np.empty_like(self.size)
+        half[:, 2] = 0.0
+        round_mask = (self.kind == CYLINDER) | (self.kind == SPHERE)
+        half[round_mask, 0] = self.size[round_mask, 0]
+        half[round_mask, 1] = self.size[round_mask, 0]
+
+        # Rotated rectangular footprints (boxes and pyramids)
+        rect_mask = ~round_mask
+        angle = np.radians(self.rotation[rect_mask])
+        cos_a = np.abs(np.cos(angle))
+        sin_a = np.abs(np.sin(angle))
+        half_width = self.size[rect_mask, 0] / 2
+        half_depth = self.size[rect_mask, 1] / 2
+        half[rect_mask, 0] = cos_a * half_width + sin_a * half_depth
+        half[rect_mask, 1] = sin_a * half_width + cos_a * half_depth
+
+        mins = self.position - half
+        maxs = self.position + half
+        maxs[:, 2] = self.position[:, 2] + self.size[:, 2]
+        sphere_mask = self.kind == SPHERE
+        mins[sphere_mask, 2] = self.position[sphere_mask, 2] - self.size[sphere_mask, 0]
+        maxs[sphere_mask, 2] = self.position[sphere_mask, 2] + self.size[sphere_mask, 0]
+        return mins, maxs
+
+    def obstruction_bounds(self):
+        """Return (mins, maxs) axis-aligned bounds of every top-level obstruction."""
+        mins, maxs = self.primitive_bounds()
+        count = self.obstruction_count
+        obstruction_mins = np.full((count, 3), np.inf)
+        obstruction_maxs = np.full((count, 3), -np.inf)
+        np.minimum.at(obstruction_mins, self.owner, mins)
+        np.maximum.at(obstruction_maxs, self.owner, maxs)
+        return obstruction_mins, obstruction_maxs
+
+    def create_obstruction(self, index):
+        """Materialize top-level obstruction `index` as an obstruction object."""
+        start, end = self.owner_starts[index], self.owner_starts[index + 1]
+        position = tuple(self.obstruction_position[index])
+        color = tuple(float(c) for c in self.obstruction_color[index])
+        if not self.obstruction_is_composite[index]:
+            return self._create_primitive(start)
+        composite = CompositeObstruction(position, color)
+        for row in range(start, end):
+            composite.components.append(self._create_primitive(row))
+        return composite
+
+    def _create_primitive(self, row):
+        kind = self.kind[row]
+        position = tuple(self.position[row])
+        size = self.size[row]
+        color = tuple(float(c) for c in self.color[row])
+        detail = int(self.detail[row]) or DEFAULT_DETAIL
+        if kind == CYLINDER:
+            return CylindricalObstruction(position, size[0], size[2], color=color, segments=detail)
+        if kind == BOX:
+            return RectangularObstruction(position, tuple(size), color=color, rotation=self.rotation[row])
+        if kind == PYRAMID:
+            return PyramidalObstruction(position, (size[0], size[1]), size[2], color=color,
+                                        rotation=self.rotation[row])
+        return SphereObstruction(position, size[0], color=color, slices=detail, stacks=detail)
+
+    def to_arrays(self, prefix=""):
+        """Return the table columns as a dict of arrays (e.g. for np.savez)."""
+        return {prefix + name: getattr(self, name) for name in self.COLUMNS}
+
+    @classmethod
+    def from_arrays(cls, arrays, prefix=""):
+        return cls(*(arrays[prefix + name] for name in cls.COLUMNS))
+
+
+def primitive_row(primitive, owner):
+    """Return the table row for a single (non-composite) obstruction object."""
+    position = tuple(primitive.position)
+    color = tuple(primitive.color)
+    if isinstance(primitive, CylindricalObstruction):
+        return (CYLINDER, position, (primitive.radius, primitive.radius, primitive.height), 0.0, color,
+                primitive.segments, owner)
+    if isinstance(primitive, RectangularObstruction):
+        return (BOX, position, tuple(primitive.dimensions), primitive.rotation, color, 0, owner)
+    if isinstance(primitive, PyramidalObstruction):
+        return (PYRAMID, position, (*primitive.base_dimensions, primitive.height), primitive.rotation, color,
+                0, owner)
+    if isinstance(primitive, SphereObstruction):
+        return (SPHERE, position, (primitive.radius,) * 3, 0.0, color, primitive.slices, owner)
+    raise TypeError(f"Unsupported obstruction type: {type(primitive).__name__}")
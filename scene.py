@@ -0,0 +1,299 @@
+import hashlib
+import json
+import os
+import random
+import numpy as np
+from primitives import PrimitiveTable, CYLINDER, BOX, PYRAMID, SPHERE, DEFAULT_DETAIL
+from collision_detector import CollisionDetector, SpatialIndex
+from mesh import MeshObstruction
+from paths import resolve_path
+from config import SCENE_CACHE_DIR, SCENE_BATCH_TILE_SIZE, COLLISION_CELL_SIZE
+
+SCENE_FORMAT_VERSION = 2  # Bump whenever compiled output changes so stale caches are ignored
+DEFAULT_COLOR = (0.5, 0.5, 0.5)
+
+"""Declarative scenes.
+
+Authoring files are JSON (or TOML) with an optional top-level "seed" and a list of "obstructions".
+Each entry has a "type":
+    cylinder  position, radius, height, [segments]
+    box       position, dimensions (width, depth, height), [rotation]
+    pyramid   position, base_dimensions (width, depth), height, [rotation]
+    sphere    position, radius, [slices]
+    composite position, components (primitive entries using "offset" instead of "position")
+    house_1 / tree_1  position plus the keyword arguments of create_basic_house_1 / create_basic_tree_1
+    mesh      position, path (OBJ/STL), [scale]
+    scatter   template (any type above), count, x/y/z ranges, params ranges, [seed]
+Every entry also accepts "color". In scatter groups a [low, high] pair is sampled uniformly, a list containing
+pairs is sampled element-wise (e.g. "dimensions": [[30, 60], [30, 60], 40]) and anything else is constant.
+"""
+
+
+def _house_1(color=DEFAULT_COLOR):
+    """Component entries matching obstruction_visuals.create_basic_house_1."""
+    components = [
+        {"type": "box", "offset": (0, 0, 0), "dimensions": (500, 500, 300), "color": (0.7, 0.7, 0.7)},
+        {"type": "pyramid", "offset": (0, 0, 300), "base_dimensions": (500, 500), "height": 150,
+         "color": (0.2, 0.2, 0.7)},
+        {"type": "sphere", "offset": (0, 0, 450), "radius": 20, "color": (1.0, 0.8, 0.0)},
+    ]
+    for pos in [(-240, -240, 0), (240, -240, 0), (-240, 240, 0), (240, 240, 0)]:
+        components.append({"type": "cylinder", "offset": pos, "radius": 10, "height": 300,
+                           "color": (0.6, 0.6, 0.6)})
+    return components
+
+
+def _tree_1(trunk_radius=10, trunk_height=200, canopy_radius=75, color=DEFAULT_COLOR):
+    """Component entries matching obstruction_visuals.create_basic_tree_1."""
+    return [
+        {"type": "cylinder", "offset": (0, 0, 0), "radius": trunk_radius, "height": trunk_height,
+         "color": (0.6, 0.3, 0.0)},
+        {"type": "sphere", "offset": (0, 0, trunk_height), "radius": canopy_radius, "color": (0.0, 0.6, 0.0)},
+    ]
+
+
+COMPOSITE_TEMPLATES = {
+    "house_1": _house_1,
+    "tree_1": _tree_1,
+}
+PRIMITIVE_TYPES = {"cylinder", "box", "pyramid", "sphere"}
+
+
+def _primitive_row(entry, position, color, owner):
+    """Return the PrimitiveTable row for a primitive scene entry."""
+    kind = entry["type"]
+    if kind == "cylinder":
+        radius = entry["radius"]
+        return (CYLINDER, position, (radius, radius, entry["height"]), 0.0, color,
+                entry.get("segments", DEFAULT_DETAIL), owner)
+    if kind == "box":
+        return (BOX, position, tuple(entry["dimensions"]), entry.get("rotation", 0), color, 0, owner)
+    if kind == "pyramid":
+        width, depth = entry["base_dimensions"]
+        return (PYRAMID, position, (width, depth, entry["height"]), entry.get("rotation", 0), color, 0, owner)
+    radius = entry["radius"]
+    return (SPHERE, position, (radius, radius, radius), 0.0, color, entry.get("slices", DEFAULT_DETAIL), owner)
+
+
+class _SceneCompiler:
+    """Expands scene entries into PrimitiveTable rows."""
+
+    def __init__(self, seed):
+        self.seed = seed
+        self.rows = []
+        self.parents = []
+        self.meshes = []
+
+    def add(self, entry, group_id):
+        kind = entry.get("type")
+        position = tuple(float(v) for v in entry.get("position", (0, 0, 0)))
+        color = tuple(entry.get("color", DEFAULT_COLOR))
+        if kind in PRIMITIVE_TYPES:
+            owner = len(self.parents)
+            self.parents.append((position, color, False))
+            self.rows.append(_primitive_row(entry, position, color, owner))
+        elif kind == "mesh":
+            owner = len(self.parents)
+            self.parents.append((position, color, False))
+            self.meshes.append((owner, entry["path"], position, entry.get("scale", 1.0), color))
+        elif kind == "composite":
+            self._add_composite(position, color, entry["components"])
+        elif kind in COMPOSITE_TEMPLATES:
+            params = {k: v for k, v in entry.items() if k not in ("type", "position")}
+            self._add_composite(position, color, COMPOSITE_TEMPLATES[kind](**params))
+        elif kind == "scatter":
+            self._add_scatter(entry, group_id)
+        else:
+            raise ValueError(f"Unknown scene entry type '{kind}'")
+
+    def _add_composite(self, position, color, components):
+        owner = len(self.parents)
+        self.parents.append((position, color, True))
+        for component in components:
+            offset = component.get("offset", (0, 0, 0))
+            abs_position = tuple(p + o for p, o in zip(position, offset))
+            self.rows.append(_primitive_row(component, abs_position, tuple(component.get("color", color)), owner))
+
+    def _add_scatter(self, entry, group_id):
+        """Seeded procedural group; the same seed always yields the same instances."""
+        seed = entry.get("seed", f"{self.seed}:{group_id}")
+        rng = random.Random(seed)
+
+        def sample(value):
+            if isinstance(value, (list, tuple)):
+                if any(isinstance(v, (list, tuple)) for v in value):
+                    return tuple(sample(v) for v in value)  # Element-wise, e.g. dimensions
+                if len(value) == 2:
+                    return rng.uniform(*value)
+            return value
+
+        params = entry.get("params", {})
+        for _ in range(entry["count"]):
+            instance = {"type": entry["template"],
+                        "position": (sample(entry.get("x", 0)), sample(entry.get("y", 0)),
+                                     sample(entry.get("z", 0)))}
+            for name, value in params.items():
+                instance[name] = sample(value)
+            if "color" in entry:
+                instance["color"] = entry["color"]
+            self.add(instance, group_id)
+
+
+def parse_scene(source, path=""):
+    """Parse authoring bytes (JSON, or TOML for .toml paths) into a scene dictionary."""
+    if path.endswith(".toml"):
+        import tomllib  # Python 3.11+
+        return tomllib.loads(source.decode("utf-8"))
+    return json.loads(source)
+
+
+"""Compiled scene: primitive table, collision index and render batch tiles built together (no GL state)"""
+class Scene:
+    def __init__(self, table, index, batch_order, batch_starts, meshes=(), source=None):
+        """
+        Initialize a compiled scene.
+
+        Args:
+            table: PrimitiveTable of every primitive obstruction
+            index: SpatialIndex over the table's primitive rows
+            batch_order, batch_starts: Obstruction indices grouped by render tile (CSR layout)
+            meshes: (owner, path, position, scale, color) tuples for mesh obstructions
+            source: Authoring file the scene was compiled from
+        """
+        self.table = table
+        self.index = index
+        self.batch_order = np.asarray(batch_order, dtype=np.int32)
+        self.batch_starts = np.asarray(batch_starts, dtype=np.int64)
+        self.meshes = [(int(owner), str(path), tuple(position), float(scale), tuple(color))
+                       for owner, path, position, scale, color in meshes]
+        self.mesh_owners = [mesh[0] for mesh in self.meshes]
+        self.source = source
+        self.obstructions = ObstructionList(table, self.meshes)
+
+    @classmethod
+    def compile(cls, scene_data, source=None):
+        """Compile a parsed scene dictionary."""
+        compiler = _SceneCompiler(scene_data.get("seed", 0))
+        for group_id, entry in enumerate(scene_data.get("obstructions", [])):
+            compiler.add(entry, group_id)
+        table = PrimitiveTable.from_rows(compiler.rows, compiler.parents)
+        index = SpatialIndex.from_bounds(*table.primitive_bounds(), cell_size=COLLISION_CELL_SIZE)
+
+        # Group obstructions into spatial tiles, one render batch per tile (meshes render on their own)
+        tiles = np.floor(table.obstruction_position[:, :2] / SCENE_BATCH_TILE_SIZE).astype(np.int64)
+        batch_order = np.lexsort((tiles[:, 1], tiles[:, 0])).astype(np.int32)
+        batch_order = batch_order[~np.isin(batch_order, [mesh[0] for mesh in compiler.meshes])]
+        sorted_tiles = tiles[batch_order]
+        changes = np.flatnonzero(np.any(np.diff(sorted_tiles, axis=0) != 0, axis=1)) + 1
+        batch_starts = np.concatenate(([0], changes, [len(batch_order)])) if len(batch_order) else np.zeros(1, dtype=np.int64)
+        return cls(table, index, batch_order, batch_starts, compiler.meshes, source)
+
+    def batch_keys(self):
+        """Content key per render batch, in create_scene_batches order (tiles, then meshes)."""
+        digests = self.table.obstruction_digests()
+        keys = []
+        for start, end in zip(self.batch_starts[:-1], self.batch_starts[1:]):
+            members = self.batch_order[start:end]
+            keys.append(hashlib.sha1("".join(digests[i] for i in members).encode()).hexdigest())
+        return keys + [repr(mesh[1:]) for mesh in self.meshes]
+
+    def create_collision_detector(self, terrain=None):
+        """Collision detector reusing the compiled table and index."""
+        return CollisionDetector(self.obstructions, table=self.table, index=self.index,
+                                 meshes=[self.obstructions[owner] for owner in self.mesh_owners], terrain=terrain)
+
+    def save(self, path):
+        """Write the compiled scene to a binary cache file (atomic replace)."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        arrays = self.table.to_arrays("table_")
+        arrays.update(self.index.to_arrays("index_"))
+        arrays["batch_order"] = self.batch_order
+        arrays["batch_starts"] = self.batch_starts
+        arrays["mesh_owner"] = np.array(self.mesh_owners, dtype=np.int32)
+        arrays["mesh_path"] = np.array([mesh[1] for mesh in self.meshes], dtype=str)
+        arrays["mesh_position"] = np.array([mesh[2] for mesh in self.meshes], dtype=float).reshape(-1, 3)
+        arrays["mesh_scale"] = np.array([mesh[3] for mesh in self.meshes], dtype=float)
+        arrays["mesh_color"] = np.array([mesh[4] for mesh in self.meshes], dtype=float).reshape(-1, 3)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, source=None):
+        """Load a compiled scene from a binary cache file."""
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {name: data[name] for name in data.files}
+        return cls(PrimitiveTable.from_arrays(arrays, "table_"), SpatialIndex.from_arrays(arrays, "index_"),
+                   arrays["batch_order"], arrays["batch_starts"],
+                   zip(arrays["mesh_owner"], arrays["mesh_path"], arrays["mesh_position"], arrays["mesh_scale"],
+                       arrays["mesh_color"]), source)
+
+
+class ObstructionList:
+    """Read-only sequence that creates obstruction objects from a table on first access."""
+
+    def __init__(self, table, meshes=()):
+        self.table = table
+        self.meshes = {mesh[0]: mesh for mesh in meshes}
+        self._cache = {}
+
+    def __len__(self):
+        return self.table.obstruction_count
+
+    def __getitem__(self, index):
+        index = int(index)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("obstruction index out of range")
+        obstruction = self._cache.get(index)
+        if obstruction is None:
+            if index in self.meshes:
+                _, path, position, scale, color = self.meshes[index]
+                obstruction = MeshObstruction(position, path, scale, color=color)
+            else:
+                obstruction = self.table.create_obstruction(index)
+            self._cache[index] = obstruction
+        return obstruction
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+
+def scene_cache_key(source):
+    """Content hash of the authoring file plus everything that shapes the compiled output."""
+    digest = hashlib.sha256(source)
+    digest.update(f"|{SCENE_FORMAT_VERSION}|{COLLISION_CELL_SIZE}|{SCENE_BATCH_TILE_SIZE}".encode())
+    return digest.hexdigest()
+
+
+def load_scene(path, cache_dir=SCENE_CACHE_DIR):
+    """
+    Load a scene, reusing the on-disk compiled cache when the file content is unchanged.
+
+    Args:
+        path: Scene authoring file (.json or .toml), relative paths resolve from the project directory
+        cache_dir: Directory for compiled caches, or None to disable caching
+    """
+    path = resolve_path(path)
+    with open(path, "rb") as f:
+        source = f.read()
+
+    cache_path = None
+    if cache_dir:
+        cache_path = os.path.join(resolve_path(cache_dir), scene_cache_key(source) + ".npz")
+        if os.path.exists(cache_path):
+            try:
+                return Scene.load(cache_path, source=path)
+            except (OSError, KeyError, ValueError) as e:
+                print(f"Scene cache {cache_path} unreadable ({e}), recompiling.")
+
+    scene = Scene.compile(parse_scene(source, path), source=path)
+    if cache_path:
+        try:
+            scene.save(cache_path)
+        except OSError as e:
+            print(f"Could not write scene cache {cache_path}: {e}")
+    return scene
@@ -0,0 +1,306 @@
+import numpy as np
+from primitives import CYLINDER, BOX, PYRAMID, SPHERE
+from config import RANGE_SENSORS, SENSOR_SEED
+
+_NO_HIT = np.inf
+
+
+def fan_directions(pitch=0.0, yaw_span=0.0, pitch_span=0.0, yaw_rays=1, pitch_rays=1):
+    """
+    Unit ray directions of a sensor in the drone body frame (right, forward, up).
+
+    Args:
+        pitch: Degrees above the horizon of the fan's center (-90 points straight down)
+        yaw_span: Horizontal spread in degrees, centered on the nose
+        pitch_span: Vertical spread in degrees, centered on `pitch`
+        yaw_rays: Rays across the horizontal spread
+        pitch_rays: Rays across the vertical spread
+    Returns:
+        (yaw_rays * pitch_rays, 3) array, rows ordered by pitch then yaw
+    """
+    yaws = np.radians(np.linspace(-yaw_span / 2, yaw_span / 2, yaw_rays))
+    pitches = np.radians(pitch + np.linspace(-pitch_span / 2, pitch_span / 2, pitch_rays))
+    yaws, pitches = np.meshgrid(yaws, pitches)
+    yaws, pitches = yaws.ravel(), pitches.ravel()
+    return np.stack((np.sin(yaws) * np.cos(pitches), np.cos(yaws) * np.cos(pitches), np.sin(pitches)), axis=1)
+
+
+def body_to_world(directions, yaw):
+    """Rotate (R, 3) body-frame directions by the drone's yaw (degrees, clockwise from north)."""
+    yaw_rad = np.radians(yaw)
+    cos_yaw, sin_yaw = np.cos(yaw_rad), np.sin(yaw_rad)
+    right, forward, up = directions.T
+    return np.stack((right * cos_yaw + forward * sin_yaw, forward * cos_yaw - right * sin_yaw, up), axis=1)
+
+
+def _quadratic_entry(b, c, a=1.0):
+    """Smallest non-negative root of a*t² + b*t + c = 0 (c <= 0 means the origin is inside: 0), else inf."""
+    disc = b * b - 4 * a * c
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t = (-b - np.sqrt(disc)) / (2 * a)
+    t = np.where(c <= 0, 0.0, t)
+    return np.where((disc >= 0) & (t >= 0), t, _NO_HIT)
+
+
+"""Ray casting against the collision world.
+
+Rays start at one origin (the sensor) and are tested against every primitive the SpatialIndex returns for the
+box spanned by the ray segments, as one (rays x candidates) NumPy array per primitive kind:
+    cylinder: quadratic for the side wall plus the two cap planes
+    box and pyramid: slab clipping against their faces (6 and 5 planes) in the primitive's rotated frame
+    sphere: quadratic
+The ground is the plane z=0, or the terrain heightmap sampled every half cell along each ray and refined
+linearly between the last sample above and the first below. Meshes are culled by their bounds, then the rays
+that reach the bounds are tested against the BVH's candidate triangles.
+"""
+class RayCaster:
+    def __init__(self, collision_detector=None, terrain=None):
+        """
+        Initialize the caster over an existing world.
+
+        Args:
+            collision_detector: CollisionDetector whose primitive table, index and meshes are cast against, a
+                ChunkedWorld (its loaded tiles are cast against), or None
+            terrain: Terrain for the ground, or None for the world's terrain (flat z=0 ground when it has none)
+        """
+        self.collision_detector = collision_detector
+        self.terrain = terrain if terrain is not None else getattr(collision_detector, "terrain", None)
+
+        # Face planes (normal . p <= offset) of a unit box/pyramid in local coordinates, scaled per row on use.
+        # Pyramids repeat their base plane so both kinds share a (6, 4) layout.
+        self.box_planes = np.array([(1, 0, 0, 0.5), (-1, 0, 0, 0.5), (0, 1, 0, 0.5), (0, -1, 0, 0.5),
+                                    (0, 0, 1, 1), (0, 0, -1, 0)], dtype=float)
+        self.pyramid_planes = np.array([(2, 0, 1, 1), (-2, 0, 1, 1), (0, 2, 1, 1), (0, -2, 1, 1),
+                                        (0, 0, -1, 0), (0, 0, -1, 0)], dtype=float)
+
+    def cast(self, origin, directions, max_range):
+        """
+        Distance along each ray to the first surface.
+
+        Args:
+            origin: (x, y, z) start of every ray
+            directions: (R, 3) unit world-frame directions
+            max_range: Rays that hit nothing within this distance return inf
+        Returns:
+            (R,) distances in cm; 0 for rays starting inside an obstruction
+        """
+        origin = np.asarray(origin, dtype=float)
+        directions = np.asarray(directions, dtype=float).reshape(-1, 3)
+        hits = self._ground(origin, directions, max_range)
+        world = self.collision_detector
+        if world is None:
+            detectors = []
+        elif hasattr(world, "detectors_near"):
+            detectors = world.detectors_near(origin[0], origin[1], max_range)
+        else:
+            detectors = [world]
+        # The rays are segments of length max_range, so only primitives in the cells their box spans can be hit
+        ends = origin + directions * max_range
+        box_min = np.minimum(origin, ends.min(axis=0))
+        box_max = np.maximum(origin, ends.max(axis=0))
+        for detector in detectors:
+            table = detector.table
+            rows = detector.index.query(box_min, box_max)
+            for kind, method in ((CYLINDER, self._cylinders), (SPHERE, self._spheres), (BOX, self._convex),
+                                 (PYRAMID, self._convex)):
+                sel = rows[table.kind[rows] == kind]
+                if len(sel):
+                    hits = np.minimum(hits, method(table, origin, directions, sel, kind).min(axis=1))
+            for mesh in detector.meshes:
+                hits = np.minimum(hits, self._mesh(origin, directions, mesh, max_range))
+        return np.where(hits <= max_range, hits, _NO_HIT)
+
+    def _ground(self, origin, directions, max_range):
+        down = directions[:, 2] < 0
+        hits = np.full(len(directions), _NO_HIT)
+        terrain = self.terrain
+        if terrain is None:
+            if origin[2] <= 0:
+                hits[:] = 0.0
+            else:
+                hits[down] = -origin[2] / directions[down, 2]
+            return hits
+        if origin[2] >= terrain.max_height:
+            # Rays only reach the ground once they are below its highest point
+            start = np.where(down, (origin[2] - terrain.max_height) / np.maximum(-directions[:, 2], 1e-12), 0.0)
+        else:
+            start = np.zeros(len(directions))
+        active = np.flatnonzero(start <= max_range)
+        if len(active) == 0:
+            return hits
+        steps = max(1, int(np.ceil(max_range / (terrain.cell_size / 2))))
+        t = start[active, None] + np.linspace(0.0, 1.0, steps + 1) * (max_range - start[active, None])
+        points = origin + t[..., None] * directions[active, None, :]  # (A, S, 3)
+        above = points[..., 2] - terrain.heights_at(points[..., 0], points[..., 1])
+        below = above < 0
+        hit = below.any(axis=1)
+        first = below.argmax(axis=1)
+        # Linear refinement between the last sample above the ground and the first one below
+        index = np.arange(len(active))
+        prev = np.maximum(first - 1, 0)
+        a_above, a_below = above[index, prev], above[index, first]
+        fraction = np.where(first > 0, a_above / np.maximum(a_above - a_below, 1e-12), 0.0)
+        t_hit = t[index, prev] + fraction * (t[index, first] - t[index, prev])
+        hits[active[hit]] = t_hit[hit]
+        return hits
+
+    def _cylinders(self, table, origin, directions, sel, kind):
+        pos, size = table.position[sel], table.size[sel]
+        radius, bottom = size[:, 0], pos[:, 2]
+        top = bottom + size[:, 2]
+        rel_x, rel_y = origin[0] - pos[:, 0], origin[1] - pos[:, 1]
+        dx, dy, dz = (directions[:, i, None] for i in range(3))
+        a = dx * dx + dy * dy  # (R, 1)
+        b = 2 * (rel_x * dx + rel_y * dy)  # (R, C)
+        c = rel_x ** 2 + rel_y ** 2 - radius ** 2  # (C,)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            side = _quadratic_entry(b, c, np.maximum(a, 1e-12))
+            # The wall only counts between the caps; vertical rays (a ~ 0) rely on the caps alone
+            z = origin[2] + side * dz
+            side = np.where((a > 1e-12) & (z >= bottom) & (z <= top), side, _NO_HIT)
+            hits = side
+            for plane in (bottom, top):
+                t = (plane - origin[2]) / dz
+                px, py = rel_x + t * dx, rel_y + t * dy
+                on_cap = (t >= 0) & (px * px + py * py <= radius ** 2)
+                hits = np.minimum(hits, np.where(on_cap, t, _NO_HIT))
+        inside = (c <= 0) & (origin[2] >= bottom) & (origin[2] <= top)
+        return np.where(inside, 0.0, hits)
+
+    def _spheres(self, table, origin, directions, sel, kind):
+        rel = origin - table.position[sel]  # (C, 3)
+        radius = table.size[sel, 0]
+        b = 2 * directions @ rel.T  # (R, C)
+        c = (rel ** 2).sum(axis=1) - radius ** 2
+        return _quadratic_entry(b, c)
+
+    def _convex(self, table, origin, directions, sel, kind):
+        """Slab clipping of every ray against the face planes of boxes or pyramids."""
+        pos, size = table.position[sel], table.size[sel]
+        angle_rad = -np.radians(table.rotation[sel])
+        cos_rad, sin_rad = np.cos(angle_rad), np.sin(angle_rad)
+        # Work in unit-primitive coordinates: rotate into the primitive frame, then divide by its size
+        rel = origin - pos
+        local_origin = np.stack((rel[:, 0] * cos_rad - rel[:, 1] * sin_rad,
+                                 rel[:, 0] * sin_rad + rel[:, 1] * cos_rad, rel[:, 2]), axis=1) / size  # (C, 3)
+        dx, dy, dz = (directions[:, i, None] for i in range(3))
+        local_dirs = np.stack((dx * cos_rad - dy * sin_rad, dx * sin_rad + dy * cos_rad,
+                               np.broadcast_to(dz, (len(directions), len(sel)))), axis=2) / size  # (R, C, 3)
+        planes = self.pyramid_planes if kind == PYRAMID else self.box_planes
+        normals, offsets = planes[:, :3], planes[:, 3]
+        distance = offsets - local_origin @ normals.T  # (C, P), negative outside a face
+        rate = local_dirs @ normals.T  # (R, C, P)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = distance / rate
+        entering = rate < 0
+        leaving = rate > 0
+        t_near = np.where(entering, t, -np.inf).max(axis=2)
+        t_far = np.where(leaving, t, np.inf).min(axis=2)
+        # A ray parallel to a face and outside it never enters
+        parallel_outside = ((rate == 0) & (distance < 0)).any(axis=2)
+        hit = (t_near <= t_far) & (t_far >= 0) & ~parallel_outside
+        return np.where(hit, np.maximum(t_near, 0.0), _NO_HIT)
+
+    def _mesh(self, origin, directions, mesh, max_range):
+        hits = np.full(len(directions), _NO_HIT)
+        mesh_min, mesh_max = mesh.bounds()
+        inv = 1.0 / np.where(np.abs(directions) < 1e-12, 1e-12, directions)
+        t1, t2 = (mesh_min - origin) * inv, (mesh_max - origin) * inv
+        reach = np.maximum(np.minimum(t1, t2).max(axis=1), 0) <= np.minimum(np.maximum(t1, t2).min(axis=1), max_range)
+        model_origin = (origin - mesh.position) / mesh.scale
+        for ray in np.flatnonzero(reach):
+            # The segment spans max_range, so a triangle's t along it is its fraction of max_range
+            model_delta = directions[ray] * max_range / mesh.scale
+            candidates = mesh.bvh.query_segment(model_origin, model_delta, np.zeros(3))
+            if len(candidates):
+                t = _ray_triangles(model_origin, model_delta, mesh.triangles[candidates].astype(float))
+                if len(t):
+                    hits[ray] = t.min() * max_range
+        return hits
+
+
+def _ray_triangles(origin, delta, triangles):
+    """Möller-Trumbore: fractions t in [0, 1] along origin + t * delta where it crosses (C, 3, 3) triangles."""
+    edge1 = triangles[:, 1] - triangles[:, 0]
+    edge2 = triangles[:, 2] - triangles[:, 0]
+    p = np.cross(delta, edge2)
+    det = (edge1 * p).sum(axis=1)
+    valid = np.abs(det) > 1e-12
+    inv_det = 1.0 / np.where(valid, det, 1.0)
+    s = origin - triangles[:, 0]
+    u = (s * p).sum(axis=1) * inv_det
+    q = np.cross(s, edge1)
+    v = (q @ delta) * inv_det
+    t = (q * edge2).sum(axis=1) * inv_det
+    hit = valid & (u >= 0) & (v >= 0) & (u + v <= 1) & (t >= 0) & (t <= 1)
+    return t[hit]
+
+
+"""Range sensor mounted on the drone.
+
+Casts a fan of rays from the drone pose through a RayCaster and reports one distance per ray, with Gaussian
+noise (a fixed part plus a part proportional to the distance) and random dropouts. Rays that hit nothing, or drop
+out, read max_range, like a time-of-flight sensor with no return.
+"""
+class RangeSensor:
+    def __init__(self, name, directions, max_range, noise_std=0.0, noise_fraction=0.0, dropout=0.0,
+                 offset=(0.0, 0.0, 0.0), rng=None):
+        """
+        Initialize a sensor.
+
+        Args:
+            name: Key of the sensor's readings
+            directions: (R, 3) unit ray directions in the body frame (right, forward, up), see fan_directions
+            max_range: Longest distance measured, in cm
+            noise_std: Standard deviation of the reading noise in cm
+            noise_fraction: Additional noise standard deviation per cm of distance
+            dropout: Probability that a ray returns nothing
+            offset: Sensor position relative to the drone center in the body frame (cm)
+            rng: NumPy Generator for the noise, or None for an unseeded one
+        """
+        self.name = name
+        self.directions = np.asarray(directions, dtype=float).reshape(-1, 3)
+        self.max_range = float(max_range)
+        self.noise_std = noise_std
+        self.noise_fraction = noise_fraction
+        self.dropout = dropout
+        self.offset = np.asarray(offset, dtype=float)
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+    def read(self, caster, state):
+        """
+        Measure from a drone state.
+
+        Args:
+            caster: RayCaster for the world
+            state: Drone state dictionary with x, y, z and yaw
+        Returns:
+            (R,) distances in cm, clipped to [0, max_range]
+        """
+        yaw = state["yaw"]
+        origin = np.array((state["x"], state["y"], state["z"])) + body_to_world(self.offset[None], yaw)[0]
+        distances = caster.cast(origin, body_to_world(self.directions, yaw), self.max_range)
+        distances = np.minimum(distances, self.max_range)
+        if self.noise_std or self.noise_fraction:
+            distances = distances + self.rng.normal(size=len(distances)) * (self.noise_std +
+                                                                               self.noise_fraction * distances)
+        if self.dropout:
+            distances[self.rng.random(len(distances)) < self.dropout] = self.max_range
+        return np.clip(distances, 0.0, self.max_range)
+
+
+def create_sensors(sensors=RANGE_SENSORS, seed=SENSOR_SEED):
+    """RangeSensors from config-style definitions (name -> fan_directions and RangeSensor arguments)."""
+    rng = np.random.default_rng(seed)
+    created = []
+    for name, spec in sensors.items():
+        spec = dict(spec)
+        fan = {key: spec.pop(key) for key in ("pitch", "yaw_span", "pitch_span", "yaw_rays", "pitch_rays")
+               if key in spec}
+        created.append(RangeSensor(name, fan_directions(**fan), rng=rng, **spec))
+    return created
+
+
+def read_sensors(caster, sensors, state):
+    """Readings of every sensor for one drone state, keyed by sensor name."""
+    return {sensor.name: sensor.read(caster, state) for sensor in sensors}
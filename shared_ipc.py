@@ -0,0 +1,169 @@
+import time
+import numpy as np
+from multiprocessing import shared_memory
+from config import IPC_FRAME_SHAPE, IPC_FRAME_SLOTS
+
+STATE_FIELDS = ("x", "y", "z", "yaw", "battery", "flying")
+
+
+"""Frame ring in a shared memory segment.
+
+Layout: a float64 header of [sequence, then per slot (sequence, timestamp)] followed by the uint8 frames.
+One writer process publishes frames; readers in other processes map the same memory and read the newest
+slot in place. Each slot's sequence is zeroed while it is being written, so a reader can check after using
+a frame that it was not overwritten meanwhile (seqlock style).
+"""
+class SharedFrameRing:
+    def __init__(self, shm, shape, slots, owner):
+        self.shm = shm
+        self.shape = tuple(shape)
+        self.slots = slots
+        self.owner = owner
+        header_size = 8 * (1 + 2 * slots)
+        self.header = np.ndarray((1 + 2 * slots,), dtype=np.float64, buffer=shm.buf)
+        self.frames = np.ndarray((slots,) + self.shape, dtype=np.uint8, buffer=shm.buf, offset=header_size)
+        self._next_slot = 0
+
+    @classmethod
+    def create(cls, shape=IPC_FRAME_SHAPE, slots=IPC_FRAME_SLOTS, name=None):
+        size = 8 * (1 + 2 * slots) + slots * int(np.prod(shape))
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        ring = cls(shm, shape, slots, owner=True)
+        ring.header[:] = 0
+        return ring
+
+    @classmethod
+    def attach(cls, name, shape=IPC_FRAME_SHAPE, slots=IPC_FRAME_SLOTS):
+        return cls(shared_memory.SharedMemory(name=name), shape, slots, owner=False)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @property
+    def sequence(self):
+        return int(self.header[0])
+
+    def write(self, frame, timestamp=None):
+        """Copy a frame into the next slot and publish it. Frames of another shape are rejected."""
+        if frame.shape != self.shape:
+            return False
+        slot = self._next_slot
+        self._next_slot = (slot + 1) % self.slots
+        sequence = self.sequence + 1
+        self.header[1 + 2 * slot] = 0  # Slot is being written
+        np.copyto(self.frames[slot], frame)
+        self.header[2 + 2 * slot] = time.monotonic() if timestamp is None else timestamp
+        self.header[1 + 2 * slot] = sequence
+        self.header[0] = sequence
+        return True
+
+    def latest(self, after_sequence=0):
+        """
+        Newest frame as a view into shared memory, without copying.
+
+        Returns:
+            (frame, sequence, timestamp) or None if nothing newer than after_sequence; confirm the view was
+            not overwritten while in use with is_valid(sequence)
+        """
+        sequence = self.sequence
+        if sequence <= after_sequence:
+            return None
+        slot = (sequence - 1) % self.slots
+        return self.frames[slot], sequence, self.header[2 + 2 * slot]
+
+    def is_valid(self, sequence):
+        return self.header[1 + 2 * ((sequence - 1) % self.slots)] == sequence
+
+    def read_into(self, out, after_sequence=0, retries=10):
+        """
+        Copy the newest frame into `out`, retrying when the writer overwrote it during the copy.
+
+        Returns:
+            (sequence, timestamp), or None if nothing newer than after_sequence or every copy was torn
+        """
+        for _ in range(retries):
+            latest = self.latest(after_sequence)
+            if latest is None:
+                return None
+            frame, sequence, timestamp = latest
+            np.copyto(out, frame)
+            if self.is_valid(sequence):
+                return sequence, float(timestamp)
+        return None
+
+    def close(self):
+        # Views must go before the mapping can be closed
+        self.header = None
+        self.frames = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+"""Latest drone state in a shared memory segment: [sequence, timestamp, *STATE_FIELDS] as float64.
+
+The writer makes the sequence odd while updating and even when done; readers retry until they see the same
+even sequence before and after copying the few values.
+"""
+class SharedDroneState:
+    def __init__(self, shm, owner):
+        self.shm = shm
+        self.owner = owner
+        self.block = np.ndarray((2 + len(STATE_FIELDS),), dtype=np.float64, buffer=shm.buf)
+
+    @classmethod
+    def create(cls, name=None):
+        shm = shared_memory.SharedMemory(name=name, create=True, size=8 * (2 + len(STATE_FIELDS)))
+        state = cls(shm, owner=True)
+        state.block[:] = 0
+        return state
+
+    @classmethod
+    def attach(cls, name):
+        return cls(shared_memory.SharedMemory(name=name), owner=False)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def write(self, state, battery=None, flying=None):
+        """Publish a drone state dict (x, y, z, yaw, optional battery/flying)."""
+        block = self.block
+        sequence = block[0]
+        block[0] = sequence + 1  # Odd: update in progress
+        block[1] = time.monotonic()
+        block[2] = state["x"]
+        block[3] = state["y"]
+        block[4] = state["z"]
+        block[5] = state["yaw"]
+        battery = state.get("battery") if battery is None else battery
+        block[6] = -1 if battery is None else battery
+        block[7] = float(state.get("flying", 0) if flying is None else flying)
+        block[0] = sequence + 2
+
+    def read(self, after_sequence=0, retries=100):
+        """
+        Latest state dict with its sequence and timestamp, or None if nothing newer than after_sequence
+        has been published.
+        """
+        block = self.block
+        for _ in range(retries):
+            sequence = block[0]
+            if sequence % 2:
+                continue  # Writer is mid-update
+            values = block.copy()
+            if block[0] == sequence:  # No write started while copying
+                if sequence <= after_sequence:
+                    return None
+                state = dict(zip(STATE_FIELDS, values[2:].tolist()))
+                state["sequence"] = int(sequence)
+                state["timestamp"] = float(values[1])
+                return state
+        return None
+
+    def close(self):
+        self.block = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
@@ -0,0 +1,192 @@
+import math
+import numpy as np
+from drone import Drone
+from motion_planner import MotionPlanner
+from config import (LINEAR_ACCEL, ANGULAR_ACCEL, MIN_SPEED, SCENE_FILE, TERRAIN_FILE, DRONE_INITIAL_X,
+                    DRONE_INITIAL_Y, DRONE_INITIAL_YAW, ENV_STEP_TIME, ENV_MAX_SPEED, ENV_MAX_YAW_RATE,
+                    ENV_OBSTACLE_COUNT, ENV_OBSTACLE_RANGE, ENV_MAX_EPISODE_TIME, ENV_START_JITTER, ENV_START_FLYING,
+                    ENV_END_ON_COLLISION, ENV_RANGE_SENSORS)
+
+MOVEMENT_COMMANDS = {"takeoff", "land", "up", "down", "left", "right", "forward", "back", "cw", "ccw", "flip", "go",
+                     "curve"}
+
+
+def create_world(terrain=None):
+    """Collision detector for SCENE_FILE, or for create_obstructions() when no scene is set."""
+    if SCENE_FILE:
+        from scene import load_scene
+        return load_scene(SCENE_FILE).create_collision_detector(terrain)
+    from obstruction_visuals import create_obstructions
+    from collision_detector import CollisionDetector
+    return CollisionDetector(create_obstructions(), terrain=terrain)
+
+
+"""Drone environment driven one step at a time, for training and tuning loops.
+
+reset() puts the drone back at its start, step() applies a Tello command or a velocity action in simulated time
+(plus the wind drift over its duration when the weather has wind) and close() releases the world. The
+obstructions and their collision index are built once and shared by every episode, so a reset only rewrites the
+drone's fields. Observations are NumPy arrays:
+    pose:      [x, y, z, yaw] (cm, degrees)
+    battery:   [percent]
+    obstacles: clearance (cm) to the nearest obstructions, ascending, padded with the sensing range
+    <sensor>:  one distance (cm) per ray of each range sensor, when range_sensors is enabled
+"""
+class DroneEnv:
+    def __init__(self, collision_detector=None, terrain=None, weather_data=None, step_time=ENV_STEP_TIME,
+                 obstacle_count=ENV_OBSTACLE_COUNT, obstacle_range=ENV_OBSTACLE_RANGE,
+                 max_episode_time=ENV_MAX_EPISODE_TIME, start_jitter=ENV_START_JITTER,
+                 range_sensors=ENV_RANGE_SENSORS):
+        """
+        Initialize the environment; call reset() before the first step.
+
+        Args:
+            collision_detector: Prebuilt detector to share between environments, or None to build the world
+            terrain: Optional Terrain, loaded from TERRAIN_FILE when None
+            weather_data: Weather data dictionary for the drone (temperature and wind), or None
+            step_time: Seconds each velocity action is held
+            obstacle_count: Length of the obstacles observation
+            obstacle_range: Obstructions farther than this (cm) are not observed
+            max_episode_time: Simulated seconds before an episode ends, or None
+            start_jitter: Random start offset (cm) in x and y drawn on every reset
+            range_sensors: Observe the RANGE_SENSORS readings (True), a list of RangeSensors, or nothing (False)
+        """
+        if terrain is None and TERRAIN_FILE:
+            from terrain import load_terrain
+            terrain = load_terrain(TERRAIN_FILE)
+        self.collision_detector = collision_detector if collision_detector is not None else create_world(terrain)
+        self.wind = None
+        if weather_data:
+            from wind import create_wind_field
+            self.wind = create_wind_field(weather_data, self.collision_detector)
+        self.sim_time = 0.0
+        self.drone = Drone(weather_data, terrain, clock=self._clock)
+        self.motion_planner = MotionPlanner(self.drone, LINEAR_ACCEL, ANGULAR_ACCEL)
+        self.step_time = step_time
+        self.obstacle_count = obstacle_count
+        self.obstacle_range = obstacle_range
+        self.max_episode_time = max_episode_time
+        self.start_jitter = start_jitter
+        # Velocity action bounds: right, forward, up (cm/s) and yaw rate (degrees/s)
+        self.action_high = np.array((ENV_MAX_SPEED, ENV_MAX_SPEED, ENV_MAX_SPEED, ENV_MAX_YAW_RATE), dtype=float)
+        self.rng = np.random.default_rng()
+        self.episode_steps = 0
+        self.ray_caster = None
+        self.sensors = []
+        if range_sensors:
+            from sensors import RayCaster, create_sensors
+            self.ray_caster = RayCaster(self.collision_detector, terrain)
+            self.sensors = create_sensors() if range_sensors is True else list(range_sensors)
+
+    def _clock(self):
+        return self.sim_time
+
+    def reset(self, seed=None, flying=ENV_START_FLYING):
+        """
+        Start a new episode and return its first observation.
+
+        Args:
+            seed: Reseeds the start jitter, for reproducible episodes
+            flying: Start connected and hovering at takeoff height instead of landed
+        """
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        x, y = DRONE_INITIAL_X, DRONE_INITIAL_Y
+        if self.start_jitter:
+            x += self.rng.uniform(-self.start_jitter, self.start_jitter)
+            y += self.rng.uniform(-self.start_jitter, self.start_jitter)
+        self.sim_time = 0.0
+        self.episode_steps = 0
+        self.drone.reset(x, y, DRONE_INITIAL_YAW)
+        if flying:
+            self.drone.connected = True
+            self.drone.flying = True
+            self.drone.z = self.drone.ground_height() + 100  # Same hover height as takeoff
+        return self.observe()
+
+    def observe(self):
+        drone = self.drone
+        observation = {
+            "pose": np.array((drone.x, drone.y, drone.z, drone.yaw)),
+            "battery": np.array((drone.battery,)),
+            "obstacles": self.collision_detector.obstacle_distances((drone.x, drone.y, drone.z), self.obstacle_count,
+                                                                    self.obstacle_range),
+        }
+        for sensor in self.sensors:
+            observation[sensor.name] = sensor.read(self.ray_caster, drone.get_state())
+        return observation
+
+    def step(self, action):
+        """
+        Apply one action and advance simulated time by its duration.
+
+        Args:
+            action: Tello command string (runs to completion, taking its predicted motion time), or
+                [right, forward, up, yaw_rate] velocities in cm/s and degrees/s held for step_time
+        Returns:
+            (observation, done, info); info holds the drone's response, the obstruction hit (or None),
+            the step duration and the episode time
+        """
+        if self.drone is None:
+            raise RuntimeError("step() called on a closed DroneEnv")
+        start = self.drone.get_state()
+        if isinstance(action, str):
+            response, duration = self._apply_command(action, start)
+        else:
+            response, duration = self._apply_velocity(action)
+        if self.wind is not None and self.drone.flying and duration > 0:
+            dx, dy, _ = self.wind.drift((start["x"], start["y"], start["z"]), duration, self.sim_time)[0]
+            self.drone.x += dx
+            self.drone.y += dy
+        self.sim_time += duration
+        self.drone.update_battery(self.sim_time)
+        self.episode_steps += 1
+
+        target = self.drone.get_state()
+        collision = None
+        if (target["x"], target["y"], target["z"]) != (start["x"], start["y"], start["z"]):
+            path = self.motion_planner.plan_path(action, start, target) if isinstance(action, str) else None
+            if path is None:
+                collision = self.collision_detector.check_path_collision(start, target)
+            else:
+                collision = self.collision_detector.check_polyline_collision(path.chords()[1])
+        done = ((collision is not None and ENV_END_ON_COLLISION) or self.drone.battery <= 0 or
+                (self.max_episode_time is not None and self.sim_time >= self.max_episode_time))
+        info = {"response": response, "collision": collision, "duration": duration, "time": self.sim_time,
+                "flying": self.drone.flying}
+        return self.observe(), done, info
+
+    def _apply_command(self, command, start):
+        max_speed = max(self.drone.speed, MIN_SPEED)
+        response = self.drone.execute_command(command)
+        name = command.split()[0].lower() if command.strip() else ""
+        if response != "ok" or name not in MOVEMENT_COMMANDS:
+            return response, 0.0
+        return response, self.motion_planner.calculate_move_time(command, start, self.drone.get_state(), max_speed)
+
+    def _apply_velocity(self, action):
+        """Integrate body-frame velocities over one step, like the Tello "rc" command."""
+        drone = self.drone
+        if not drone.flying:
+            return "error", self.step_time
+        right, forward, up, yaw_rate = np.clip(np.asarray(action, dtype=float), -self.action_high, self.action_high)
+        dt = self.step_time
+        heading = math.radians(drone.yaw + yaw_rate * dt / 2)  # Mid-step heading
+        drone.x += (forward * math.sin(heading) + right * math.cos(heading)) * dt
+        drone.y += (forward * math.cos(heading) - right * math.sin(heading)) * dt
+        drone.z = max(drone.ground_height(), drone.z + up * dt)
+        drone.yaw = (drone.yaw + yaw_rate * dt) % 360
+        return "ok", dt
+
+    def close(self):
+        """Release the world; the environment cannot be stepped afterwards."""
+        self.collision_detector = None
+        self.ray_caster = None
+        self.drone = None
+        self.motion_planner = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
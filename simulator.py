@@ -1,28 +1,269 @@
-import pygame
+import time
 from drone import Drone
-from visuals import Visualizer
-from obstruction_visuals import create_obstructions
 from motion_planner import MotionPlanner
-from collision_detector import CollisionDetector
-from config import (FRAME_RATE, LINEAR_ACCEL, ANGULAR_ACCEL, MIN_SPEED)
+from mission_report import MissionReport
+from config import (FRAME_RATE, LINEAR_ACCEL, ANGULAR_ACCEL, MIN_SPEED, SCENE_FILE, WORLD_STREAMING, TERRAIN_FILE,
+                    SIM_MODE, DYNAMICS_ENABLED, SENSORS_ENABLED, MISSION_REPORT_FILE,
+                    MISSION_REPORT_CLEARANCE_RANGE, MISSION_CACHE_DIR, MISSION_TRAJECTORY_RATE, HOT_RELOAD,
+                    TELEMETRY_ENABLED)
 
+SIM_MODES = ("analysis", "headless", "windowed")
+MOVEMENT_COMMANDS = {"takeoff", "land", "up", "down", "left", "right", "forward", "back", "cw", "ccw", "flip", "go",
+                     "curve"}
+
+
+"""Runs a command sequence against the simulated drone.
+
+Heavy modules are imported only by the modes that use them: "analysis" needs just the drone model and motion
+planner, "headless" adds the obstructions, scene and collision detection (NumPy), and only "windowed" loads
+pygame, OpenGL and the renderers.
+"""
 class Simulator:
-    def __init__(self, commands, weather_data=None):
-        self.drone = Drone()
-        self.visualizer = Visualizer()
+    def __init__(self, commands, weather_data=None, state_publisher=None, mode=SIM_MODE, report=None):
+        """
+        Initialize the simulator.
+
+        Args:
+            commands: List of (command, delay) tuples
+            weather_data: Weather data dictionary, or None
+            state_publisher: Optional SharedDroneState read by other processes
+            mode: One of SIM_MODES
+            report: MissionReport receiving the analysis and execution rows, or None for a new one
+        """
+        if mode not in SIM_MODES:
+            raise ValueError(f"Unknown simulation mode '{mode}', expected one of {SIM_MODES}")
+        self.mode = mode
+        self.report = report if report is not None else MissionReport()
+        self.mission = None  # Compiled mission (see compile_mission), set by analyze_commands
+        self.use_mission_cache = bool(MISSION_CACHE_DIR)
+        self.restart_pending = None  # "incremental" or "full" once a reload asks for the mission to restart
+        self.terrain = None
+        if TERRAIN_FILE:
+            from terrain import load_terrain
+            self.terrain = load_terrain(TERRAIN_FILE)
+        self.drone = Drone(weather_data, terrain=self.terrain)
+        self.weather_data = weather_data  # Kept to rebuild the wind field when the scene is reloaded
+        self.visualizer = None
+        if mode == "windowed":
+            from visuals import Visualizer  # pygame and OpenGL
+            self.visualizer = Visualizer(self.terrain)
         self.motion_planner = MotionPlanner(self.drone, LINEAR_ACCEL, ANGULAR_ACCEL)
         self.commands = commands
+        self.state_publisher = state_publisher  # Optional SharedDroneState read by other processes
         self.target_state = self.drone.get_state()
         self.current_state = self.target_state.copy()
         self.frame_rate = FRAME_RATE
         self.linear_accel = LINEAR_ACCEL
         self.angular_accel = ANGULAR_ACCEL
-        self.obstructions = create_obstructions()
-        self.collision_detector = CollisionDetector(self.obstructions)
+        self.world = None
+        self.scene = None
+        self.obstructions = []
+        self.render_batches = []
+        self.collision_detector = None
+        self.wind = None
+        self.dynamics = None
+        self.ray_caster = None
+        self.sensors = []
+        self.sensor_readings = {}  # Sensor name -> distances (cm) for the latest frame
+        if mode != "analysis":
+            self._load_world()
+            self._create_wind()
+            if DYNAMICS_ENABLED:
+                from dynamics import PointMassDynamics
+                self.dynamics = PointMassDynamics(1)
+                state = self.current_state
+                self.dynamics.reset((state["x"], state["y"], state["z"]), state["yaw"])
+            if SENSORS_ENABLED:
+                from sensors import RayCaster, create_sensors
+                self.ray_caster = RayCaster(self.collision_detector, self.terrain)
+                self.sensors = create_sensors()
+                if any(sensor.name == "tof" for sensor in self.sensors):
+                    self.drone.range_finder = self._tof_distance
+        self.telemetry = None
+        if TELEMETRY_ENABLED and mode != "analysis":
+            from telemetry import TelemetryServer
+            self.telemetry = TelemetryServer().start()
+            self._publish_scene()
+        self.reloader = None
+        if HOT_RELOAD and self.visualizer:
+            from hot_reload import HotReloader
+            self.reloader = HotReloader(self)
+
+    def _load_world(self):
+        """Build obstructions and collision detection, plus their GL batches when there is a window."""
+        windowed = self.visualizer is not None
+        if WORLD_STREAMING:
+            from world_streaming import ChunkedWorld
+            self.world = ChunkedWorld(terrain=self.terrain)
+            self.world.update(self.current_state)
+            self.render_batches = [self.world]
+            self.collision_detector = self.world
+        elif SCENE_FILE:
+            from scene import load_scene
+            self.scene = load_scene(SCENE_FILE)
+            self.obstructions = self.scene.obstructions
+            if windowed:
+                from obstruction_renderer import create_scene_batches
+                self.render_batches = create_scene_batches(self.scene)
+            self.collision_detector = self.scene.create_collision_detector(self.terrain)
+        else:
+            from obstruction_visuals import create_obstructions
+            from collision_detector import CollisionDetector
+            self.obstructions = create_obstructions()
+            if windowed:
+                from obstruction_renderer import create_renderables
+                self.render_batches = create_renderables(self.obstructions)
+            self.collision_detector = CollisionDetector(self.obstructions, terrain=self.terrain)
+
+    def _create_wind(self):
+        """Wind field for the weather over the current obstructions (their lee is sheltered), or None."""
+        self.wind = None
+        if self.weather_data:
+            from wind import create_wind_field
+            self.wind = create_wind_field(self.weather_data, self.collision_detector)
+
+    def _drift_target(self, drone, start_state, target_state, duration, elapsed):
+        """
+        Blow a motion's target (and the drone model) downwind by the drift over its `duration` seconds.
+
+        Like DroneEnv, the drift is taken at the start of the motion and only while moving: between commands the
+        position hold keeps the drone in place. The analysis and the execution both call this, so the predicted
+        trajectory and its collision checks follow the same drifted path the drone flies. The dynamics model
+        feels the wind through drag instead.
+        """
+        if self.wind is None or self.dynamics is not None or not drone.flying or duration <= 0:
+            return
+        dx, dy, _ = self.wind.drift((start_state["x"], start_state["y"], start_state["z"]), duration, elapsed)[0]
+        target_state["x"] += float(dx)
+        target_state["y"] += float(dy)
+        drone.x += float(dx)
+        drone.y += float(dy)
+
+    def _step_dynamics(self, delta_time, elapsed, target=None):
+        """Fly the dynamics model toward the drone's commanded state (or `target`); the wind acts through drag."""
+        state = self.current_state
+        wind = None
+        if self.wind is not None:
+            wind = self.wind.sample((state["x"], state["y"], state["z"]), elapsed)
+        if target is None:
+            target = self.drone.get_state()
+        self.dynamics.set_targets((target["x"], target["y"], target["z"]), target["yaw"], self.drone.speed)
+        self.dynamics.step(delta_time, wind, self.drone.ground_height(state["x"], state["y"]))
+        self.current_state = self.dynamics.states()[0]
+
+    def _read_sensors(self):
+        from sensors import read_sensors
+        self.sensor_readings = read_sensors(self.ray_caster, self.sensors, self.current_state)
+
+    def _tof_distance(self):
+        """Downward ToF reading for the drone's current state, answering "tof?"."""
+        if "tof" not in self.sensor_readings:
+            self._read_sensors()
+        return float(self.sensor_readings["tof"].min())
+
+    def _clearance(self):
+        """Clearance (cm) from the displayed drone to the nearest obstruction, capped at the report's range."""
+        state = self.current_state
+        position = (state["x"], state["y"], state["z"])
+        world = self.collision_detector
+        if hasattr(world, "detectors_near"):
+            detectors = world.detectors_near(state["x"], state["y"], MISSION_REPORT_CLEARANCE_RANGE)
+        else:
+            detectors = [world]
+        return min([float(detector.obstacle_distances(position, 1, MISSION_REPORT_CLEARANCE_RANGE)[0])
+                    for detector in detectors], default=float(MISSION_REPORT_CLEARANCE_RANGE))
+
+    def _check_motion(self, start_state, target_state, path=None):
+        """Obstruction hit moving from start_state to target_state, along the chords of `path` when it curves."""
+        if path is None:
+            return self.collision_detector.check_path_collision(start_state, target_state)
+        # Shift the chords with the start and end, like interpolate_state, so drift is swept as well
+        distances, points = path.chords()
+        offsets = [[state[key] - origin for key, origin in zip(("x", "y", "z"), anchor)]
+                   for state, anchor in ((start_state, path.start), (target_state, path.end))]
+        vertices = [[value + offsets[0][k] + (offsets[1][k] - offsets[0][k]) * distance / path.length
+                     for k, value in enumerate(point)] for distance, point in zip(distances, points)]
+        return self.collision_detector.check_polyline_collision(vertices)
+
+    def _collision_fields(self, obstruction):
+        """Report fields describing the obstruction a command collides with."""
+        if obstruction is None:
+            return {}
+        x, y, z = (float(value) for value in obstruction.position)
+        index = next((i for i, candidate in enumerate(self.obstructions) if candidate is obstruction), None)
+        return {"collision_id": index, "collision_type": type(obstruction).__name__,
+                "collision_x": x, "collision_y": y, "collision_z": z}
+
+    def _is_running(self):
+        if self.restart_pending:
+            return False
+        return self.visualizer.is_running() if self.visualizer else True
+
+    def set_physics(self, frame_rate, linear_accel, angular_accel):
+        self.frame_rate = frame_rate
+        self.linear_accel = self.motion_planner.linear_accel = linear_accel
+        self.angular_accel = self.motion_planner.angular_accel = angular_accel
+
+    def replace_world(self, obstructions, collision_detector, render_batches, scene=None):
+        """Swap in a reloaded world; the render batches are already built (and old ones released) by the caller."""
+        self.obstructions = obstructions
+        self.collision_detector = collision_detector
+        self.render_batches = render_batches
+        self.scene = scene
+        self._create_wind()  # The shelter behind obstructions follows the new scene
+        if self.ray_caster is not None:
+            self.ray_caster.collision_detector = collision_detector
+        if self.telemetry is not None:
+            self._publish_scene()
+
+    def _publish_scene(self):
+        from telemetry import scene_description
+        self.telemetry.set_scene(scene_description(self.collision_detector, self.terrain))
+
+    def request_restart(self, incremental):
+        """Restart the mission at the next frame; incremental restarts reuse the unchanged part of the analysis."""
+        if incremental and self.restart_pending != "full":
+            self.restart_pending = "incremental"
+        else:
+            self.restart_pending = "full"
+
+    def _restart_mission(self):
+        """Put the drone back at its start and analyze the (reloaded) commands again."""
+        previous = self.mission if self.restart_pending == "incremental" else None
+        self.restart_pending = None
+        self.drone.reset()
+        self.target_state = self.drone.get_state()
+        self.current_state = self.target_state.copy()
+        if self.dynamics is not None:
+            state = self.current_state
+            self.dynamics.reset((state["x"], state["y"], state["z"]), state["yaw"])
+        self.sensor_readings = {}
+        self.report.log("\nRestarting mission after reload...")
+        self.analyze_commands(previous)
+
+    def _tick(self, clock):
+        """Seconds of simulated time for the next frame: wall clock when windowed, a fixed step when headless."""
+        if clock is None:
+            return 1.0 / self.frame_rate
+        return clock.tick(self.frame_rate) / 1000.0
+
+    def _present(self, delta_time):
+        if self.sensors:
+            self._read_sensors()
+        if self.world:
+            self.world.update(self.current_state)
+        if self.visualizer:
+            self.visualizer.update_camera(self.current_state, delta_time)
+            self.visualizer.render(self.current_state, self.render_batches)
+            self.visualizer.pump_events()
+        if self.reloader:
+            self.reloader.poll()
 
     def execute_commands(self, clock, sim_start_time):
-        print("\n*****************************\n")
-        print("Starting 3D Drone Simulator...")
+        report = self.report
+        report.log("\n*****************************\n")
+        report.log("Starting 3D Drone Simulator...")
+        report_row = None  # Row of the latest executed command, whose min clearance is tracked every frame
         current_time = sim_start_time
         elapsed_since_start = 0
         command_count = 0
@@ -31,10 +272,11 @@ class Simulator:
             command_start_times.append(command_start_times[i - 1] + self.commands[i - 1][1])
 
         # Track active animation
-        active_animation = None  # (cmd, total_time, elapsed_time, start_state, target_state, accel_time, coast_time)
+        active_animation = None  # (cmd, total_time, elapsed_time, start_state, target_state, accel_time, coast_time,
+                                 #  path); path is None for straight motion
 
-        while self.visualizer.is_running() and (command_count < len(self.commands) or active_animation):
-            delta_time = clock.tick(self.frame_rate) / 1000.0
+        while self._is_running() and (command_count < len(self.commands) or active_animation):
+            delta_time = self._tick(clock)
             elapsed_since_start += delta_time
             current_time = sim_start_time + elapsed_since_start
             is_busy = active_animation is not None
@@ -45,122 +287,293 @@ class Simulator:
                 start_time = command_start_times[command_count]
                 if elapsed_since_start >= start_time:
                     command_count += 1
+                    row = {"phase": "execution", "index": command_count, "command": cmd, "delay": delay,
+                           "start_time": elapsed_since_start, "battery": self.drone.battery}
                     if is_busy:
-                        print(f"[{command_count}] [{cmd}] ignored")
+                        report.log(f"[{command_count}] [{cmd}] ignored")
+                        report.add(duration=0, ignored=True, **row)
                     else:
                         response = self.drone.execute_command(cmd)
-                        print(f"[{command_count}] {cmd}: {response}")
+                        report.log(f"[{command_count}] {cmd}: {response}")
                         self.target_state = self.drone.get_state()
-                        colliding_obstruction = self.collision_detector.check_path_collision(self.current_state,
-                                                                                             self.target_state)
-                        if colliding_obstruction:
-                            pos_x, pos_y, pos_z = colliding_obstruction.position
-                            print(f"***[{command_count}] [{cmd}] collides at [{pos_x}, {pos_y}, {pos_z}]***")
-
-                        movement_commands = {"takeoff", "land", "up", "down", "left", "right", "forward", "back", "cw",
-                                             "ccw", "flip", "go"}
-                        if cmd.split()[0].lower() in movement_commands:
+                        is_movement = cmd.split()[0].lower() in MOVEMENT_COMMANDS
+                        total_time = 0
+                        path = None
+                        if is_movement:
                             start_state = self.current_state.copy()
                             max_speed = max(self.drone.speed, MIN_SPEED)
+                            if response == "ok":
+                                path = self.motion_planner.plan_path(cmd, start_state, self.target_state)
                             total_time = self.motion_planner.calculate_move_time(cmd, start_state, self.target_state,
                                                                                  max_speed)
+                            self._drift_target(self.drone, start_state, self.target_state, total_time,
+                                               elapsed_since_start)
+
+                        colliding_obstruction = self._check_motion(self.current_state, self.target_state, path)
+                        if colliding_obstruction:
+                            pos_x, pos_y, pos_z = colliding_obstruction.position
+                            report.log(f"***[{command_count}] [{cmd}] collides at [{pos_x}, {pos_y}, {pos_z}]***")
+                        report_row = report.add(duration=total_time, response=response, ignored=False,
+                                                **self._collision_fields(colliding_obstruction), **row)
+
+                        if is_movement:
                             accel_time = min(max_speed / self.linear_accel, total_time / 2)
                             coast_time = max(0, total_time - 2 * accel_time)
                             if total_time > 0:
                                 active_animation = (
-                                cmd, total_time, 0, start_state, self.target_state, accel_time, coast_time)
+                                cmd, total_time, 0, start_state, self.target_state, accel_time, coast_time, path)
 
             # Update active animation
+            dynamics_target = None
             if active_animation:
-                cmd, total_time, elapsed_time, start_state, target_state, accel_time, coast_time = active_animation
+                (cmd, total_time, elapsed_time, start_state, target_state, accel_time, coast_time,
+                 path) = active_animation
                 elapsed_time += delta_time
                 if elapsed_time >= total_time:
-                    self.current_state = target_state.copy()
+                    if self.dynamics is None:
+                        self.current_state = target_state.copy()
                     active_animation = None
                 else:
-                    self.current_state = self.motion_planner.interpolate_state(
-                        start_state.copy(), target_state, elapsed_time, total_time, accel_time, coast_time
-                    )
-                    active_animation = (cmd, total_time, elapsed_time, start_state, target_state, accel_time, coast_time)
+                    if self.dynamics is None or path is not None:
+                        state = self.motion_planner.interpolate_state(
+                            start_state.copy(), target_state, elapsed_time, total_time, accel_time, coast_time, path
+                        )
+                        if self.dynamics is None:
+                            self.current_state = state
+                        else:
+                            dynamics_target = state  # Chase the point on the curve, not its end
+                    active_animation = (cmd, total_time, elapsed_time, start_state, target_state, accel_time,
+                                        coast_time, path)
 
+            if self.dynamics is not None:
+                self._step_dynamics(delta_time, elapsed_since_start, dynamics_target)
             self.drone.update_battery(current_time)
-            self.visualizer.render(self.current_state, self.obstructions)
-            pygame.event.pump()
+            self.publish_state(elapsed_since_start)
+            self._present(delta_time)
+            if report_row is not None:
+                clearance = self._clearance()
+                previous = report.columns["min_clearance"][report_row]
+                if previous is None or clearance < previous:
+                    report.update(report_row, min_clearance=clearance)
+
+        report.log("Commands interrupted by reload." if self.restart_pending else "Commands completed.")
+
+    def analyze_commands(self, previous=None):
+        """
+        Analyze commands in advance to predict ignores and suggest delays without altering state.
 
-        print("Commands completed.")
+        Args:
+            previous: Mission compiled for an earlier version of the commands in the same world, whose entries
+                before the first changed command are reused
+        """
+        report = self.report
+        report.log("Analyzing command sequence...")
+        self.mission = self._load_mission(previous)
+        issues_found = False
+        for entry in self.mission["timeline"]:
+            i, cmd, delay = entry["index"], entry["command"], entry["delay"]
+            if entry["ignored"]:
+                issues_found = True
+                report.log(f"[{i}] [{cmd}] [{delay:.5f}] - previous command delay too short!")
+                if entry["suggested_delay"] is not None:
+                    prev_cmd, prev_delay = self.commands[i - 2]
+                    report.log(f"  Suggestion: Increase delay for [{prev_cmd}] from {prev_delay:.5f} to "
+                               f"{entry['suggested_delay']:.5f} seconds")
+            collision = entry["collision"] or {}
+            if collision:
+                report.log(f"***[{i}] [{cmd}] predicted to collide at "
+                           f"[{collision['collision_x']}, {collision['collision_y']}, {collision['collision_z']}]***")
+            report.add(phase="analysis", index=i, command=cmd, delay=delay, start_time=entry["start_time"],
+                       duration=entry["duration"], response=entry["response"], ignored=entry["ignored"],
+                       suggested_delay=entry["suggested_delay"], **collision)
 
-    def analyze_commands(self):
-        """Analyze commands in advance to predict ignores and suggest delays without altering state."""
-        print("Analyzing command sequence...")
+        if not issues_found:
+            report.log("Commands expected to proceed smoothly")
+
+    def _load_mission(self, previous=None):
+        """Compiled mission from the mission cache when nothing it depends on changed, else compiled now."""
+        cache = key = None
+        if self.use_mission_cache:
+            from mission_cache import MissionCache, mission_key
+            cache = MissionCache()
+            key = mission_key(self.commands, self.weather_data if self.wind is not None else None)
+            mission = cache.get(key)
+            # An entry compiled without a world (analysis mode) has no collisions to offer a run that has one
+            if mission is not None and (mission["collisions_checked"] or self.collision_detector is None):
+                self.report.log(f"Reusing cached mission analysis ({key[:12]})")
+                return mission
+        mission = self.compile_mission(previous)
+        if cache:
+            cache.put(key, mission)
+        return mission
+
+    def compile_mission(self, previous=None):
+        """
+        Predict the command timeline from the drone model and motion planner alone.
+
+        Args:
+            previous: Mission compiled in the same world for earlier commands; its entries up to the first
+                changed (command, delay) pair are kept and the analysis resumes from their saved state
+        Returns:
+            Dictionary with "timeline" (one entry per command: start time, duration, predicted response, ignore
+            flag, suggested delay, start/end state and predicted collision), "trajectory" ([t, x, y, z, yaw]
+            samples at MISSION_TRAJECTORY_RATE along every predicted motion) and "collisions_checked" (whether a
+            world was loaded to check the predicted paths against)
+        """
         command_start_times = [0]
         for i, (cmd, delay) in enumerate(self.commands[1:], 1):
             command_start_times.append(command_start_times[i - 1] + self.commands[i - 1][1])
 
         # Create a temporary drone instance for analysis
         from drone import Drone  # Ensure this import is at the top of your file
-        temp_drone = Drone()  # Fresh drone instance
+        temp_drone = Drone(terrain=self.terrain)  # Fresh drone instance
         temp_drone.state = self.current_state.copy()  # Start from current state
         temp_motion_planner = MotionPlanner(temp_drone, self.linear_accel, self.angular_accel)
 
         active_until = 0  # Time when the drone is no longer busy
-        issues_found = False
         analysis_state = self.current_state.copy()  # Track state changes during analysis
+        timeline = []
+        trajectory = []
+
+        first = 0
+        if previous is not None:
+            for entry in previous["timeline"]:
+                if first >= len(self.commands) or [entry["command"], entry["delay"]] != list(self.commands[first]):
+                    break
+                first += 1
+        if first:
+            timeline = previous["timeline"][:first]
+            resume = timeline[-1]["after"]
+            trajectory = previous["trajectory"][:resume["trajectory_length"]]
+            active_until = resume["active_until"]
+            analysis_state = dict(resume["analysis_state"])
+            for name, value in resume["drone"].items():
+                setattr(temp_drone, name, value)
 
-        for i, ((cmd, delay), start_time) in enumerate(zip(self.commands, command_start_times)):
+        for i in range(first, len(self.commands)):
+            cmd, delay = self.commands[i]
+            start_time = command_start_times[i]
             # Calculate animation time using temporary drone
             max_speed = max(temp_drone.speed, MIN_SPEED)
-            temp_drone.execute_command(cmd)  # Update temp drone state
+            response = temp_drone.execute_command(cmd)  # Update temp drone state
             target_state = temp_drone.get_state()
 
-            movement_commands = {"takeoff", "land", "up", "down", "left", "right", "forward", "back", "cw", "ccw",
-                                 "flip", "go"}
             command = cmd.split()[0].lower()
-            if command in movement_commands:
+            path = None
+            if command in MOVEMENT_COMMANDS:
+                if response == "ok":
+                    path = temp_motion_planner.plan_path(cmd, analysis_state, target_state)
                 total_time = temp_motion_planner.calculate_move_time(cmd, analysis_state, target_state, max_speed)
             else:
                 total_time = 0
 
+            entry = {"index": i + 1, "command": cmd, "delay": delay, "start_time": start_time,
+                     "duration": total_time, "response": None, "ignored": False, "suggested_delay": None,
+                     "start_state": analysis_state.copy(), "end_state": None, "collision": None}
             # Check if this command starts while drone is busy
             if start_time < active_until:
-                issues_found = True
-                print(f"[{i + 1}] [{cmd}] [{delay:.5f}] - previous command delay too short!")
+                entry["ignored"] = True
                 if i > 0:
-                    prev_cmd, prev_delay = self.commands[i - 1]
-                    required_delay = active_until - command_start_times[i - 1]
-                    print(
-                        f"  Suggestion: Increase delay for [{prev_cmd}] from {prev_delay:.5f} to {required_delay:.5f} seconds")
+                    entry["suggested_delay"] = active_until - command_start_times[i - 1]
             else:
+                entry["response"] = response
+                self._drift_target(temp_drone, analysis_state, target_state, total_time, start_time)
+                entry["end_state"] = target_state.copy()
+                if self.collision_detector is not None:
+                    entry["collision"] = self._collision_fields(
+                        self._check_motion(analysis_state, target_state, path)) or None
                 if total_time > 0:
+                    trajectory += self._predict_motion(temp_motion_planner, analysis_state, target_state, start_time,
+                                                       total_time, max_speed, path)
                     active_until = start_time + total_time
                     analysis_state = target_state.copy()  # Update analysis state
+            # Everything a later compile needs to resume after this command
+            entry["after"] = {"active_until": active_until, "analysis_state": analysis_state.copy(),
+                              "trajectory_length": len(trajectory),
+                              "drone": {name: getattr(temp_drone, name) for name in
+                                        ("x", "y", "z", "yaw", "speed", "connected", "flying")}}
+            timeline.append(entry)
 
             # Reset temp_drone state for next iteration
             temp_drone.state = analysis_state.copy()
 
-        if not issues_found:
-            print("Commands expected to proceed smoothly")
+        return {"timeline": timeline, "trajectory": trajectory,
+                "collisions_checked": self.collision_detector is not None}
+
+    def _predict_motion(self, motion_planner, start_state, target_state, start_time, total_time, max_speed,
+                        path=None):
+        """[t, x, y, z, yaw] samples of one planned motion, as the execution would interpolate it."""
+        accel_time = min(max_speed / self.linear_accel, total_time / 2)
+        coast_time = max(0, total_time - 2 * accel_time)
+        samples = max(1, int(total_time * MISSION_TRAJECTORY_RATE))
+        points = []
+        for k in range(samples + 1):
+            elapsed = total_time * k / samples
+            state = motion_planner.interpolate_state(start_state.copy(), target_state, elapsed, total_time,
+                                                     accel_time, coast_time, path)
+            points.append([start_time + elapsed, state["x"], state["y"], state["z"], state["yaw"]])
+        return points
 
-    def render_loop(self, clock):
+    def render_loop(self, clock, sim_start_time):
         """Keep window open and continue rendering after commands are executed."""
-        print("Commands completed. Close the window or press Escape to exit.")
-        while self.visualizer.is_running():
-            delta_time = clock.tick(self.frame_rate) / 1000.0
+        self.report.log("Commands completed. Close the window or press Escape to exit.")
+        self.report.flush()
+        import pygame
+        while self.visualizer.is_running() and not self.restart_pending:
+            delta_time = self._tick(clock)
             current_time = pygame.time.get_ticks() / 1000.0
+            if self.dynamics is not None:
+                self._step_dynamics(delta_time, current_time)
             self.drone.update_battery(current_time)
-            self.visualizer.render(self.current_state, self.obstructions)
-            pygame.event.pump()
+            self.publish_state(current_time - sim_start_time)
+            self._present(delta_time)
 
-    def run(self):
-        """Run the simulation by executing commands and maintaining the render loop."""
-        clock = pygame.time.Clock()
-        sim_start_time = pygame.time.get_ticks() / 1000.0
+    def publish_state(self, sim_time=0.0):
+        """Share the displayed drone state with other processes (launcher.py) and telemetry subscribers."""
+        if self.state_publisher:
+            self.state_publisher.write(self.current_state, self.drone.battery, self.drone.flying)
+        if self.telemetry is not None:
+            self.telemetry.publish(self.current_state, self.drone.battery, self.drone.flying, sim_time)
 
+    def run(self):
+        """Run the simulation: analysis, then execution (not in analysis mode), then the render loop (windowed)."""
         # Analyze commands before execution
         self.analyze_commands()
+        if self.mode == "analysis":
+            self._finish_report()
+            return
+
+        if self.visualizer:
+            import pygame
+            clock = pygame.time.Clock()
+            sim_start_time = pygame.time.get_ticks() / 1000.0
+        else:
+            clock = None  # Headless runs in simulated time as fast as possible
+            sim_start_time = time.time()
 
-        # Run Commands + Sim
-        self.execute_commands(clock, sim_start_time)
-        self.render_loop(clock)
+        # Run Commands + Sim, again from the start whenever a hot reload restarts the mission
+        while True:
+            self.execute_commands(clock, sim_start_time)
+            if self.visualizer and not self.restart_pending:
+                self.render_loop(clock, sim_start_time)
+            if not self.restart_pending:
+                break
+            self._restart_mission()
+            sim_start_time = pygame.time.get_ticks() / 1000.0 if self.visualizer else time.time()
+        if self.visualizer:
+            for batch in self.render_batches:
+                batch.delete()
+        if self.world:
+            self.world.close()
+        if self.telemetry is not None:
+            self.telemetry.close()
+        if self.visualizer:
+            self.visualizer.quit()
+        self.report.log("Simulation ended.")
+        self._finish_report()
 
-        self.visualizer.quit()
-        print("Simulation ended.")
\ No newline at end of file
+    def _finish_report(self):
+        """Write out buffered console lines and append the report rows to MISSION_REPORT_FILE."""
+        self.report.flush()
+        if MISSION_REPORT_FILE:
+            self.report.to_jsonl(MISSION_REPORT_FILE)
\ No newline at end of file
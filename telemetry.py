@@ -0,0 +1,402 @@
+import json
+import selectors
+import socket
+import struct
+import threading
+import zlib
+from config import (TELEMETRY_HOST, TELEMETRY_PORT, TELEMETRY_POSITION_STEP, TELEMETRY_YAW_STEP,
+                    TELEMETRY_KEYFRAME_INTERVAL)
+
+TELEMETRY_VERSION = 1  # Sent in the scene message; bump whenever the wire format changes
+
+# Message types; every message is a "<IB" header (payload length, type) followed by the payload
+MSG_SCENE = 1  # zlib-compressed JSON scene description
+MSG_KEYFRAME = 2  # "<Iq" sequence and time (ms), then one "<i" per field
+MSG_DELTA = 3  # Varints: sequence gap, time delta (ms); a changed-field mask byte; a varint delta per changed field
+HEADER = struct.Struct("<IB")
+KEYFRAME = struct.Struct("<Iq6i")
+
+# Published drone fields and the step they are quantized to
+FIELDS = ("x", "y", "z", "yaw", "battery", "flying")
+FIELD_STEPS = (TELEMETRY_POSITION_STEP, TELEMETRY_POSITION_STEP, TELEMETRY_POSITION_STEP, TELEMETRY_YAW_STEP,
+               0.1, 1)
+
+
+def quantize(state, battery, flying):
+    """Integer field values (FIELDS order) of a drone state."""
+    values = (state["x"], state["y"], state["z"], state["yaw"], battery or 0, bool(flying))
+    return tuple(int(round(value / step)) for value, step in zip(values, FIELD_STEPS))
+
+
+def dequantize(values):
+    state = {name: value * step for name, value, step in zip(FIELDS, values, FIELD_STEPS)}
+    state["flying"] = bool(values[5])
+    return state
+
+
+def _put_varint(out, value):
+    value = (value << 1) ^ (value >> 63)  # Zigzag, so small negative deltas stay short
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _get_varint(data, offset):
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return (value >> 1) ^ -(value & 1), offset
+        shift += 7
+
+
+def _message(kind, payload):
+    return HEADER.pack(len(payload), kind) + payload
+
+
+def encode_keyframe(seq, time_ms, values):
+    return _message(MSG_KEYFRAME, KEYFRAME.pack(seq, time_ms, *values))
+
+
+def encode_delta(seq_gap, time_delta, previous, values):
+    """Delta message from `previous` to `values`; only the fields that changed are written."""
+    payload = bytearray()
+    _put_varint(payload, seq_gap)
+    _put_varint(payload, time_delta)
+    mask = 0
+    deltas = bytearray()
+    for bit, (old, new) in enumerate(zip(previous, values)):
+        if new != old:
+            mask |= 1 << bit
+            _put_varint(deltas, new - old)
+    payload.append(mask)
+    return _message(MSG_DELTA, bytes(payload + deltas))
+
+
+def encode_scene(scene):
+    return _message(MSG_SCENE, zlib.compress(json.dumps(scene, separators=(",", ":")).encode()))
+
+
+def scene_description(collision_detector, terrain=None):
+    """
+    JSON-ready description of the world a viewer draws: primitive rows, mesh bounds and the terrain extent.
+
+    Streamed worlds (ChunkedWorld) are generated around the drone and are described as "streamed" only.
+    """
+    scene = {"version": TELEMETRY_VERSION, "streamed": False, "primitives": None, "meshes": [], "terrain": None}
+    table = getattr(collision_detector, "table", None)
+    if table is None:
+        scene["streamed"] = collision_detector is not None
+    else:
+        scene["primitives"] = {
+            "kind": table.kind.tolist(),
+            "position": table.position.round(1).tolist(),
+            "size": table.size.round(1).tolist(),
+            "rotation": table.rotation.round(2).tolist(),
+            "color": table.color.round(3).tolist(),
+        }
+        for mesh in collision_detector.meshes:
+            mins, maxs = mesh.bounds()
+            scene["meshes"].append({"min": mins.round(1).tolist(), "max": maxs.round(1).tolist(),
+                                    "color": [round(float(c), 3) for c in mesh.color]})
+    if terrain is not None:
+        width, depth = terrain.size
+        scene["terrain"] = {"origin": [terrain.origin_x, terrain.origin_y], "size": [width, depth],
+                            "min_height": terrain.min_height, "max_height": terrain.max_height}
+    return scene
+
+
+"""Decodes the telemetry stream (from a socket or a recording) back into the scene and drone states."""
+class TelemetryDecoder:
+    def __init__(self):
+        self.buffer = bytearray()
+        self.scene = None
+        self.values = None  # Quantized fields of the latest state
+        self.seq = None
+        self.time_ms = None
+        self.frames = 0
+        self.dropped = 0  # Frames the server skipped because this subscriber was behind
+
+    @property
+    def state(self):
+        """Latest drone state with the time in seconds, or None before the first keyframe."""
+        if self.values is None:
+            return None
+        return dict(dequantize(self.values), time=self.time_ms / 1000.0)
+
+    def feed(self, data):
+        """
+        Decode the complete messages in data (plus any bytes held back from earlier calls).
+
+        Returns:
+            List of ("scene", scene) and ("state", state) tuples in stream order
+        """
+        self.buffer += data
+        messages = []
+        offset = 0
+        while len(self.buffer) - offset >= HEADER.size:
+            length, kind = HEADER.unpack_from(self.buffer, offset)
+            end = offset + HEADER.size + length
+            if end > len(self.buffer):
+                break
+            payload = bytes(self.buffer[offset + HEADER.size:end])
+            offset = end
+            if kind == MSG_SCENE:
+                self.scene = json.loads(zlib.decompress(payload))
+                messages.append(("scene", self.scene))
+            elif kind == MSG_KEYFRAME:
+                seq, self.time_ms, *values = KEYFRAME.unpack(payload)
+                self._advance(seq, tuple(values))
+                messages.append(("state", self.state))
+            elif kind == MSG_DELTA and self.values is not None:
+                seq_gap, position = _get_varint(payload, 0)
+                time_delta, position = _get_varint(payload, position)
+                mask = payload[position]
+                position += 1
+                values = list(self.values)
+                for bit in range(len(FIELDS)):
+                    if mask & (1 << bit):
+                        delta, position = _get_varint(payload, position)
+                        values[bit] += delta
+                self.time_ms += time_delta
+                self._advance(self.seq + seq_gap, tuple(values))
+                messages.append(("state", self.state))
+        del self.buffer[:offset]
+        return messages
+
+    def _advance(self, seq, values):
+        if self.seq is not None and seq > self.seq + 1:
+            self.dropped += seq - self.seq - 1
+        self.seq = seq
+        self.values = values
+        self.frames += 1
+
+
+class _Subscriber:
+    def __init__(self, sock):
+        self.sock = sock
+        self.out = bytearray()
+        self.scene_version = 0
+        self.values = None  # Quantized fields last sent to this subscriber
+        self.seq = None
+        self.time_ms = None
+        self.since_keyframe = 0
+
+
+"""Streams the simulated world and drone to any number of local viewers and recorders.
+
+The scene is sent once per subscriber (and again after a reload), then one state frame per simulator tick:
+a keyframe on connect and every keyframe_interval frames, otherwise a delta holding only the quantized fields
+that changed. The simulation loop only stores its latest state; a background thread does all socket work. A
+subscriber is sent a new frame only once its previous one has left the socket buffer, so a slow viewer skips
+intermediate states (each delta is relative to what that subscriber last received) instead of queueing them
+or blocking the simulator.
+"""
+class TelemetryServer:
+    def __init__(self, host=TELEMETRY_HOST, port=TELEMETRY_PORT, keyframe_interval=TELEMETRY_KEYFRAME_INTERVAL):
+        """
+        Initialize the server; call start() to begin accepting subscribers.
+
+        Args:
+            host: Address to listen on (localhost by default)
+            port: TCP port, 0 picks a free one (see self.port after start())
+            keyframe_interval: Frames between keyframes per subscriber
+        """
+        self.host = host
+        self.port = port
+        self.keyframe_interval = keyframe_interval
+        self.subscribers = []
+        self.frames_sent = 0
+        self.bytes_sent = 0
+        self._scene_message = None
+        self._scene_version = 0
+        self._latest = None  # (seq, time_ms, values) of the newest published frame
+        self._seq = 0
+        self._selector = None
+        self._listener = None
+        self._wake_send = self._wake_recv = None
+        self._wake_pending = False
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        self._listener = socket.create_server((self.host, self.port))
+        self._listener.setblocking(False)
+        self.port = self._listener.getsockname()[1]
+        self._wake_recv, self._wake_send = socket.socketpair()
+        self._wake_recv.setblocking(False)
+        self._wake_send.setblocking(False)
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._listener, selectors.EVENT_READ, "accept")
+        self._selector.register(self._wake_recv, selectors.EVENT_READ, "wake")
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="telemetry", daemon=True)
+        self._thread.start()
+        print(f"Telemetry on {self.host}:{self.port}")
+        return self
+
+    def set_scene(self, scene):
+        """Scene description (see scene_description) sent to current and future subscribers."""
+        self._scene_message = encode_scene(scene)
+        self._scene_version += 1
+        self._wake()
+
+    def publish(self, state, battery=None, flying=None, sim_time=0.0):
+        """Offer the drone state of this tick; cheap and non-blocking, called from the simulation loop."""
+        self._seq += 1
+        self._latest = (self._seq, int(round(sim_time * 1000)), quantize(state, battery, flying))
+        self._wake()
+
+    def _wake(self):
+        if self._running and not self._wake_pending:
+            self._wake_pending = True
+            try:
+                self._wake_send.send(b"\0")
+            except OSError:
+                pass
+
+    def close(self):
+        if not self._running:
+            return
+        self._running = False
+        try:
+            self._wake_send.send(b"\0")
+        except OSError:
+            pass
+        self._thread.join(timeout=1.0)
+        for subscriber in self.subscribers:
+            subscriber.sock.close()
+        self.subscribers = []
+        for sock in (self._listener, self._wake_recv, self._wake_send):
+            sock.close()
+        self._selector.close()
+
+    def _run(self):
+        while self._running:
+            for key, events in self._selector.select(timeout=0.5):
+                if key.data == "accept":
+                    self._accept()
+                elif key.data == "wake":
+                    try:
+                        self._wake_recv.recv(4096)
+                    except BlockingIOError:
+                        pass
+                    self._wake_pending = False
+                else:
+                    subscriber = key.data
+                    if events & selectors.EVENT_READ and not self._receive(subscriber):
+                        continue
+                    if events & selectors.EVENT_WRITE:
+                        self._send(subscriber)
+            for subscriber in list(self.subscribers):
+                if not subscriber.out:
+                    self._queue(subscriber)
+                    self._send(subscriber)
+
+    def _accept(self):
+        try:
+            sock, _ = self._listener.accept()
+        except BlockingIOError:
+            return
+        sock.setblocking(False)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        subscriber = _Subscriber(sock)
+        self.subscribers.append(subscriber)
+        self._selector.register(sock, selectors.EVENT_READ, subscriber)
+
+    def _drop(self, subscriber):
+        self._selector.unregister(subscriber.sock)
+        subscriber.sock.close()
+        self.subscribers.remove(subscriber)
+
+    def _receive(self, subscriber):
+        """Subscribers send nothing; a readable socket means it was closed. Returns False once dropped."""
+        try:
+            if subscriber.sock.recv(4096):
+                return True
+        except BlockingIOError:
+            return True
+        except OSError:
+            pass
+        self._drop(subscriber)
+        return False
+
+    def _queue(self, subscriber):
+        """Add the pending scene and the newest frame to an idle subscriber's output."""
+        if self._scene_message is not None and subscriber.scene_version != self._scene_version:
+            subscriber.out += self._scene_message
+            subscriber.scene_version = self._scene_version
+        latest = self._latest
+        if latest is None or latest[0] == subscriber.seq:
+            return
+        seq, time_ms, values = latest
+        if subscriber.values is None or subscriber.since_keyframe >= self.keyframe_interval:
+            message = encode_keyframe(seq, time_ms, values)
+            subscriber.since_keyframe = 0
+        else:
+            message = encode_delta(seq - subscriber.seq, time_ms - subscriber.time_ms, subscriber.values, values)
+        subscriber.out += message
+        subscriber.since_keyframe += 1
+        subscriber.seq, subscriber.time_ms, subscriber.values = seq, time_ms, values
+        self.frames_sent += 1
+
+    def _send(self, subscriber):
+        if subscriber.out:
+            try:
+                sent = subscriber.sock.send(subscriber.out)
+            except BlockingIOError:
+                sent = 0
+            except OSError:
+                self._drop(subscriber)
+                return
+            del subscriber.out[:sent]
+            self.bytes_sent += sent
+        events = selectors.EVENT_READ | (selectors.EVENT_WRITE if subscriber.out else 0)
+        self._selector.modify(subscriber.sock, events, subscriber)
+
+
+"""Receives the telemetry stream from a TelemetryServer without blocking the caller."""
+class TelemetryClient:
+    def __init__(self, host=TELEMETRY_HOST, port=TELEMETRY_PORT, record_path=None):
+        """
+        Connect to a server.
+
+        Args:
+            host: Server address
+            port: Server port
+            record_path: File the raw stream is written to (replayable with TelemetryDecoder), or None
+        """
+        self.sock = socket.create_connection((host, port))
+        self.sock.setblocking(False)
+        self.decoder = TelemetryDecoder()
+        self.bytes_received = 0
+        self.connected = True
+        self.record = open(record_path, "wb") if record_path else None
+
+    def poll(self):
+        """Decode everything received since the last call (see TelemetryDecoder.feed)."""
+        chunks = []
+        while self.connected:
+            try:
+                data = self.sock.recv(65536)
+            except BlockingIOError:
+                break
+            except OSError:
+                data = b""
+            if not data:
+                self.connected = False
+                break
+            chunks.append(data)
+        data = b"".join(chunks)
+        self.bytes_received += len(data)
+        if self.record and data:
+            self.record.write(data)
+        return self.decoder.feed(data)
+
+    def close(self):
+        self.sock.close()
+        if self.record:
+            self.record.close()
@@ -0,0 +1,210 @@
+import math
+import sys
+import time
+from telemetry import TelemetryClient, TelemetryDecoder
+from config import TELEMETRY_HOST, TELEMETRY_PORT, TELEMETRY_VIEWER_SIZE, TELEMETRY_VIEWER_TRAIL
+
+CYLINDER, BOX, PYRAMID, SPHERE = 0, 1, 2, 3  # primitives.py kinds, repeated so the viewer does not import NumPy
+BACKGROUND = (24, 26, 30)
+TEXT_COLOR = (220, 220, 220)
+DRONE_COLOR = (255, 170, 40)
+TRAIL_COLOR = (120, 90, 40)
+
+
+def _color(rgb):
+    return tuple(int(max(0.0, min(1.0, c)) * 255) for c in rgb)
+
+
+def _footprint(kind, position, size, rotation):
+    """Ground outline of one primitive: ("circle", center, radius) or ("polygon", corners)."""
+    x, y = position[0], position[1]
+    if kind in (CYLINDER, SPHERE):
+        return "circle", (x, y), size[0]
+    half_width, half_depth = size[0] / 2, size[1] / 2
+    rad = math.radians(rotation)
+    cos_a, sin_a = math.cos(rad), math.sin(rad)
+    corners = [(x + cx * cos_a - cy * sin_a, y + cx * sin_a + cy * cos_a)
+               for cx, cy in ((-half_width, -half_depth), (half_width, -half_depth),
+                              (half_width, half_depth), (-half_width, half_depth))]
+    return "polygon", corners
+
+
+"""Top-down 2D view of a telemetry stream: obstruction footprints, the drone with its heading and trail, and
+link statistics. Light enough to run next to the simulator (pygame only, no OpenGL)."""
+class TelemetryViewer:
+    def __init__(self, size=TELEMETRY_VIEWER_SIZE, trail=TELEMETRY_VIEWER_TRAIL):
+        """
+        Initialize the viewer window.
+
+        Args:
+            size: Window (width, height) in pixels
+            trail: Drone positions kept for the trail
+        """
+        import pygame
+        self.pygame = pygame
+        pygame.init()
+        self.screen = pygame.display.set_mode(size)
+        pygame.display.set_caption("Drone Telemetry")
+        self.font = pygame.font.SysFont(None, 20)
+        self.size = size
+        self.trail_length = trail
+        self.shapes = []  # (outline, color) per primitive and mesh
+        self.bounds = (-500.0, -500.0, 500.0, 500.0)
+        self.trail = []
+        self.state = None
+        self.scene = None
+
+    def set_scene(self, scene):
+        self.scene = scene
+        self.shapes = []
+        points = []
+        primitives = scene.get("primitives")
+        if primitives:
+            for kind, position, size, rotation, color in zip(primitives["kind"], primitives["position"],
+                                                             primitives["size"], primitives["rotation"],
+                                                             primitives["color"]):
+                outline = _footprint(kind, position, size, rotation)
+                self.shapes.append((outline, _color(color)))
+                if outline[0] == "circle":
+                    (x, y), radius = outline[1], outline[2]
+                    points += [(x - radius, y - radius), (x + radius, y + radius)]
+                else:
+                    points += outline[1]
+        for mesh in scene.get("meshes", []):
+            (x0, y0, _), (x1, y1, _) = mesh["min"], mesh["max"]
+            corners = [(x0, y0), (x1, y0), (x1, y1), (x0, y1)]
+            self.shapes.append((("polygon", corners), _color(mesh["color"])))
+            points += corners
+        terrain = scene.get("terrain")
+        if terrain:
+            (ox, oy), (width, depth) = terrain["origin"], terrain["size"]
+            points += [(ox, oy), (ox + width, oy + depth)]
+        if points:
+            xs, ys = [p[0] for p in points], [p[1] for p in points]
+            self.bounds = (min(xs), min(ys), max(xs), max(ys))
+
+    def set_state(self, state):
+        self.state = state
+        self.trail.append((state["x"], state["y"]))
+        del self.trail[:-self.trail_length]
+
+    def _view(self):
+        """World-to-screen transform fitting the scene and the drone's trail (north is up)."""
+        x0, y0, x1, y1 = self.bounds
+        if self.trail:
+            xs, ys = [p[0] for p in self.trail], [p[1] for p in self.trail]
+            x0, y0, x1, y1 = min(x0, *xs), min(y0, *ys), max(x1, *xs), max(y1, *ys)
+        width, height = self.size
+        margin = 40
+        scale = min((width - 2 * margin) / max(x1 - x0, 1.0), (height - 2 * margin) / max(y1 - y0, 1.0))
+        cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+        return lambda x, y: (width / 2 + (x - cx) * scale, height / 2 - (y - cy) * scale), scale
+
+    def draw(self, lines):
+        pygame = self.pygame
+        self.screen.fill(BACKGROUND)
+        to_screen, scale = self._view()
+        for outline, color in self.shapes:
+            if outline[0] == "circle":
+                pygame.draw.circle(self.screen, color, to_screen(*outline[1]), max(1, int(outline[2] * scale)))
+            else:
+                pygame.draw.polygon(self.screen, color, [to_screen(x, y) for x, y in outline[1]])
+        if len(self.trail) > 1:
+            pygame.draw.lines(self.screen, TRAIL_COLOR, False, [to_screen(x, y) for x, y in self.trail])
+        if self.state:
+            x, y = to_screen(self.state["x"], self.state["y"])
+            rad = math.radians(self.state["yaw"])  # Clockwise from north
+            tip = (x + 14 * math.sin(rad), y - 14 * math.cos(rad))
+            left = (x + 8 * math.sin(rad - 2.4), y - 8 * math.cos(rad - 2.4))
+            right = (x + 8 * math.sin(rad + 2.4), y - 8 * math.cos(rad + 2.4))
+            pygame.draw.polygon(self.screen, DRONE_COLOR, (tip, left, right))
+        for row, line in enumerate(lines):
+            self.screen.blit(self.font.render(line, True, TEXT_COLOR), (10, 10 + row * 18))
+        pygame.display.flip()
+
+    def is_running(self):
+        for event in self.pygame.event.get():
+            if event.type == self.pygame.QUIT or (event.type == self.pygame.KEYDOWN and
+                                                  event.key == self.pygame.K_ESCAPE):
+                return False
+        return True
+
+    def close(self):
+        self.pygame.quit()
+
+
+def _state_lines(state, scene):
+    lines = []
+    if scene and scene.get("streamed"):
+        lines.append("Streamed world: obstructions are not shown")
+    if state:
+        lines.append(f"x {state['x']:.1f}  y {state['y']:.1f}  z {state['z']:.1f} cm   yaw {state['yaw']:.1f}   "
+                     f"battery {state['battery']:.0f}%   {'flying' if state['flying'] else 'landed'}   "
+                     f"t {state['time']:.2f} s")
+    return lines
+
+
+def _apply(viewer, messages):
+    for kind, value in messages:
+        if kind == "scene":
+            viewer.set_scene(value)
+        else:
+            viewer.set_state(value)
+
+
+def view_live(host=TELEMETRY_HOST, port=TELEMETRY_PORT, record_path=None):
+    """Show the stream of a running simulator, optionally recording it."""
+    client = TelemetryClient(host, port, record_path)
+    viewer = TelemetryViewer()
+    source = f"{host}:{port}" + (f" -> {record_path}" if record_path else "")
+    clock = viewer.pygame.time.Clock()
+    try:
+        while viewer.is_running():
+            _apply(viewer, client.poll())
+            decoder = client.decoder
+            lines = [source if client.connected else source + " (disconnected)"]
+            if decoder.frames:
+                lines.append(f"{decoder.frames} frames, {decoder.dropped} skipped, "
+                             f"{client.bytes_received / decoder.frames:.1f} bytes/frame")
+            viewer.draw(lines + _state_lines(viewer.state, viewer.scene))
+            clock.tick(60)
+    finally:
+        client.close()
+        viewer.close()
+
+
+def play_recording(path):
+    """Replay a recorded stream at its simulated pace."""
+    with open(path, "rb") as f:
+        messages = TelemetryDecoder().feed(f.read())
+    frames = sum(1 for kind, _ in messages if kind == "state")
+    first_time = next((value["time"] for kind, value in messages if kind == "state"), 0.0)
+    viewer = TelemetryViewer()
+    start = time.monotonic()
+    index = shown = 0
+    try:
+        while viewer.is_running():
+            now = time.monotonic() - start
+            while index < len(messages):
+                kind, value = messages[index]
+                if kind == "state":
+                    if value["time"] - first_time > now:
+                        break
+                    shown += 1
+                _apply(viewer, [messages[index]])
+                index += 1
+            viewer.draw([f"{path}: frame {shown} of {frames}"] + _state_lines(viewer.state, viewer.scene))
+            viewer.pygame.time.wait(15)
+    finally:
+        viewer.close()
+
+
+if __name__ == "__main__":
+    # Usage: python telemetry_viewer.py [--record FILE | --play FILE]
+    args = sys.argv[1:]
+    if len(args) == 2 and args[0] == "--play":
+        play_recording(args[1])
+    elif len(args) == 2 and args[0] == "--record":
+        view_live(record_path=args[1])
+    else:
+        view_live()
@@ -0,0 +1,233 @@
+import asyncio
+import collections
+import math
+import time
+import numpy as np
+from config import (TELLO_IP, TELLO_COMMAND_PORT, TELLO_STATE_PORT, TELLO_RESPONSE_TIMEOUT,
+                    TELLO_LATE_RESPONSE_WINDOW, TELLO_STATE_BUFFER_SIZE)
+
+# Fields of the SDK 2.0 state string, in broadcast order
+STATE_FIELDS = ("pitch", "roll", "yaw", "vgx", "vgy", "vgz", "templ", "temph", "tof", "h", "bat", "baro",
+                "time", "agx", "agy", "agz")
+_FIELD_INDEX = {name: i for i, name in enumerate(STATE_FIELDS)}
+
+
+def parse_state(text):
+    """Parse a state packet ("pitch:0;roll:0;...;") into a dict of floats, skipping unknown fields."""
+    state = {}
+    for item in text.strip().split(";"):
+        key, sep, value = item.partition(":")
+        if sep:
+            try:
+                state[key] = float(value)
+            except ValueError:
+                pass
+    return state
+
+
+"""Preallocated ring of state samples.
+
+Row layout is [receive time, x, y, *STATE_FIELDS]. x/y are a dead-reckoned position (cm) integrated from
+vgx/vgy (dm/s, forward/right of the takeoff heading) since the drone reports no position itself.
+There is a single writer (the event loop); readers on any thread get the newest complete row.
+"""
+class TelloStateBuffer:
+    def __init__(self, capacity=TELLO_STATE_BUFFER_SIZE):
+        self.capacity = capacity
+        self.samples = np.zeros((capacity, 3 + len(STATE_FIELDS)))
+        self.count = 0  # Total samples written; the newest is at (count - 1) % capacity
+        self._x = 0.0
+        self._y = 0.0
+        self._last_time = None
+
+    def push(self, text, timestamp=None):
+        """Parse a state packet into the next row of the ring."""
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        values = parse_state(text)
+        if not values:
+            return
+        if self._last_time is not None:
+            dt = min(timestamp - self._last_time, 1.0)  # Ignore gaps in the stream for dead reckoning
+            yaw = math.radians(values.get("yaw", 0.0))
+            forward = values.get("vgx", 0.0) * 10 * dt
+            right = values.get("vgy", 0.0) * 10 * dt
+            # Rotate the body-frame velocity by yaw into the simulator frame (x right, y forward)
+            self._x += forward * math.sin(yaw) + right * math.cos(yaw)
+            self._y += forward * math.cos(yaw) - right * math.sin(yaw)
+        self._last_time = timestamp
+
+        row = self.samples[self.count % self.capacity]
+        row[0] = timestamp
+        row[1] = self._x
+        row[2] = self._y
+        for key, value in values.items():
+            index = _FIELD_INDEX.get(key)
+            if index is not None:
+                row[3 + index] = value
+        self.count += 1
+
+    def latest(self):
+        """Newest sample as a dict, or None before the first packet."""
+        count = self.count
+        if count == 0:
+            return None
+        row = self.samples[(count - 1) % self.capacity].copy()
+        state = {name: row[3 + i] for i, name in enumerate(STATE_FIELDS)}
+        state["timestamp"] = row[0]
+        state["x"] = row[1]
+        state["y"] = row[2]
+        return state
+
+    def history(self, n=None):
+        """Copy of the newest n rows (oldest first)."""
+        count = self.count
+        n = min(count, self.capacity) if n is None else min(n, count, self.capacity)
+        indices = np.arange(count - n, count) % self.capacity
+        return self.samples[indices].copy()
+
+    def reset_position(self):
+        self._x = 0.0
+        self._y = 0.0
+
+
+class _CommandProtocol(asyncio.DatagramProtocol):
+    def __init__(self, client):
+        self.client = client
+
+    def datagram_received(self, data, addr):
+        self.client._on_response(data.decode("utf-8", errors="replace").strip())
+
+    def error_received(self, exc):
+        print(f"Tello command socket error: {exc}")
+
+
+class _StateProtocol(asyncio.DatagramProtocol):
+    def __init__(self, buffer):
+        self.buffer = buffer
+
+    def datagram_received(self, data, addr):
+        self.buffer.push(data.decode("ascii", errors="replace"))
+
+
+"""Asyncio client for the Tello SDK text protocol.
+
+The drone answers commands in the order it receives them, so responses are matched to a FIFO of pending
+commands. A command that times out leaves a placeholder for TELLO_LATE_RESPONSE_WINDOW seconds so its late
+reply is discarded instead of being taken as the answer to the next command.
+"""
+class TelloClient:
+    def __init__(self, host=TELLO_IP, command_port=TELLO_COMMAND_PORT, state_port=TELLO_STATE_PORT,
+                 timeout=TELLO_RESPONSE_TIMEOUT, state_buffer_size=TELLO_STATE_BUFFER_SIZE, stats=None):
+        """
+        Initialize the client.
+
+        Args:
+            host: Drone (or local stand-in) address
+            command_port: UDP port the drone receives commands on
+            state_port: Local UDP port to receive state broadcasts on, or None to skip state
+            timeout: Default seconds to wait for a command response
+            state_buffer_size: Number of state samples kept in the ring
+            stats: Optional LinkStats recording round trips, timeouts and lost replies
+        """
+        self.host = host
+        self.command_port = command_port
+        self.state_port = state_port
+        self.timeout = timeout
+        self.state = TelloStateBuffer(state_buffer_size)
+        self.stats = stats
+        self._pending = collections.deque()  # [future or None, deadline for None placeholders]
+        self._command_transport = None
+        self._state_transport = None
+
+    async def open(self):
+        """Bind the command and state sockets."""
+        loop = asyncio.get_running_loop()
+        self._command_transport, _ = await loop.create_datagram_endpoint(
+            lambda: _CommandProtocol(self), remote_addr=(self.host, self.command_port))
+        if self.state_port is not None:
+            self._state_transport, _ = await loop.create_datagram_endpoint(
+                lambda: _StateProtocol(self.state), local_addr=("0.0.0.0", self.state_port))
+
+    async def connect(self, timeout=None):
+        """Open the sockets if needed and enter SDK mode. Returns the drone's response."""
+        if self._command_transport is None:
+            await self.open()
+        return await self.send("command", timeout)
+
+    def _on_response(self, text):
+        now = time.monotonic()
+        while self._pending:
+            future, deadline = self._pending.popleft()
+            if future is None:
+                if now <= deadline:
+                    if self.stats:
+                        self.stats.record_late()
+                    return  # Late reply to a command that already timed out
+                if self.stats:
+                    self.stats.record_lost()
+                continue  # Expired placeholder, its reply was lost
+            if not future.done():
+                future.set_result(text)
+                return
+        print(f"Unsolicited Tello response: {text}")
+
+    async def send(self, command, timeout=None, expected_duration=0):
+        """
+        Send a command and wait for its response. Several sends may be in flight at once.
+
+        Args:
+            command: SDK command string
+            timeout: Seconds to wait, defaults to the client timeout
+            expected_duration: Predicted motion time included in the round trip (for statistics only), None
+                when unknown
+
+        Raises:
+            asyncio.TimeoutError: No response within the timeout
+        """
+        future = asyncio.get_running_loop().create_future()
+        entry = [future, 0.0]
+        self._pending.append(entry)
+        sent = time.monotonic()
+        self._command_transport.sendto(command.encode("utf-8"))
+        if self.stats:
+            self.stats.record_sent(command)
+        try:
+            response = await asyncio.wait_for(asyncio.shield(future), self.timeout if timeout is None else timeout)
+        except asyncio.TimeoutError:
+            if self.stats:
+                self.stats.record_timeout(command)
+            entry[0] = None
+            entry[1] = time.monotonic() + TELLO_LATE_RESPONSE_WINDOW
+            raise
+        except asyncio.CancelledError:
+            entry[0] = None
+            entry[1] = time.monotonic() + TELLO_LATE_RESPONSE_WINDOW
+            raise
+        if self.stats:
+            self.stats.record_response(command, time.monotonic() - sent, expected_duration)
+        return response
+
+    def send_nowait(self, command):
+        """Send a command whose response is not needed (e.g. rc); nothing is queued for its reply."""
+        self._command_transport.sendto(command.encode("utf-8"))
+
+    def get_state(self):
+        """Latest telemetry in simulator units (cm, degrees) without touching the command socket."""
+        state = self.state.latest()
+        if state is None:
+            return None
+        return {"x": float(state["x"]), "y": float(state["y"]), "z": float(state["h"]),
+                "yaw": float(state["yaw"]) % 360, "battery": float(state["bat"]), "timestamp": float(state["timestamp"])}
+
+    def close(self):
+        for future, _ in self._pending:
+            if future is not None and not future.done():
+                future.cancel()
+            elif future is None and self.stats:
+                self.stats.record_lost()
+        self._pending.clear()
+        for transport in (self._command_transport, self._state_transport):
+            if transport is not None:
+                transport.close()
+        self._command_transport = None
+        self._state_transport = None
@@ -0,0 +1,235 @@
+import asyncio
+import math
+import time
+from drone import Drone
+from motion_planner import MotionPlanner
+from config import (LINEAR_ACCEL, ANGULAR_ACCEL, MIN_SPEED, TELLO_COMMAND_PORT, TELLO_STATE_PORT, TELLO_VIDEO_PORT,
+                    TELLO_EMULATOR_HOST, TELLO_EMULATOR_DRONES, TELLO_EMULATOR_PORT_STRIDE,
+                    TELLO_EMULATOR_STATE_INTERVAL, TELLO_EMULATOR_VIDEO, TELLO_EMULATOR_VIDEO_FPS,
+                    TELLO_EMULATOR_VIDEO_SIZE)
+
+MOVEMENT_COMMANDS = {"takeoff", "land", "up", "down", "left", "right", "forward", "back", "cw", "ccw", "flip", "go",
+                     "curve"}
+
+
+def _signed_angle(start, end):
+    """Shortest signed rotation in degrees from start to end."""
+    return (end - start + 180) % 360 - 180
+
+
+class _EmulatorProtocol(asyncio.DatagramProtocol):
+    def __init__(self, drone):
+        self.drone = drone
+
+    def connection_made(self, transport):
+        self.drone.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.drone.receive(data.decode("utf-8", errors="replace").strip(), addr)
+
+
+"""One emulated Tello on localhost ports.
+
+Commands are executed by Drone.execute_command one at a time, like the real drone. Movement commands are
+answered once the MotionPlanner time for the move has elapsed; in between, the reported state follows the
+same trapezoidal profile the simulator animates.
+"""
+class VirtualTello:
+    def __init__(self, command_port=TELLO_COMMAND_PORT, state_port=TELLO_STATE_PORT, video_port=None,
+                 host=TELLO_EMULATOR_HOST):
+        """
+        Initialize a virtual drone.
+
+        Args:
+            command_port: Local UDP port to receive SDK commands on
+            state_port: Client UDP port state broadcasts are sent to
+            video_port: Client UDP port for synthetic video, or None to disable video
+            host: Local address to bind
+        """
+        self.command_port = command_port
+        self.state_port = state_port
+        self.video_port = video_port
+        self.host = host
+        self.drone = Drone()
+        self.motion_planner = MotionPlanner(self.drone, LINEAR_ACCEL, ANGULAR_ACCEL)
+        self.transport = None
+        self.client_host = None  # State and video go to whoever sent "command", like the real drone
+        self.streaming = False
+        self.flight_start = None
+        self._queue = asyncio.Queue()
+        self._worker = None
+        # Active move: (start_state, target_state, start_time, total_time, accel_time, coast_time)
+        self._motion = None
+        self._state = self.drone.get_state()
+        self._last_state = (self._state, time.monotonic())
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        await loop.create_datagram_endpoint(lambda: _EmulatorProtocol(self), local_addr=(self.host, self.command_port))
+        self._worker = asyncio.create_task(self._run_commands())
+
+    def receive(self, command, addr):
+        if command == "command":
+            self.client_host = addr[0]
+        self._queue.put_nowait((command, addr))
+
+    async def _run_commands(self):
+        while True:
+            command, addr = await self._queue.get()
+            response = await self.execute(command)
+            if response is not None and self.transport is not None:
+                self.transport.sendto(response.encode("utf-8"), addr)
+
+    async def execute(self, command):
+        """Execute one command, waiting out its motion time. Returns the response (None for rc)."""
+        parts = command.split()
+        name = parts[0].lower() if parts else ""
+        if name == "rc":
+            return None  # The real drone does not answer rc
+        if name in ("streamon", "streamoff"):
+            if not self.drone.connected:
+                return "error"
+            self.streaming = name == "streamon"
+            return "ok"
+
+        start_state = self.state()
+        max_speed = max(self.drone.speed, MIN_SPEED)
+        response = self.drone.execute_command(command)
+        if response != "ok" or name not in MOVEMENT_COMMANDS:
+            return response
+
+        if name == "takeoff":
+            self.flight_start = time.monotonic()
+        target_state = self.drone.get_state()
+        total_time = self.motion_planner.calculate_move_time(command, start_state, target_state, max_speed)
+        accel_time = min(max_speed / LINEAR_ACCEL, total_time / 2)
+        coast_time = max(0, total_time - 2 * accel_time)
+        path = self.motion_planner.plan_path(command, start_state, target_state)
+        self._motion = (start_state, target_state, time.monotonic(), total_time, accel_time, coast_time, path)
+        await asyncio.sleep(total_time)
+        self._motion = None
+        self._state = target_state
+        if name in ("land", "emergency"):
+            self.flight_start = None
+        return response
+
+    def state(self, now=None):
+        """Current pose dict, interpolated along the active move."""
+        if self._motion is None:
+            return self._state.copy()
+        start_state, target_state, start_time, total_time, accel_time, coast_time, path = self._motion
+        elapsed = min((time.monotonic() if now is None else now) - start_time, total_time)
+        state = self.motion_planner.interpolate_state(start_state.copy(), target_state, elapsed, total_time,
+                                                      accel_time, coast_time, path)
+        if self.motion_planner.get_distance(start_state, target_state) == 0 and total_time > 0:
+            # Pure rotations: the planner snaps, so sweep the yaw over the move time instead
+            turn = _signed_angle(start_state["yaw"], target_state["yaw"])
+            state["yaw"] = (start_state["yaw"] + turn * elapsed / total_time) % 360
+        return state
+
+    def state_packet(self, now):
+        """Tello SDK 2.0 state string for the current pose."""
+        state = self.state(now)
+        previous, previous_time = self._last_state
+        dt = now - previous_time
+        self._last_state = (state, now)
+        vx = (state["x"] - previous["x"]) / dt if dt > 0 else 0.0
+        vy = (state["y"] - previous["y"]) / dt if dt > 0 else 0.0
+        vz = (state["z"] - previous["z"]) / dt if dt > 0 else 0.0
+        yaw = math.radians(state["yaw"])
+        forward = vx * math.sin(yaw) + vy * math.cos(yaw)
+        right = vx * math.cos(yaw) - vy * math.sin(yaw)
+        flight_time = int(now - self.flight_start) if self.flight_start else 0
+        temperature = int(self.drone.temperature)
+        return (f"pitch:0;roll:0;yaw:{int(_signed_angle(0, state['yaw']))};"
+                f"vgx:{round(forward / 10)};vgy:{round(right / 10)};vgz:{round(-vz / 10)};"
+                f"templ:{temperature};temph:{temperature + 2};tof:{int(state['z']) + 10};h:{int(state['z'])};"
+                f"bat:{int(self.drone.battery)};baro:{state['z'] / 100:.2f};time:{flight_time};"
+                f"agx:0.00;agy:0.00;agz:-1000.00;\r\n")
+
+    def broadcast_state(self, now):
+        if self.client_host is not None and self.transport is not None:
+            self.drone.update_battery(time.time())
+            self.transport.sendto(self.state_packet(now).encode("ascii"), (self.client_host, self.state_port))
+
+    def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+        if self.transport is not None:
+            self.transport.close()
+
+
+def render_synthetic_frame(state, width, height):
+    """Cheap synthetic camera frame: sky/ground split whose horizon drops with altitude and shifts with yaw."""
+    import numpy as np
+    frame = np.empty((height, width, 3), dtype=np.uint8)
+    horizon = int(min(max(height * (0.5 + state["z"] / 2000), 0), height))
+    frame[:horizon] = (235, 206, 135)  # BGR sky
+    frame[horizon:] = (60, 120, 70)  # BGR ground
+    stripe = int(state["yaw"] / 360 * width)
+    frame[horizon:, stripe % width] = (255, 255, 255)  # Heading marker
+    return frame
+
+
+"""Runs any number of VirtualTello drones on one event loop.
+
+Drone i listens on TELLO_COMMAND_PORT + i * TELLO_EMULATOR_PORT_STRIDE and broadcasts state to
+TELLO_STATE_PORT + i * stride (video to TELLO_VIDEO_PORT + i * stride). One periodic task broadcasts state
+for the whole fleet, so hundreds of drones cost one timer rather than one per drone.
+"""
+class TelloEmulator:
+    def __init__(self, count=TELLO_EMULATOR_DRONES, host=TELLO_EMULATOR_HOST, video=TELLO_EMULATOR_VIDEO,
+                 port_stride=TELLO_EMULATOR_PORT_STRIDE):
+        self.drones = [VirtualTello(TELLO_COMMAND_PORT + i * port_stride, TELLO_STATE_PORT + i * port_stride,
+                                    TELLO_VIDEO_PORT + i * port_stride if video else None, host)
+                       for i in range(count)]
+        self._tasks = []
+
+    async def start(self):
+        for drone in self.drones:
+            await drone.start()
+        self._tasks.append(asyncio.create_task(self._broadcast_state()))
+        if any(drone.video_port for drone in self.drones):
+            self._tasks.append(asyncio.create_task(self._stream_video()))
+        print(f"Tello emulator running {len(self.drones)} drone(s) on {self.drones[0].host}:"
+              f"{self.drones[0].command_port}+")
+
+    async def _broadcast_state(self):
+        while True:
+            now = time.monotonic()
+            for drone in self.drones:
+                drone.broadcast_state(now)
+            await asyncio.sleep(TELLO_EMULATOR_STATE_INTERVAL)
+
+    async def _stream_video(self):
+        """Send synthetic frames as one JPEG per datagram (the real drone sends H.264)."""
+        import cv2  # Only needed when video is enabled
+        width, height = TELLO_EMULATOR_VIDEO_SIZE
+        while True:
+            for drone in self.drones:
+                if drone.streaming and drone.video_port and drone.client_host and drone.transport:
+                    frame = render_synthetic_frame(drone.state(), width, height)
+                    ok, encoded = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 70])
+                    if ok and len(encoded) < 65000:
+                        drone.transport.sendto(encoded.tobytes(), (drone.client_host, drone.video_port))
+            await asyncio.sleep(1 / TELLO_EMULATOR_VIDEO_FPS)
+
+    def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        for drone in self.drones:
+            drone.stop()
+
+    async def run_forever(self):
+        await self.start()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            self.stop()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(TelloEmulator().run_forever())
+    except KeyboardInterrupt:
+        print("Tello emulator stopped.")
@@ -1,32 +1,97 @@
-from djitellopy import Tello
+import asyncio
+import os
+import threading
 import time
+from tello_client import TelloClient
+from link_stats import LinkStats
+from config import (TELLO_RESPONSE_TIMEOUT, TELLO_CONNECT_TIMEOUT, TELLO_CONNECT_RETRIES, TELLO_QUERY_RETRIES,
+                    TELLO_STATS_DIR)
 
 class TelloWrapper:
-    def __init__(self):
+    def __init__(self, client=None):
         print("Initializing UDP connection...")
-        self.tello = Tello()
-        retries = 3
-        delay = 2  # Seconds between retries
+        self.stats = LinkStats()
+        # The asyncio client runs on its own loop thread so state keeps streaming while commands block
+        self.client = client if client else TelloClient(stats=self.stats)
+        if self.client.stats is None:
+            self.client.stats = self.stats
+        self.stats = self.client.stats
+        self.loop = asyncio.new_event_loop()
+        self.loop_thread = threading.Thread(target=self.loop.run_forever, name="tello-client", daemon=True)
+        self.loop_thread.start()
+        self.current_command = None
+        # Replies are matched to commands in send order, so only one command may be in flight at a time
+        self.command_lock = threading.Lock()
+        self.is_flying = False
+        retries = TELLO_CONNECT_RETRIES
         for attempt in range(retries):
+            # Short first attempts that grow, instead of a fixed long timeout and delay
+            timeout = min(TELLO_CONNECT_TIMEOUT * 2 ** attempt, TELLO_RESPONSE_TIMEOUT)
             try:
-                self.tello.connect()  # Attempt UDP connection
+                response = self._run(self.client.connect(timeout))  # Attempt UDP connection
+                if response != "ok":
+                    raise Exception(f"unexpected response '{response}'")
                 print("Connection established.")
-                self.current_command = None
                 return  # Exit if successful
             except Exception as e:
-                print(f"Connection attempt {attempt + 1}/{retries} failed: {e}")
+                print(f"Connection attempt {attempt + 1}/{retries} failed: {e!r}")
                 if attempt < retries - 1:
-                    time.sleep(delay)  # Wait before retrying
+                    self.stats.record_retry("command")
+                    time.sleep(self.stats.backoff(attempt))  # Wait before retrying
                 else:
+                    self.close()
                     raise Exception("Failed to connect to Tello after multiple attempts. Ensure drone is on and Wi-Fi is connected.")
 
-    def execute_command(self, command_str):
-        self.current_command = command_str
+    def _run(self, coroutine):
+        """Run a client coroutine on the loop thread and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def execute_command(self, command_str, expected_duration=None):
+        """
+        Send a command and wait for its response.
+
+        Args:
+            command_str: SDK command string
+            expected_duration: Predicted motion time in seconds; added to the adaptive timeout. None for a
+                command other than a query waits the full TELLO_RESPONSE_TIMEOUT, as its motion is unknown
+        """
+        with self.command_lock:
+            return self._execute(command_str, expected_duration)
+
+    def execute_if_idle(self, command_str):
+        """Send a query only when no other command is in flight; returns None without sending otherwise."""
+        if not self.command_lock.acquire(blocking=False):
+            return None
         try:
-            response = self.tello.send_command_with_return(command_str)
-        except Exception as e:
-            print(f"Command '{command_str}' failed: {e}")
-            response = "error"
+            return self._execute(command_str, None)
+        finally:
+            self.command_lock.release()
+
+    def _execute(self, command_str, expected_duration):
+        self.current_command = command_str
+        # Only side-effect free commands are retried; repeating a move could fly it twice
+        is_query = command_str.strip().endswith("?")
+        retries = TELLO_QUERY_RETRIES if is_query else 0
+        if expected_duration is None and is_query:
+            expected_duration = 0
+        timeout = self.stats.timeout_for(expected_duration)
+        response = "error"
+        for attempt in range(retries + 1):
+            try:
+                response = self._run(self.client.send(command_str, timeout, expected_duration))
+                break
+            except Exception as e:
+                print(f"Command '{command_str}' failed: {e!r}")
+                response = "error"
+                if attempt < retries:
+                    self.stats.record_retry(command_str)
+                    time.sleep(self.stats.backoff(attempt))
+        if response == "ok":
+            command = command_str.split()[0].lower()
+            if command == "takeoff":
+                self.is_flying = True
+            elif command in ("land", "emergency"):
+                self.is_flying = False
         self.current_command = None
         return response
 
@@ -34,10 +99,29 @@ class TelloWrapper:
         pass
 
     def get_state(self):
+        """Latest streamed telemetry; never waits on the command socket."""
+        state = self.client.get_state() or {"x": 0, "y": 0, "z": 0, "yaw": 0, "battery": None}
         return {
-            "x": 0,  # Tello doesn't track x/y precisely without external sensors
-            "y": 0,
-            "z": self.tello.get_height(),
-            "yaw": self.tello.get_yaw(),
-            "flying": self.tello.is_flying
-        }
\ No newline at end of file
+            "x": state["x"],  # Dead-reckoned from velocity telemetry, drifts over time
+            "y": state["y"],
+            "z": state["z"],
+            "yaw": state["yaw"],
+            "battery": state["battery"],
+            "flying": self.is_flying
+        }
+
+    def export_stats(self, directory=TELLO_STATS_DIR):
+        """Write link statistics to a timestamped JSON file and return its path."""
+        path = os.path.join(directory, time.strftime("tello_link_%Y%m%d_%H%M%S.json"))
+        return self.stats.export_json(path)
+
+    def close(self):
+        """Export link statistics, close the sockets and stop the client loop thread."""
+        if TELLO_STATS_DIR:
+            try:
+                print(f"Link statistics written to {self.export_stats()}")
+            except OSError as e:
+                print(f"Could not write link statistics: {e}")
+        self.loop.call_soon_threadsafe(self.client.close)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.loop_thread.join(timeout=1.0)
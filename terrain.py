@@ -0,0 +1,131 @@
+import numpy as np
+from paths import resolve_path
+from config import (TERRAIN_CELL_SIZE, TERRAIN_HEIGHT_SCALE, TERRAIN_ORIGIN, TERRAIN_COLLISION_TOLERANCE)
+
+"""Heightmap terrain.
+
+Heights live in one (rows, cols) float32 array; row i / column j is the ground height at
+(origin_x + j * cell_size, origin_y + i * cell_size). Outside the map the edge heights extend outward.
+Every height query is a bilinear lookup of four samples, so its cost does not depend on the map size.
+"""
+
+
+def load_heightmap(path):
+    """Load a heightmap from a .npy array or an image file (8/16-bit grayscale, color images are averaged)."""
+    path = resolve_path(path)
+    if path.lower().endswith(".npy"):
+        return np.load(path, allow_pickle=False).astype(np.float32)
+    import cv2  # Only needed for image heightmaps
+    image = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+    if image is None:
+        raise ValueError(f"Could not read heightmap image: {path}")
+    if image.ndim == 3:
+        image = image[:, :, :3].mean(axis=2)
+    # Image rows run top to bottom; flip so row 0 is the southern (lowest y) edge
+    return np.ascontiguousarray(image[::-1], dtype=np.float32)
+
+
+class TerrainContact:
+    """Reported by collision checks when a path dips below the ground; `position` is the contact point."""
+    __slots__ = ("terrain", "position")
+
+    def __init__(self, terrain, position):
+        self.terrain = terrain
+        self.position = np.array(position, dtype=float)
+
+    def __repr__(self):
+        x, y, z = self.position
+        return f"TerrainContact(position=({x:g}, {y:g}, {z:g}))"
+
+
+class Terrain:
+    def __init__(self, heights, cell_size=TERRAIN_CELL_SIZE, origin=TERRAIN_ORIGIN, height_scale=1.0):
+        """
+        Initialize the terrain.
+
+        Args:
+            heights: (rows, cols) array of heightmap samples, at least 2x2
+            cell_size: Distance in cm between neighbouring samples
+            origin: (x, y) of sample [0, 0], or None to center the map on the world origin
+            height_scale: cm per heightmap unit
+        """
+        heights = np.asarray(heights, dtype=np.float32) * np.float32(height_scale)
+        if heights.ndim != 2 or min(heights.shape) < 2:
+            raise ValueError(f"Heightmap must be a 2D array of at least 2x2 samples, got {heights.shape}")
+        self.heights = np.ascontiguousarray(heights)
+        self.rows, self.cols = heights.shape
+        self.cell_size = float(cell_size)
+        if origin is None:
+            origin = (-(self.cols - 1) * self.cell_size / 2, -(self.rows - 1) * self.cell_size / 2)
+        self.origin_x, self.origin_y = float(origin[0]), float(origin[1])
+        self.min_height = float(heights.min())
+        self.max_height = float(heights.max())
+
+    @classmethod
+    def from_file(cls, path, cell_size=TERRAIN_CELL_SIZE, origin=TERRAIN_ORIGIN, height_scale=TERRAIN_HEIGHT_SCALE):
+        return cls(load_heightmap(path), cell_size, origin, height_scale)
+
+    @property
+    def size(self):
+        """World extent (width, depth) of the map in cm."""
+        return (self.cols - 1) * self.cell_size, (self.rows - 1) * self.cell_size
+
+    def height_at(self, x, y):
+        """Bilinear ground height at a single world position."""
+        fx = min(max((x - self.origin_x) / self.cell_size, 0.0), self.cols - 1.0)
+        fy = min(max((y - self.origin_y) / self.cell_size, 0.0), self.rows - 1.0)
+        col = min(int(fx), self.cols - 2)
+        row = min(int(fy), self.rows - 2)
+        tx = fx - col
+        ty = fy - row
+        h = self.heights
+        h00 = float(h[row, col])
+        h01 = float(h[row, col + 1])
+        h10 = float(h[row + 1, col])
+        h11 = float(h[row + 1, col + 1])
+        bottom = h00 + (h01 - h00) * tx
+        top = h10 + (h11 - h10) * tx
+        return bottom + (top - bottom) * ty
+
+    def heights_at(self, x, y):
+        """Vectorized bilinear ground height for arrays of world positions."""
+        fx = np.clip((np.asarray(x, dtype=float) - self.origin_x) / self.cell_size, 0.0, self.cols - 1.0)
+        fy = np.clip((np.asarray(y, dtype=float) - self.origin_y) / self.cell_size, 0.0, self.rows - 1.0)
+        col = np.minimum(fx.astype(np.int64), self.cols - 2)
+        row = np.minimum(fy.astype(np.int64), self.rows - 2)
+        tx = fx - col
+        ty = fy - row
+        h = self.heights
+        bottom = h[row, col] + (h[row, col + 1] - h[row, col]) * tx
+        top = h[row + 1, col] + (h[row + 1, col + 1] - h[row + 1, col]) * tx
+        return bottom + (top - bottom) * ty
+
+    def clearance(self, state):
+        """Height of the drone above the ground directly below it (negative when underground)."""
+        return state["z"] - self.height_at(state["x"], state["y"])
+
+    def check_path(self, start, end):
+        """
+        Return a TerrainContact for the first point where the path from start to end dips below the
+        ground, or None. The path is sampled every half cell, which resolves every height sample it crosses.
+        """
+        start = np.asarray(start, dtype=float)
+        end = np.asarray(end, dtype=float)
+        if min(start[2], end[2]) >= self.max_height:
+            return None  # Entirely above the highest point
+        delta = end - start
+        horizontal = float(np.hypot(delta[0], delta[1]))
+        steps = max(1, int(np.ceil(horizontal / (self.cell_size / 2))))
+        t = np.linspace(0.0, 1.0, steps + 1)[:, None]
+        points = start + t * delta
+        ground = self.heights_at(points[:, 0], points[:, 1])
+        below = np.flatnonzero(points[:, 2] < ground - TERRAIN_COLLISION_TOLERANCE)
+        if len(below) == 0:
+            return None
+        x, y = points[below[0], :2]
+        return TerrainContact(self, (x, y, ground[below[0]]))
+
+
+def load_terrain(path):
+    """Terrain for the configured heightmap file, or None for the flat z=0 ground plane."""
+    return Terrain.from_file(path) if path else None
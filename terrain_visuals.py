@@ -0,0 +1,157 @@
+import math
+from collections import OrderedDict
+import numpy as np
+from OpenGL.GL import *
+from config import (TERRAIN_CHUNK_CELLS, TERRAIN_LOD_LEVELS, TERRAIN_LOD_DISTANCE, TERRAIN_SKIRT_DEPTH,
+                    TERRAIN_MAX_UPLOADS_PER_FRAME, TERRAIN_MAX_CHUNK_LISTS, TERRAIN_LOW_COLOR, TERRAIN_HIGH_COLOR)
+
+"""Renders a Terrain as square chunks with distance-based level of detail.
+
+Each chunk covers TERRAIN_CHUNK_CELLS x TERRAIN_CHUNK_CELLS heightmap cells. LOD k samples every 2**k-th
+height, and a chunk uses LOD k once the camera is farther than TERRAIN_LOD_DISTANCE * 2**(k-1) from it.
+Skirts hanging below each chunk edge hide the cracks between neighbours at different LODs.
+Display lists are compiled lazily per (chunk, LOD) and kept in an LRU of TERRAIN_MAX_CHUNK_LISTS.
+"""
+class TerrainRenderer:
+    def __init__(self, terrain, chunk_cells=TERRAIN_CHUNK_CELLS, lod_levels=TERRAIN_LOD_LEVELS,
+                 lod_distance=TERRAIN_LOD_DISTANCE):
+        self.terrain = terrain
+        # Coarsest LOD step must still fit inside a chunk
+        self.chunk_cells = chunk_cells
+        self.lod_levels = max(1, min(lod_levels, int(math.log2(chunk_cells)) + 1))
+        self.lod_distance = lod_distance
+        self.chunks_x = math.ceil((terrain.cols - 1) / chunk_cells)
+        self.chunks_y = math.ceil((terrain.rows - 1) / chunk_cells)
+        self._lists = OrderedDict()  # (chunk_x, chunk_y, lod) -> display list, least recently used first
+
+        # Chunk centers for the per-frame LOD pick
+        chunk_size = chunk_cells * terrain.cell_size
+        cx = terrain.origin_x + (np.arange(self.chunks_x) + 0.5) * chunk_size
+        cy = terrain.origin_y + (np.arange(self.chunks_y) + 0.5) * chunk_size
+        self._centers_x, self._centers_y = np.meshgrid(cx, cy, indexing="ij")
+        self._center_z = (terrain.min_height + terrain.max_height) / 2
+        self._chunk_radius = chunk_size * math.sqrt(0.5)
+
+    def _chunk_lods(self, eye):
+        """LOD index for every chunk given the camera eye in world units."""
+        distance = np.sqrt((self._centers_x - eye[0]) ** 2 + (self._centers_y - eye[1]) ** 2 +
+                           (self._center_z - eye[2]) ** 2)
+        distance = np.maximum(distance - self._chunk_radius, 0.0)
+        lods = np.floor(np.log2(np.maximum(distance / self.lod_distance, 0.5))).astype(int) + 1
+        return np.clip(lods, 0, self.lod_levels - 1)
+
+    def _chunk_geometry(self, chunk_x, chunk_y, lod):
+        """Vertex, normal, color and index arrays for one chunk at one LOD (skirts included)."""
+        terrain = self.terrain
+        step = 1 << lod
+        col0 = chunk_x * self.chunk_cells
+        row0 = chunk_y * self.chunk_cells
+        cols = np.arange(col0, min(col0 + self.chunk_cells, terrain.cols - 1) + 1, step)
+        rows = np.arange(row0, min(row0 + self.chunk_cells, terrain.rows - 1) + 1, step)
+        # Always include the chunk's far edges so neighbours meet
+        if cols[-1] != min(col0 + self.chunk_cells, terrain.cols - 1):
+            cols = np.append(cols, min(col0 + self.chunk_cells, terrain.cols - 1))
+        if rows[-1] != min(row0 + self.chunk_cells, terrain.rows - 1):
+            rows = np.append(rows, min(row0 + self.chunk_cells, terrain.rows - 1))
+
+        heights = terrain.heights[np.ix_(rows, cols)]
+        xs = terrain.origin_x + cols * terrain.cell_size
+        ys = terrain.origin_y + rows * terrain.cell_size
+        grid_x, grid_y = np.meshgrid(xs, ys)
+        vertices = np.stack((grid_x, grid_y, heights), axis=-1).astype(np.float32)
+
+        # Central-difference normals over the sampled grid
+        dz_dx = np.gradient(heights, xs, axis=1) if len(xs) > 1 else np.zeros_like(heights)
+        dz_dy = np.gradient(heights, ys, axis=0) if len(ys) > 1 else np.zeros_like(heights)
+        normals = np.stack((-dz_dx, -dz_dy, np.ones_like(heights)), axis=-1)
+        normals /= np.linalg.norm(normals, axis=-1, keepdims=True)
+
+        span = max(terrain.max_height - terrain.min_height, 1e-6)
+        blend = ((heights - terrain.min_height) / span)[..., None]
+        colors = (np.array(TERRAIN_LOW_COLOR) * (1 - blend) + np.array(TERRAIN_HIGH_COLOR) * blend)
+
+        n_rows, n_cols = heights.shape
+        grid = np.arange(n_rows * n_cols).reshape(n_rows, n_cols)
+        a = grid[:-1, :-1].ravel()
+        b = grid[:-1, 1:].ravel()
+        c = grid[1:, 1:].ravel()
+        d = grid[1:, :-1].ravel()
+        indices = [np.stack((a, b, c, a, c, d), axis=1).ravel()]
+
+        # Skirts: duplicate each edge lowered by TERRAIN_SKIRT_DEPTH and stitch it to the edge
+        vertices = [vertices.reshape(-1, 3)]
+        normals = [normals.reshape(-1, 3)]
+        colors = [colors.reshape(-1, 3)]
+        offset = n_rows * n_cols
+        for edge in (grid[0, :], grid[-1, ::-1], grid[::-1, 0], grid[:, -1]):
+            top = vertices[0][edge]
+            bottom = top.copy()
+            bottom[:, 2] -= TERRAIN_SKIRT_DEPTH
+            vertices.append(bottom)
+            normals.append(normals[0][edge])
+            colors.append(colors[0][edge])
+            lower = offset + np.arange(len(edge))
+            indices.append(np.stack((edge[:-1], lower[:-1], lower[1:], edge[:-1], lower[1:], edge[1:]),
+                                    axis=1).ravel())
+            offset += len(edge)
+
+        return (np.ascontiguousarray(np.concatenate(vertices), dtype=np.float32),
+                np.ascontiguousarray(np.concatenate(normals), dtype=np.float32),
+                np.ascontiguousarray(np.concatenate(colors), dtype=np.float32),
+                np.ascontiguousarray(np.concatenate(indices), dtype=np.uint32))
+
+    def _compile(self, chunk_x, chunk_y, lod):
+        vertices, normals, colors, indices = self._chunk_geometry(chunk_x, chunk_y, lod)
+        list_id = glGenLists(1)
+        glNewList(list_id, GL_COMPILE)
+        # Client arrays are copied into the list when it is compiled
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_NORMAL_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, vertices)
+        glNormalPointer(GL_FLOAT, 0, normals)
+        glColorPointer(3, GL_FLOAT, 0, colors)
+        glDrawElements(GL_TRIANGLES, len(indices), GL_UNSIGNED_INT, indices)
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_NORMAL_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glEndList()
+        return list_id
+
+    def render(self, eye):
+        """
+        Render every chunk at the LOD its distance from the camera calls for.
+
+        Args:
+            eye: Camera eye position in world units
+        """
+        lods = self._chunk_lods(eye)
+        uploads = 0
+        for chunk_x in range(self.chunks_x):
+            for chunk_y in range(self.chunks_y):
+                lod = int(lods[chunk_x, chunk_y])
+                key = (chunk_x, chunk_y, lod)
+                list_id = self._lists.get(key)
+                if list_id is None:
+                    # Over the per-frame budget, fall back to any LOD already compiled for this chunk
+                    if uploads >= TERRAIN_MAX_UPLOADS_PER_FRAME:
+                        key = next((k for k in ((chunk_x, chunk_y, level) for level in range(self.lod_levels))
+                                    if k in self._lists), None)
+                        if key is None:
+                            continue
+                        list_id = self._lists[key]
+                    else:
+                        uploads += 1
+                        list_id = self._compile(*key)
+                        self._lists[key] = list_id
+                self._lists.move_to_end(key)
+                glCallList(list_id)
+
+        while len(self._lists) > TERRAIN_MAX_CHUNK_LISTS:
+            _, list_id = self._lists.popitem(last=False)
+            glDeleteLists(list_id, 1)
+
+    def cleanup(self):
+        for list_id in self._lists.values():
+            glDeleteLists(list_id, 1)
+        self._lists.clear()
@@ -0,0 +1,34 @@
+from config import DEFAULT_MOVE_TIME
+from mission_executor import MissionExecutor
+from simulator import Simulator
+
+MALFORMED_CURVES = ["curve 1 2", "curve 100 100 100 200 0 100", "curve a b c d e f 30"]
+
+
+class _IdleDrone:
+    def execute_command(self, cmd, expected_duration=None):
+        return "ok"
+
+    def execute_if_idle(self, cmd):
+        return None
+
+    def get_state(self):
+        return {"x": 0, "y": 0, "z": 0, "yaw": 0, "battery": 100}
+
+
+def test_simulator_analysis_survives_malformed_curves():
+    commands = [("command", 1), ("takeoff", 3)] + [(cmd, 1) for cmd in MALFORMED_CURVES] + [("land", 3)]
+    simulator = Simulator(commands, mode="analysis")
+    simulator.use_mission_cache = False
+    mission = simulator.compile_mission()
+    curves = [entry for entry in mission["timeline"] if entry["command"] in MALFORMED_CURVES]
+    assert [entry["response"] for entry in curves] == ["error"] * len(MALFORMED_CURVES)
+    assert all(entry["duration"] == DEFAULT_MOVE_TIME for entry in curves)
+
+
+def test_executor_predicts_malformed_curves():
+    executor = MissionExecutor(_IdleDrone(), [])
+    executor.predictor.predict("command")
+    executor.predictor.predict("takeoff")
+    for cmd in MALFORMED_CURVES:
+        assert executor.predictor.predict(cmd) == DEFAULT_MOVE_TIME
@@ -1,8 +1,12 @@
-from djitellopy import Tello
-import cv2
 import time
+import cv2
+from video_pipeline import VideoPipeline, SyntheticSource, TelloFrameSource, UdpJpegSource
+from video_recorder import VideoRecorder
+from shared_ipc import SharedFrameRing, SharedDroneState
+from config import VIDEO_SOURCE, VIDEO_STATS_INTERVAL, VIDEO_RECORD
 
-def run_video():
+def connect_tello():
+    from djitellopy import Tello  # Only needed for the live drone feed
     tello = Tello()
     retries = 3
     delay = 2
@@ -10,30 +14,84 @@ def run_video():
         try:
             tello.connect()
             print("Video process: Connection established.")
-            break
+            return tello
         except Exception as e:
             print(f"Video process: Connection attempt {attempt + 1}/{retries} failed: {e}")
             if attempt < retries - 1:
                 time.sleep(delay)
-            else:
-                print("Video process: Failed to connect to Tello. Exiting.")
-                return
+    print("Video process: Failed to connect to Tello. Exiting.")
+    return None
 
+def create_source():
+    """Return (source, tello) for the configured VIDEO_SOURCE; tello is None unless the drone is used."""
+    if VIDEO_SOURCE == "synthetic":
+        return SyntheticSource(), None
+    if VIDEO_SOURCE == "udp_jpeg":
+        return UdpJpegSource(), None
+    tello = connect_tello()
+    if tello is None:
+        return None, None
     tello.streamon()
-    frame_read = tello.get_frame_read()
+    return TelloFrameSource(tello.get_frame_read()), tello
+
+def run_video(processor=None, record=VIDEO_RECORD, frame_ring_name=None, state_name=None, stop_event=None):
+    """
+    Show the video feed. Capture, optional processing and display run on separate threads.
+
+    Args:
+        processor: Optional callable(frame, out) run on the processing thread
+        record: Also encode the displayed frames to disk on a background thread
+        frame_ring_name: Shared memory SharedFrameRing to publish displayed frames to, for launcher.py's recorder
+            process
+        state_name: Shared memory SharedDroneState whose telemetry is shown in the window title
+        stop_event: multiprocessing.Event that ends the feed when set
+    """
+    source, tello = create_source()
+    if source is None:
+        return
+    shared_frames = SharedFrameRing.attach(frame_ring_name) if frame_ring_name else None
+    shared_state = SharedDroneState.attach(state_name) if state_name else None
+    state_sequence = 0
+    pipeline = VideoPipeline(source, processor)
+    pipeline.start()
+    recorder = VideoRecorder() if record else None
 
     cv2.namedWindow("Tello Video Feed", cv2.WINDOW_NORMAL)
-    while True:
-        frame = frame_read.frame
+    last_report = time.monotonic()
+    for frame, captured in pipeline.frames("display"):
         if frame is not None:
             cv2.imshow("Tello Video Feed", frame)
+            if recorder:
+                recorder.submit(frame, captured)  # Never blocks; drops or downscales under backpressure
+            if shared_frames:
+                shared_frames.write(frame, captured)
+        if shared_state:
+            state = shared_state.read(state_sequence)
+            if state:
+                state_sequence = state["sequence"]
+                cv2.setWindowTitle("Tello Video Feed", f"Tello Video Feed - h {state['z']:.0f} cm, "
+                                                       f"yaw {state['yaw']:.0f}, battery {state['battery']:.0f}%")
         if cv2.waitKey(1) & 0xFF == ord('q'):
             break
+        if stop_event is not None and stop_event.is_set():
+            break
+        if time.monotonic() - last_report >= VIDEO_STATS_INTERVAL:
+            print(f"Video process:\n{pipeline.summary()}")
+            if recorder:
+                print(recorder.summary())
+            last_report = time.monotonic()
 
-    tello.streamoff()
+    pipeline.stop()
+    if recorder:
+        recorder.close()
+        print(recorder.summary())
+    if tello is not None:
+        tello.streamoff()
+    for shared in (shared_frames, shared_state):
+        if shared:
+            shared.close()
     cv2.destroyAllWindows()
-    frame_read.stop()
-    print("Video process: Stopped.")
+    print(f"Video process: Stopped.\n{pipeline.summary()}")
 
 if __name__ == "__main__":
-    run_video()
\ No newline at end of file
+    run_video()
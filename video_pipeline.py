@@ -0,0 +1,322 @@
+import socket
+import threading
+import time
+import numpy as np
+from config import (VIDEO_RING_SLOTS, VIDEO_WAIT_TIMEOUT, VIDEO_LATENCY_WINDOW, VIDEO_POLL_INTERVAL,
+                    VIDEO_SYNTHETIC_FPS, VIDEO_SYNTHETIC_SIZE, TELLO_VIDEO_PORT)
+
+
+"""Preallocated ring of frame buffers shared between pipeline stages.
+
+A producer copies (or writes) into a free slot and publishes it; consumers take the newest published slot,
+so a slow consumer skips frames instead of queueing them (latest frame wins). Slots are leased while a
+consumer uses them, and the producer never writes into a leased slot or the newest one, so frames are
+handed between stages by index without further copies.
+"""
+class FrameRing:
+    def __init__(self, shape, slots=VIDEO_RING_SLOTS, dtype=np.uint8):
+        if slots < 3:
+            raise ValueError("FrameRing needs at least 3 slots (newest, one leased, one being written)")
+        self.frames = np.zeros((slots,) + tuple(shape), dtype=dtype)
+        self.timestamps = np.zeros(slots)  # Capture time of the frame in each slot
+        self.sequences = np.zeros(slots, dtype=np.int64)
+        self._leases = [0] * slots
+        self._latest = -1
+        self._sequence = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    @property
+    def shape(self):
+        return self.frames.shape[1:]
+
+    def acquire_write(self):
+        """Return a slot index the producer may fill. Slots that are leased or newest are skipped."""
+        with self._condition:
+            slots = len(self.frames)
+            for offset in range(1, slots + 1):
+                slot = (self._latest + offset) % slots
+                if slot != self._latest and self._leases[slot] == 0:
+                    return slot
+        raise RuntimeError("No free frame slot; more consumers than the ring was sized for")
+
+    def publish(self, slot, timestamp):
+        """Make a filled slot the newest frame and wake consumers."""
+        with self._condition:
+            self._sequence += 1
+            self.timestamps[slot] = timestamp
+            self.sequences[slot] = self._sequence
+            self._latest = slot
+            self._condition.notify_all()
+
+    def write(self, frame, timestamp=None):
+        """Copy a frame into the ring and publish it."""
+        slot = self.acquire_write()
+        np.copyto(self.frames[slot], frame)
+        self.publish(slot, time.monotonic() if timestamp is None else timestamp)
+
+    def acquire_latest(self, after_sequence, timeout=VIDEO_WAIT_TIMEOUT):
+        """
+        Wait for a frame newer than after_sequence and lease it.
+
+        Returns:
+            (slot, sequence) or None on timeout or close; release the slot when done
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._closed or self._sequence > after_sequence, timeout):
+                return None
+            if self._closed or self._latest < 0:
+                return None
+            self._leases[self._latest] += 1
+            return self._latest, self._sequence
+
+    def release(self, slot):
+        with self._condition:
+            self._leases[slot] -= 1
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    @property
+    def closed(self):
+        return self._closed
+
+
+class StageStats:
+    """Per-consumer counters: frames handled, frames skipped, and a window of end-to-end latencies."""
+
+    def __init__(self, name, window=VIDEO_LATENCY_WINDOW):
+        self.name = name
+        self.frames = 0
+        self.dropped = 0
+        self.latencies = np.zeros(window)
+        self._last_sequence = 0
+
+    def record(self, sequence, capture_time, now=None):
+        now = time.monotonic() if now is None else now
+        if self._last_sequence and sequence > self._last_sequence + 1:
+            self.dropped += sequence - self._last_sequence - 1
+        self._last_sequence = sequence
+        self.latencies[self.frames % len(self.latencies)] = now - capture_time
+        self.frames += 1
+
+    def summary(self):
+        samples = self.latencies[:min(self.frames, len(self.latencies))]
+        if len(samples) == 0:
+            return f"{self.name}: no frames"
+        p50, p95 = np.percentile(samples, (50, 95)) * 1000
+        return (f"{self.name}: {self.frames} frames, {self.dropped} dropped, "
+                f"latency p50 {p50:.1f} ms p95 {p95:.1f} ms")
+
+
+class SyntheticSource:
+    """Generates moving test frames at a fixed rate (no camera needed)."""
+
+    def __init__(self, fps=VIDEO_SYNTHETIC_FPS, size=VIDEO_SYNTHETIC_SIZE):
+        self.interval = 1.0 / fps
+        self.width, self.height = size
+        self._next = time.monotonic()
+        self._count = 0
+
+    def read(self):
+        """Block until the next frame is due and return it."""
+        delay = self._next - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        self._next = max(self._next + self.interval, time.monotonic() - self.interval)
+        frame = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        frame[:] = 40
+        column = self._count * 4 % self.width
+        frame[:, column:column + 8] = 255  # Moving bar
+        self._count += 1
+        return frame
+
+    def close(self):
+        pass
+
+
+class TelloFrameSource:
+    """Frames from djitellopy's background reader, which decodes on its own thread and exposes the newest frame."""
+
+    def __init__(self, frame_read, poll_interval=VIDEO_POLL_INTERVAL):
+        self.frame_read = frame_read
+        self.poll_interval = poll_interval
+        self._last = None
+
+    def read(self):
+        """Return the next new frame; the reader has no notification, so poll lightly until it changes."""
+        while True:
+            frame = self.frame_read.frame
+            if frame is not None and frame is not self._last:
+                self._last = frame
+                return frame
+            if self.frame_read.stopped:
+                return None
+            time.sleep(self.poll_interval)
+
+    def close(self):
+        self.frame_read.stop()
+
+
+class UdpJpegSource:
+    """One JPEG per datagram, as sent by tello_emulator; blocks in recv rather than polling."""
+
+    def __init__(self, port=TELLO_VIDEO_PORT, host="0.0.0.0", timeout=1.0):
+        import cv2  # Only needed for JPEG decoding
+        self._cv2 = cv2
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind((host, port))
+        self.socket.settimeout(timeout)
+        self._closed = False
+
+    def read(self):
+        while not self._closed:
+            try:
+                data = self.socket.recv(65536)
+            except socket.timeout:
+                continue
+            except OSError:
+                return None
+            frame = self._cv2.imdecode(np.frombuffer(data, dtype=np.uint8), self._cv2.IMREAD_COLOR)
+            if frame is not None:
+                return frame
+        return None
+
+    def close(self):
+        self._closed = True
+        self.socket.close()
+
+
+"""Capture -> (optional processing) -> display, each on its own thread.
+
+The capture thread copies each decoded frame once into the capture ring. A processor, if given, runs on its
+own thread as processor(frame, out) and writes into a slot of the processed ring. Consumers registered with
+add_consumer (display, recorder, ...) read the newest frame of the final ring and never hold back capture.
+"""
+class VideoPipeline:
+    def __init__(self, source, processor=None, slots=VIDEO_RING_SLOTS):
+        """
+        Initialize the pipeline.
+
+        Args:
+            source: Object with read() -> frame or None (end of stream) and close()
+            processor: Optional callable(frame, out) writing a processed frame into `out`
+            slots: Frame buffers per ring; each extra consumer needs one more slot
+        """
+        self.source = source
+        self.processor = processor
+        self.slots = slots
+        self.capture_ring = None
+        self.output_ring = None
+        self.captured = 0
+        self.stats = []
+        self._ready = threading.Event()
+        self._stopping = threading.Event()
+        self._threads = []
+        self._consumers = []
+
+    def add_consumer(self, name):
+        """Register a consumer of the output ring and return its StageStats."""
+        stats = StageStats(name)
+        self.stats.append(stats)
+        return stats
+
+    def start(self):
+        self._threads.append(threading.Thread(target=self._capture, name="video-capture", daemon=True))
+        if self.processor:
+            self._threads.append(threading.Thread(target=self._process, name="video-process", daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def wait_ready(self, timeout=None):
+        """Wait until the first frame has sized the rings. Returns False on timeout or end of stream."""
+        return self._ready.wait(timeout) and self.output_ring is not None
+
+    def _capture(self):
+        try:
+            frame = self.source.read()
+            if frame is None:
+                return
+            self.capture_ring = FrameRing(frame.shape, self.slots, frame.dtype)
+            self.output_ring = (FrameRing(frame.shape, self.slots, frame.dtype) if self.processor
+                                else self.capture_ring)
+            self._ready.set()
+            while frame is not None and not self._stopping.is_set():
+                if frame.shape == self.capture_ring.shape:
+                    self.capture_ring.write(frame)
+                    self.captured += 1
+                frame = self.source.read()
+        finally:
+            self._ready.set()
+            self._close_rings()
+
+    def _process(self):
+        if not self.wait_ready():
+            return
+        stats = self.add_consumer("process")
+        sequence = 0
+        while not self._stopping.is_set():
+            lease = self.capture_ring.acquire_latest(sequence)
+            if lease is None:
+                if self.capture_ring.closed:
+                    break
+                continue
+            slot, sequence = lease
+            out_slot = self.output_ring.acquire_write()
+            captured = self.capture_ring.timestamps[slot]  # Read under the lease, the writer reuses the slot
+            try:
+                self.processor(self.capture_ring.frames[slot], self.output_ring.frames[out_slot])
+            finally:
+                self.capture_ring.release(slot)
+            self.output_ring.publish(out_slot, captured)
+            stats.record(sequence, captured)
+        self.output_ring.close()
+
+    def frames(self, name="display", timeout=VIDEO_WAIT_TIMEOUT):
+        """
+        Iterate over the newest frames of the output ring for one consumer.
+
+        Yields (frame, capture_time) or (None, None) when no new frame arrived within `timeout`, so a GUI
+        loop can keep pumping events. The frame buffer is only valid until the next iteration.
+        """
+        if not self.wait_ready():
+            return
+        stats = self.add_consumer(name)
+        ring = self.output_ring
+        sequence = 0
+        slot = None
+        try:
+            while True:
+                if slot is not None:
+                    ring.release(slot)
+                    slot = None
+                lease = ring.acquire_latest(sequence, timeout)
+                if lease is None:
+                    if ring.closed or self._stopping.is_set():
+                        return
+                    yield None, None
+                    continue
+                slot, sequence = lease
+                captured = ring.timestamps[slot]
+                stats.record(sequence, captured)
+                yield ring.frames[slot], captured
+        finally:
+            if slot is not None:
+                ring.release(slot)
+
+    def _close_rings(self):
+        for ring in (self.capture_ring, self.output_ring):
+            if ring is not None:
+                ring.close()
+
+    def stop(self):
+        self._stopping.set()
+        self.source.close()
+        self._close_rings()
+        for thread in self._threads:
+            thread.join(timeout=2.0)
+
+    def summary(self):
+        return "\n".join([f"capture: {self.captured} frames"] + [stats.summary() for stats in self.stats])
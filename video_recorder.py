@@ -0,0 +1,158 @@
+import os
+import queue
+import threading
+import time
+import numpy as np
+from paths import resolve_path
+from config import (VIDEO_RECORD_DIR, VIDEO_RECORD_FPS, VIDEO_RECORD_CODEC, VIDEO_RECORD_QUEUE,
+                    VIDEO_RECORD_POLICY, VIDEO_RECORD_DOWNSCALE_WATERMARK, VIDEO_RECORD_POLL_INTERVAL)
+
+RECORD_POLICIES = ("drop", "downscale")
+
+
+"""Encodes frames to disk on a worker thread with cv2.VideoWriter (software codec, no GPU needed).
+
+submit() never blocks: frames are copied into a preallocated pool of VIDEO_RECORD_QUEUE buffers and queued.
+With the "downscale" policy, once the queue is past VIDEO_RECORD_DOWNSCALE_WATERMARK full, frames are stored
+at half resolution (a quarter of the copy cost) and scaled back up by the encoder; a full queue drops frames
+under either policy. Every written frame gets a row in <video>.timestamps.csv with its capture time on the
+wall clock, so footage can be lined up with simulator or telemetry logs.
+"""
+class VideoRecorder:
+    def __init__(self, path=None, fps=VIDEO_RECORD_FPS, codec=VIDEO_RECORD_CODEC, queue_size=VIDEO_RECORD_QUEUE,
+                 policy=VIDEO_RECORD_POLICY):
+        """
+        Initialize the recorder; the writer opens when the first frame sets the size.
+
+        Args:
+            path: Output video file, defaults to a timestamped file in VIDEO_RECORD_DIR
+            fps: Frame rate stored in the file
+            codec: FourCC of an OpenCV software codec (e.g. "mp4v", "MJPG")
+            queue_size: Frames buffered between submit() and the encoder
+            policy: One of RECORD_POLICIES
+        """
+        if policy not in RECORD_POLICIES:
+            raise ValueError(f"Unknown recording policy '{policy}', expected one of {RECORD_POLICIES}")
+        if path is None:
+            path = os.path.join(VIDEO_RECORD_DIR, time.strftime("tello_%Y%m%d_%H%M%S.mp4"))
+        import cv2  # Only needed when recording
+        self._cv2 = cv2
+        self.path = resolve_path(path)
+        self.fps = fps
+        self.codec = codec
+        self.queue_size = queue_size
+        self.policy = policy
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.downscaled = 0
+        # Offset from time.monotonic() capture stamps to wall-clock time
+        self.clock_offset = time.time() - time.monotonic()
+        self._full = None  # (queue_size, H, W, C) pool, allocated on the first frame
+        self._half = None
+        self._free = queue.Queue()
+        self._pending = queue.Queue()
+        self._worker = None
+
+    def _allocate(self, frame):
+        height, width = frame.shape[:2]
+        self._full = np.empty((self.queue_size,) + frame.shape, dtype=frame.dtype)
+        if self.policy == "downscale":
+            self._half = np.empty((self.queue_size, height // 2, width // 2) + frame.shape[2:], dtype=frame.dtype)
+        for slot in range(self.queue_size):
+            self._free.put(slot)
+        self._worker = threading.Thread(target=self._encode, args=(width, height), name="video-recorder",
+                                        daemon=True)
+        self._worker.start()
+
+    def submit(self, frame, capture_time=None):
+        """Queue a copy of a frame for encoding. Returns False if it was dropped."""
+        capture_time = time.monotonic() if capture_time is None else capture_time
+        if self._full is None:
+            self._allocate(frame)
+        self.submitted += 1
+        if frame.shape != self._full.shape[1:]:
+            self.dropped += 1
+            return False
+        try:
+            slot = self._free.get_nowait()
+        except queue.Empty:
+            self.dropped += 1
+            return False
+        backlog = self._pending.qsize() / self.queue_size
+        if self._half is not None and backlog >= VIDEO_RECORD_DOWNSCALE_WATERMARK:
+            half = self._half[slot]
+            self._cv2.resize(frame, (half.shape[1], half.shape[0]), dst=half, interpolation=self._cv2.INTER_AREA)
+            self.downscaled += 1
+            self._pending.put((slot, True, capture_time))
+        else:
+            np.copyto(self._full[slot], frame)
+            self._pending.put((slot, False, capture_time))
+        return True
+
+    def _encode(self, width, height):
+        cv2 = self._cv2
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        writer = cv2.VideoWriter(self.path, cv2.VideoWriter_fourcc(*self.codec), self.fps, (width, height))
+        if not writer.isOpened():
+            print(f"Video recorder: could not open {self.path} with codec {self.codec}")
+        with open(os.path.splitext(self.path)[0] + ".timestamps.csv", "w") as timestamps:
+            timestamps.write("frame,capture_time,downscaled\n")
+            while True:
+                item = self._pending.get()
+                if item is None:
+                    break
+                slot, downscaled, capture_time = item
+                if downscaled:
+                    frame = cv2.resize(self._half[slot], (width, height), interpolation=cv2.INTER_LINEAR)
+                else:
+                    frame = self._full[slot]
+                if writer.isOpened():
+                    writer.write(frame)
+                self._free.put(slot)
+                timestamps.write(f"{self.written},{capture_time + self.clock_offset:.6f},{int(downscaled)}\n")
+                self.written += 1
+        writer.release()
+
+    def close(self):
+        """Flush queued frames and finish the file."""
+        if self._worker is not None:
+            self._pending.put(None)
+            self._worker.join()
+            self._worker = None
+
+    def summary(self):
+        return (f"recorder: {self.written}/{self.submitted} frames written, {self.downscaled} downscaled, "
+                f"{self.dropped} dropped -> {self.path}")
+
+
+def record_shared_frames(frame_ring_name, stop_event, path=None, poll_interval=VIDEO_RECORD_POLL_INTERVAL):
+    """
+    Record the frames another process publishes to a SharedFrameRing (launcher.py's recorder process).
+
+    Encoding runs in this process, so the video process only pays for publishing each frame to the ring.
+    Frames published faster than they are read are skipped, like a full recorder queue.
+
+    Args:
+        frame_ring_name: Shared memory SharedFrameRing to read
+        stop_event: multiprocessing.Event that ends the recording when set
+        path: Output video file, defaults to a timestamped file in VIDEO_RECORD_DIR
+        poll_interval: Seconds to wait when no new frame has been published
+    """
+    from shared_ipc import SharedFrameRing
+    ring = SharedFrameRing.attach(frame_ring_name)
+    recorder = VideoRecorder(path)
+    frame = np.empty(ring.shape, dtype=np.uint8)
+    sequence = 0
+    try:
+        while not stop_event.is_set():
+            published = ring.read_into(frame, sequence)
+            if published is None:
+                stop_event.wait(poll_interval)
+                continue
+            sequence, captured = published
+            recorder.submit(frame, captured)
+    finally:
+        recorder.close()
+        ring.close()
+    print(f"Recorder process: Stopped.\n{recorder.summary()}")
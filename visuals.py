@@ -4,6 +4,8 @@ from OpenGL.GL import *
 from OpenGL.GLU import gluPerspective
 from drone_visuals import DroneRenderer
 from grid_visuals import GridRenderer
+from terrain_visuals import TerrainRenderer
+import obstruction_renderer
 from camera import Camera
 from config import (
     VIEWPORT_WIDTH, VIEWPORT_HEIGHT, GRID_SIZE, GRID_STEP,
@@ -15,7 +17,7 @@ from config import (
     WORLD_TO_PIXEL_SCALE_X,WORLD_TO_PIXEL_SCALE_Y)
 
 class Visualizer:
-    def __init__(self):
+    def __init__(self, terrain=None):
         try:
             pygame.init()
             self.display = (VIEWPORT_WIDTH, VIEWPORT_HEIGHT)
@@ -29,15 +31,21 @@ class Visualizer:
         self._init_opengl()
 
         self.grid_renderer = GridRenderer(GRID_SIZE, GRID_STEP, GRID_COLOR, GRID_LINE_COLOR)
+        # Heightmap terrain replaces the flat grid when configured
+        self.terrain_renderer = TerrainRenderer(terrain) if terrain is not None else None
         self.drone_renderer = DroneRenderer(DRONE_WIDTH, DRONE_LENGTH, DRONE_HEIGHT, DRONE_SCALE_FACTOR)
 
         self.clock = pygame.time.Clock()
         self.fps = FRAME_RATE
 
+        # Camera works in world units; the fixed view constants are in scaled view units
         self.camera = Camera(
-            CAMERA_EYE_X, CAMERA_EYE_Y, CAMERA_EYE_Z,
-            CAMERA_TARGET_X, CAMERA_TARGET_Y, CAMERA_TARGET_Z,
-            CAMERA_UP_X, CAMERA_UP_Y, CAMERA_UP_Z
+            CAMERA_EYE_X * WORLD_TO_PIXEL_SCALE_X, CAMERA_EYE_Y * WORLD_TO_PIXEL_SCALE_Y,
+            CAMERA_EYE_Z * WORLD_TO_PIXEL_SCALE_X,
+            CAMERA_TARGET_X * WORLD_TO_PIXEL_SCALE_X, CAMERA_TARGET_Y * WORLD_TO_PIXEL_SCALE_Y,
+            CAMERA_TARGET_Z * WORLD_TO_PIXEL_SCALE_X,
+            CAMERA_UP_X, CAMERA_UP_Y, CAMERA_UP_Z,
+            world_scale=(1 / WORLD_TO_PIXEL_SCALE_X, 1 / WORLD_TO_PIXEL_SCALE_Y, 1 / WORLD_TO_PIXEL_SCALE_X)
         )
 
     def _init_opengl(self):
@@ -75,14 +83,15 @@ class Visualizer:
 
         Args:
             drone_state: Dictionary with the drone state
-            obstructions: List of obstruction objects to render
+            obstructions: List of obstructions or obstruction batches to render
         """
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
-        glLoadIdentity()
 
-        self.camera.apply()
-        glScale(1 / WORLD_TO_PIXEL_SCALE_X, 1 / WORLD_TO_PIXEL_SCALE_Y, 1 / WORLD_TO_PIXEL_SCALE_X)
-        self.grid_renderer.render()
+        self.camera.apply()  # Loads the cached view matrix, world scale included
+        if self.terrain_renderer:
+            self.terrain_renderer.render(self.camera.eye_position)
+        else:
+            self.grid_renderer.render()
 
         for obstruction in obstructions:
             obstruction.render()
@@ -97,18 +106,29 @@ class Visualizer:
         actual_fps = self.clock.get_fps()
         pygame.display.set_caption(f"3D Drone Simulator - FPS: {actual_fps:.1f}")
 
+    def update_camera(self, drone_state, dt):
+        """Advance camera smoothing by one physics tick."""
+        self.camera.update(drone_state, dt)
+
     def is_running(self):
-        """Check if the simulation should continue running."""
+        """Check if the simulation should continue running, forwarding input to the camera."""
         for event in pygame.event.get():
             if event.type == QUIT:
                 return False
-            elif event.type == KEYDOWN:
-                if event.key == K_ESCAPE:
-                    return False
+            elif event.type == KEYDOWN and event.key == K_ESCAPE:
+                return False
+            self.camera.handle_event(event)
         return True
 
+    def pump_events(self):
+        """Let the window system process events between is_running() polls."""
+        pygame.event.pump()
+
     def quit(self):
         """Clean up resources and quit."""
         self.drone_renderer.cleanup()
         self.grid_renderer.cleanup()
+        if self.terrain_renderer:
+            self.terrain_renderer.cleanup()
+        obstruction_renderer.cleanup()
         pygame.quit()
\ No newline at end of file
@@ -1,34 +1,151 @@
-from avwx import Metar
+import json
+import os
+import threading
+import time
+from paths import resolve_path
+from config import (WEATHER_CACHE_FILE, WEATHER_CACHE_TTL, WEATHER_FIXTURE_FILE, WEATHER_STATIC_PROFILE,
+                    WEATHER_OFFLINE)
 
+"""Weather provider with an on-disk METAR cache.
+
+Startup never waits on the network: weather comes from the cache file (shared by every run on the machine),
+then a fixture file, then WEATHER_STATIC_PROFILE. When the cached entry is missing or older than
+WEATHER_CACHE_TTL, a background thread fetches a fresh METAR and rewrites the cache for later runs.
+"""
 class Weather:
-    def __init__(self, icao="KSEA"):
-        """Initialize with an ICAO code for the weather station."""
+    def __init__(self, icao="KSEA", cache_path=WEATHER_CACHE_FILE, ttl=WEATHER_CACHE_TTL,
+                 fixture_path=WEATHER_FIXTURE_FILE, offline=WEATHER_OFFLINE):
+        """
+        Initialize with an ICAO code for the weather station.
+
+        Args:
+            icao: Weather station code
+            cache_path: JSON cache file shared across runs, or None to disable caching
+            ttl: Seconds a cached observation stays fresh
+            fixture_path: JSON file with an observation to use when nothing is cached, or None
+            offline: Never fetch from the network
+        """
         self.icao = icao
-        self.obs = Metar(icao)
-        self.weather_data = {}
-        self.update()  # Fetch initial data
+        self.cache_path = resolve_path(cache_path) if cache_path else None
+        self.ttl = ttl
+        self.fixture_path = resolve_path(fixture_path) if fixture_path else None
+        self.offline = offline
+        self._lock = threading.Lock()
+        self._refresh_thread = None
 
-    def update(self):
-        """Fetch and parse the latest METAR data."""
-        self.obs.update()
-        self.weather_data = {
-            "wind_speed": self.obs.data.wind_speed.value if self.obs.data.wind_speed else 0,  # knots
-            "wind_direction": self.obs.data.wind_direction.value if self.obs.data.wind_direction else 0,  # degrees
-            "wind_gust": self.obs.data.wind_gust.value if self.obs.data.wind_gust else None,  # knots, optional
-            "temperature": self.obs.data.temperature.value if self.obs.data.temperature else 20,  # Celsius
-            "precipitation": bool("rain" in self.obs.data.wx_codes or "snow" in self.obs.data.wx_codes)  # Boolean
+        entry = self._read_cache()
+        self.source = "cache"
+        if entry is None:
+            entry, self.source = self._read_fixture(), "fixture"
+        if entry is None:
+            entry, self.source = self._static_entry(), "static"
+        self._apply(entry)
+
+        if not offline and (self.source != "cache" or time.time() - entry["fetched"] > ttl):
+            self._refresh_thread = threading.Thread(target=self._refresh, name="weather-refresh", daemon=True)
+            self._refresh_thread.start()
+
+    def _static_entry(self):
+        return {"fetched": 0, "station": self.icao, "raw": "", "summary": "static weather profile",
+                "weather_data": dict(WEATHER_STATIC_PROFILE)}
+
+    def _read_cache(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return None
+        try:
+            with open(self.cache_path) as f:
+                return json.load(f).get(self.icao)
+        except (OSError, ValueError) as e:
+            print(f"Weather cache {self.cache_path} unreadable ({e}).")
+            return None
+
+    def _read_fixture(self):
+        if not self.fixture_path or not os.path.exists(self.fixture_path):
+            return None
+        with open(self.fixture_path) as f:
+            fixture = json.load(f)
+        # A fixture is either one entry or a mapping of ICAO codes to entries
+        entry = fixture.get(self.icao, fixture)
+        return entry if "weather_data" in entry else None
+
+    def _write_cache(self, entry):
+        if not self.cache_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+            cache = {}
+            if os.path.exists(self.cache_path):
+                try:
+                    with open(self.cache_path) as f:
+                        cache = json.load(f)
+                except (OSError, ValueError):
+                    cache = {}
+            cache[self.icao] = entry
+            tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(cache, f, indent=2)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"Could not write weather cache {self.cache_path}: {e}")
+
+    def _apply(self, entry):
+        with self._lock:
+            self.entry = entry
+            self.weather_data = dict(entry["weather_data"])
+
+    def _fetch(self):
+        """Fetch and parse the latest METAR data into a cache entry."""
+        from avwx import Metar  # Network client, only needed when refreshing
+        obs = Metar(self.icao)
+        obs.update()
+        weather_data = {
+            "wind_speed": obs.data.wind_speed.value if obs.data.wind_speed else 0,  # knots
+            "wind_direction": obs.data.wind_direction.value if obs.data.wind_direction else 0,  # degrees
+            "wind_gust": obs.data.wind_gust.value if obs.data.wind_gust else None,  # knots, optional
+            "temperature": obs.data.temperature.value if obs.data.temperature else 20,  # Celsius
+            "precipitation": bool("rain" in obs.data.wx_codes or "snow" in obs.data.wx_codes)  # Boolean
         }
+        return {"fetched": time.time(), "station": getattr(obs.station, "name", None) or self.icao,
+                "raw": obs.raw, "summary": obs.summary, "weather_data": weather_data}
+
+    def _refresh(self):
+        try:
+            entry = self._fetch()
+        except Exception as e:
+            print(f"Weather refresh for {self.icao} failed ({e!r}); using {self.source} weather.")
+            return
+        self._write_cache(entry)
+        self._apply(entry)
+        self.source = "metar"
+
+    def update(self):
+        """Fetch the latest METAR now (blocking) and update the cache."""
+        entry = self._fetch()
+        self._write_cache(entry)
+        self._apply(entry)
+        self.source = "metar"
+
+    def wait_for_refresh(self, timeout=None):
+        """Wait for a background refresh started at construction. Returns True if none is still running."""
+        if self._refresh_thread is not None:
+            self._refresh_thread.join(timeout)
+            return not self._refresh_thread.is_alive()
+        return True
 
     def get_weather_data(self):
         """Return the current weather data dictionary."""
-        return self.weather_data
+        with self._lock:
+            return dict(self.weather_data)
 
     def print_summary(self):
         """Print a formatted summary of the METAR data, split into lines."""
-        summary = self.obs.summary
-        summary_lines = summary.split(', ')  # Split summary into individual conditions
-        print(f"METAR Summary for {self.obs.station}:")
-        print(self.obs.raw)
+        with self._lock:
+            entry = self.entry
+        age = f", {(time.time() - entry['fetched']) / 60:.0f} min old" if entry["fetched"] else ""
+        summary_lines = entry["summary"].split(', ')  # Split summary into individual conditions
+        print(f"METAR Summary for {entry['station']} ({self.source}{age}):")
+        if entry["raw"]:
+            print(entry["raw"])
         print("\n".join(summary_lines))  # Print each condition on a new line
         print("\n*****************************")
-        print("*****************************\n")
\ No newline at end of file
+        print("*****************************\n")
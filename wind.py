@@ -0,0 +1,214 @@
+import math
+import numpy as np
+from config import (WIND_ENABLED, WIND_CELL_SIZE, WIND_VERTICAL_CELL_SIZE, WIND_MAX_ALTITUDE, WIND_EXTENT,
+                    WIND_MARGIN, WIND_MAX_CELLS, WIND_REFERENCE_HEIGHT, WIND_MIN_HEIGHT, WIND_SHEAR_EXPONENT,
+                    WIND_TURBULENCE_INTENSITY, WIND_GUST_PEAK_FACTOR, WIND_GUST_GRID, WIND_GUST_CELL_SIZE,
+                    WIND_GUST_LENGTH_SCALE, WIND_SHELTER_LENGTH, WIND_SHELTER_STRENGTH, WIND_DRIFT_FACTOR, WIND_SEED,
+                    DRONE_INITIAL_X, DRONE_INITIAL_Y)
+
+KNOTS_TO_CM_S = 51.4444
+
+
+def _grid_coordinates(grid, origin, cell_size, points, wrap):
+    """Lower corner indices and fractions of points in a grid (periodic grids carry one wrapped extra layer)."""
+    shape = np.array(grid.shape[:3])
+    f = (points - origin) / cell_size
+    if wrap:
+        f = np.mod(f, shape - 1)
+    else:
+        f = np.clip(f, 0, shape - 1)
+    i0 = np.minimum(f.astype(np.int64), shape - 2)
+    return i0, f - i0
+
+
+def trilinear(grid, origin, cell_size, points, wrap=False):
+    """
+    Trilinear lookup of a (nx, ny, nz, C) grid at (N, 3) points.
+
+    Outside the grid the edge values extend outward; with `wrap` the grid is periodic and its last layer in
+    each axis must repeat the first (see np.pad mode="wrap").
+    """
+    i0, t = _grid_coordinates(grid, origin, cell_size, points, wrap)
+    x0, y0, z0 = i0.T
+    x1, y1, z1 = (i0 + 1).T
+    tx, ty, tz = (t[:, axis:axis + 1] for axis in range(3))
+    bottom = ((grid[x0, y0, z0] * (1 - tx) + grid[x1, y0, z0] * tx) * (1 - ty) +
+              (grid[x0, y1, z0] * (1 - tx) + grid[x1, y1, z0] * tx) * ty)
+    top = ((grid[x0, y0, z1] * (1 - tx) + grid[x1, y0, z1] * tx) * (1 - ty) +
+           (grid[x0, y1, z1] * (1 - tx) + grid[x1, y1, z1] * tx) * ty)
+    return bottom * (1 - tz) + top * tz
+
+
+def trilinear_point(grid, origin, cell_size, point, wrap=False):
+    """trilinear() for a single point, with one 2x2x2 block read instead of eight gathers."""
+    i0, t = _grid_coordinates(grid, origin, cell_size, np.asarray(point, dtype=float), wrap)
+    x0, y0, z0 = i0
+    tx, ty, tz = t
+    block = grid[x0:x0 + 2, y0:y0 + 2, z0:z0 + 2]
+    face = block[0] * (1 - tx) + block[1] * tx
+    edge = face[0] * (1 - ty) + face[1] * ty
+    return edge[0] * (1 - tz) + edge[1] * tz
+
+
+def gust_noise(shape, cell_size, length_scale, rng):
+    """
+    Periodic (nx, ny, nz, 3) turbulence with a von Karman-like spectrum and unit variance per component.
+
+    White noise is filtered in the Fourier domain, so the field tiles seamlessly and can be advected forever.
+    """
+    k = np.meshgrid(*(np.fft.fftfreq(n, cell_size) * 2 * np.pi for n in shape[:2]),
+                    np.fft.rfftfreq(shape[2], cell_size) * 2 * np.pi, indexing="ij")
+    k2 = sum(component ** 2 for component in k)
+    spectrum = k2 / (1 + k2 * length_scale ** 2) ** (17 / 6)  # 3D density of E(k) ~ k^4 / (1 + (kL)^2)^(17/6)
+    spectrum[0, 0, 0] = 0  # No mean
+    amplitude = np.sqrt(spectrum)
+    noise = np.empty(tuple(shape) + (3,))
+    for component in range(3):
+        white = rng.standard_normal(shape)
+        field = np.fft.irfftn(np.fft.rfftn(white) * amplitude, s=shape)
+        noise[..., component] = field / (field.std() or 1.0)
+    noise[..., 2] *= 0.5  # Vertical gusts are weaker near the ground
+    return noise
+
+
+"""Precomputed 3D wind field built from a METAR observation.
+
+The mean wind follows a power-law height profile from the 10 m METAR reference and is weakened in the lee of
+obstructions. Gusts come from a seeded periodic turbulence tile that is carried along with the mean wind
+(frozen turbulence), scaled per cell by the local gust strength. Both live on grids, so sampling wind for any
+number of drones is two vectorized trilinear lookups.
+"""
+class WindField:
+    def __init__(self, mean, origin, cell_size, gust, gust_cell_size, advection):
+        """
+        Initialize from precomputed grids (see build_wind_field).
+
+        Args:
+            mean: (nx, ny, nz, 4) grid of mean wind (vx, vy, vz) in cm/s and gust standard deviation
+            origin: World position (x, y, z) of mean[0, 0, 0]
+            cell_size: (dx, dy, dz) grid spacing in cm
+            gust: (gx, gy, gz, 3) periodic unit-variance turbulence (one tile, without the wrapped layer)
+            gust_cell_size: Turbulence grid spacing in cm
+            advection: (vx, vy, vz) velocity carrying the turbulence, usually the reference mean wind
+        """
+        self.mean = np.ascontiguousarray(mean, dtype=np.float32)
+        self.origin = np.asarray(origin, dtype=float)
+        self.cell_size = np.asarray(cell_size, dtype=float)
+        self.gust = np.pad(np.asarray(gust, dtype=np.float32), ((0, 1), (0, 1), (0, 1), (0, 0)), mode="wrap")
+        self.gust_cell_size = float(gust_cell_size)
+        self.advection = np.asarray(advection, dtype=float)
+
+    def sample(self, points, t=0.0):
+        """Wind velocity (N, 3) in cm/s at (N, 3) positions and simulation time t seconds (scalar or (N,))."""
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        t = np.asarray(t, dtype=float).reshape(-1, 1)
+        mean = trilinear(self.mean, self.origin, self.cell_size, points)
+        gust = trilinear(self.gust, 0.0, self.gust_cell_size, points - self.advection * t, wrap=True)
+        return mean[:, :3] + gust * mean[:, 3:4]
+
+    def velocity_at(self, x, y, z, t=0.0):
+        """Wind velocity (vx, vy, vz) in cm/s at one position, for per-tick use by a single drone."""
+        point = np.array((x, y, z), dtype=float)
+        mean = trilinear_point(self.mean, self.origin, self.cell_size, point)
+        gust = trilinear_point(self.gust, 0.0, self.gust_cell_size, point - self.advection * t, wrap=True)
+        vx, vy, vz = mean[:3] + gust * mean[3]
+        return float(vx), float(vy), float(vz)
+
+    def drift(self, points, duration, t=0.0, factor=WIND_DRIFT_FACTOR):
+        """
+        Horizontal displacement (N, 3) of drones holding position for `duration` seconds (scalar or (N,)).
+
+        The Tello's position hold cancels most of the wind and its altitude hold all of the vertical part, so
+        only `factor` of the horizontal wind moves the drone.
+        """
+        displacement = self.sample(points, t) * (factor * np.asarray(duration, dtype=float).reshape(-1, 1))
+        displacement[:, 2] = 0
+        return displacement
+
+
+def _shelter(xs, ys, zs, table, direction):
+    """(nx, ny, nz) wind factor: 1 in open air, lower in the lee of the table's primitives."""
+    shelter = np.ones((len(xs), len(ys), len(zs)), dtype=np.float32)
+    mins, maxs = table.primitive_bounds()
+    for lo, hi in zip(mins, maxs):
+        center = (lo[:2] + hi[:2]) / 2
+        half_width = max(hi[0] - lo[0], hi[1] - lo[1]) / 2
+        wake = WIND_SHELTER_LENGTH * max(hi[2] - lo[2], 1.0)
+        # Cells that can lie in the wake: the footprint extended downwind
+        reach = center + direction * wake
+        box_lo = np.minimum(center, reach) - half_width
+        box_hi = np.maximum(center, reach) + half_width
+        ix = np.flatnonzero((xs >= box_lo[0]) & (xs <= box_hi[0]))
+        iy = np.flatnonzero((ys >= box_lo[1]) & (ys <= box_hi[1]))
+        iz = np.flatnonzero(zs <= hi[2])
+        if len(ix) == 0 or len(iy) == 0 or len(iz) == 0:
+            continue
+        rel_x = xs[ix][:, None] - center[0]
+        rel_y = ys[iy][None, :] - center[1]
+        along = rel_x * direction[0] + rel_y * direction[1]
+        across = np.abs(rel_x * direction[1] - rel_y * direction[0])
+        inside = (along > -half_width) & (along < wake) & (across < half_width)
+        factor = 1 - WIND_SHELTER_STRENGTH * (1 - np.clip(along / wake, 0, 1))
+        factor = np.where(inside, factor, 1).astype(np.float32)
+        block = shelter[np.ix_(ix, iy, iz)]
+        shelter[np.ix_(ix, iy, iz)] = np.minimum(block, factor[:, :, None])
+    return shelter
+
+
+def build_wind_field(wind_speed, wind_direction, wind_gust=None, table=None, seed=WIND_SEED):
+    """
+    Precompute a WindField from METAR values.
+
+    Args:
+        wind_speed: Mean wind in knots at the 10 m reference height
+        wind_direction: Degrees clockwise from north the wind blows from
+        wind_gust: Gust speed in knots, or None (turbulence then follows WIND_TURBULENCE_INTENSITY)
+        table: PrimitiveTable of the obstructions that shelter the wind and set the grid extent, or None
+        seed: Seed of the turbulence
+    """
+    speed = wind_speed * KNOTS_TO_CM_S
+    to_rad = math.radians((wind_direction or 0) + 180)  # METAR gives where the wind comes from
+    direction = np.array((math.sin(to_rad), math.cos(to_rad)))
+    if wind_gust and wind_gust > wind_speed:
+        gust_sigma = (wind_gust - wind_speed) * KNOTS_TO_CM_S / WIND_GUST_PEAK_FACTOR
+    else:
+        gust_sigma = WIND_TURBULENCE_INTENSITY * speed
+
+    lo = np.array((DRONE_INITIAL_X, DRONE_INITIAL_Y), dtype=float) - WIND_EXTENT
+    hi = np.array((DRONE_INITIAL_X, DRONE_INITIAL_Y), dtype=float) + WIND_EXTENT
+    if table is not None and len(table):
+        mins, maxs = table.primitive_bounds()
+        lo = np.minimum(lo, mins[:, :2].min(axis=0) - WIND_MARGIN)
+        hi = np.maximum(hi, maxs[:, :2].max(axis=0) + WIND_MARGIN)
+    cell = float(WIND_CELL_SIZE)
+    nz = int(math.ceil(WIND_MAX_ALTITUDE / WIND_VERTICAL_CELL_SIZE)) + 1
+    while (math.ceil((hi[0] - lo[0]) / cell) + 1) * (math.ceil((hi[1] - lo[1]) / cell) + 1) * nz > WIND_MAX_CELLS:
+        cell *= 2  # Coarser grid for very large scenes
+    xs = lo[0] + np.arange(int(math.ceil((hi[0] - lo[0]) / cell)) + 1) * cell
+    ys = lo[1] + np.arange(int(math.ceil((hi[1] - lo[1]) / cell)) + 1) * cell
+    zs = np.arange(nz) * float(WIND_VERTICAL_CELL_SIZE)
+
+    profile = (np.maximum(zs, WIND_MIN_HEIGHT) / WIND_REFERENCE_HEIGHT) ** WIND_SHEAR_EXPONENT
+    shelter = _shelter(xs, ys, zs, table, direction) if table is not None and len(table) else 1.0
+    scale = shelter * profile[None, None, :]
+    mean = np.zeros((len(xs), len(ys), nz, 4), dtype=np.float32)
+    mean[..., 0] = speed * direction[0] * scale
+    mean[..., 1] = speed * direction[1] * scale
+    mean[..., 3] = gust_sigma * scale
+
+    gust = gust_noise(WIND_GUST_GRID, WIND_GUST_CELL_SIZE, WIND_GUST_LENGTH_SCALE, np.random.default_rng(seed))
+    advection = (speed * direction[0], speed * direction[1], 0.0)
+    return WindField(mean, (lo[0], lo[1], 0.0), (cell, cell, WIND_VERTICAL_CELL_SIZE), gust, WIND_GUST_CELL_SIZE,
+                     advection)
+
+
+def create_wind_field(weather_data, collision_detector=None, seed=WIND_SEED):
+    """WindField for a weather data dictionary, or None when wind is disabled or calm."""
+    if not WIND_ENABLED or not weather_data:
+        return None
+    wind_speed = weather_data.get("wind_speed") or 0
+    wind_gust = weather_data.get("wind_gust")
+    if wind_speed <= 0 and not wind_gust:
+        return None
+    table = getattr(collision_detector, "table", None)
+    return build_wind_field(wind_speed, weather_data.get("wind_direction"), wind_gust, table, seed)
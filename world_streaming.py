@@ -0,0 +1,239 @@
+import math
+import os
+import queue
+import random
+import threading
+from collections import OrderedDict
+from scene import Scene, load_scene
+from paths import resolve_path
+from config import (WORLD_TILE_SIZE, WORLD_LOAD_RADIUS, WORLD_CACHE_TILES, WORLD_SEED, WORLD_TILE_DIR,
+                    WORLD_MAX_TREES_PER_TILE, WORLD_HOUSE_PROBABILITY, WORLD_OBJECT_MARGIN,
+                    WORLD_SPAWN_CLEARANCE, WORLD_MAX_UPLOADS_PER_FRAME, DRONE_INITIAL_X, DRONE_INITIAL_Y)
+
+
+def generate_tile(coord, seed=WORLD_SEED, tile_size=WORLD_TILE_SIZE):
+    """
+    Procedurally generate the scene dictionary for one tile.
+
+    The tile's random stream is seeded from the world seed and tile coordinates, so a tile is
+    identical every time it is (re)built regardless of the order tiles are visited in.
+    """
+    rng = random.Random(f"{seed}:{coord[0]}:{coord[1]}")
+    x0 = coord[0] * tile_size
+    y0 = coord[1] * tile_size
+    obstructions = []
+
+    def clear_of_spawn(x, y, radius):
+        return math.hypot(x - DRONE_INITIAL_X, y - DRONE_INITIAL_Y) > WORLD_SPAWN_CLEARANCE + radius
+
+    if rng.random() < WORLD_HOUSE_PROBABILITY:
+        x = x0 + rng.uniform(300, tile_size - 300)
+        y = y0 + rng.uniform(300, tile_size - 300)
+        if clear_of_spawn(x, y, 360):
+            obstructions.append({"type": "house_1", "position": [x, y, 0]})
+
+    # One forest clump per tile, trees scattered around its center
+    center_x = x0 + rng.uniform(0, tile_size)
+    center_y = y0 + rng.uniform(0, tile_size)
+    spread = rng.uniform(150, tile_size / 3)
+    for _ in range(rng.randint(0, WORLD_MAX_TREES_PER_TILE)):
+        x = min(max(rng.gauss(center_x, spread), x0), x0 + tile_size)
+        y = min(max(rng.gauss(center_y, spread), y0), y0 + tile_size)
+        trunk_height = rng.uniform(100, 400)
+        trunk_radius = rng.uniform(10, 20)
+        canopy_radius = rng.uniform(40, 75)
+        if clear_of_spawn(x, y, canopy_radius):
+            obstructions.append({"type": "tree_1", "position": [x, y, 0], "trunk_radius": trunk_radius,
+                                 "trunk_height": trunk_height, "canopy_radius": canopy_radius})
+    return {"seed": seed, "obstructions": obstructions}
+
+
+class WorldChunk:
+    """A built tile: compiled scene plus its collision detector. GPU batches are owned by the render thread."""
+
+    def __init__(self, coord, scene):
+        self.coord = coord
+        self.scene = scene
+        self.collision_detector = scene.create_collision_detector()
+        self.batches = None
+
+
+"""Streams tiles of obstructions around the drone.
+
+Tiles within WORLD_LOAD_RADIUS of the drone's tile are active: they are rendered and used for collision.
+Tiles are built on a background thread and kept in an LRU cache of WORLD_CACHE_TILES; leaving the active
+set releases a tile's display lists, and falling out of the LRU drops its collision index entirely.
+Authored tiles in WORLD_TILE_DIR named "<tx>_<ty>.json" replace the procedural generator for that tile.
+"""
+class ChunkedWorld:
+    def __init__(self, tile_size=WORLD_TILE_SIZE, load_radius=WORLD_LOAD_RADIUS, cache_tiles=WORLD_CACHE_TILES,
+                 seed=WORLD_SEED, tile_dir=WORLD_TILE_DIR, generator=generate_tile, terrain=None):
+        active_tiles = (2 * load_radius + 1) ** 2
+        if cache_tiles < active_tiles:
+            raise ValueError(f"cache_tiles ({cache_tiles}) must hold the {active_tiles} active tiles")
+        self.tile_size = tile_size
+        self.load_radius = load_radius
+        self.cache_tiles = cache_tiles
+        self.seed = seed
+        self.tile_dir = resolve_path(tile_dir) if tile_dir else None
+        self.generator = generator
+        self.terrain = terrain
+
+        self.active = set()
+        self._cache = OrderedDict()  # coord -> WorldChunk, least recently used first
+        self._pending = set()
+        self._released_batches = []  # Display lists to delete on the render thread
+        self._requests = queue.Queue()
+        self._results = queue.Queue()
+        self._worker = threading.Thread(target=self._run_worker, name="world-streaming", daemon=True)
+        self._worker.start()
+
+    def tile_of(self, x, y):
+        return math.floor(x / self.tile_size), math.floor(y / self.tile_size)
+
+    def build_chunk(self, coord):
+        """Build a tile from its authored file if present, otherwise from the generator."""
+        if self.tile_dir:
+            path = os.path.join(self.tile_dir, f"{coord[0]}_{coord[1]}.json")
+            if os.path.exists(path):
+                return WorldChunk(coord, load_scene(path))
+        return WorldChunk(coord, Scene.compile(self.generator(coord, self.seed, self.tile_size)))
+
+    def _run_worker(self):
+        while True:
+            coord = self._requests.get()
+            if coord is None:
+                break
+            try:
+                self._results.put((coord, self.build_chunk(coord)))
+            except Exception as e:
+                print(f"World tile {coord} failed to build: {e}")
+                self._results.put((coord, None))
+
+    def _collect_results(self):
+        while True:
+            try:
+                coord, chunk = self._results.get_nowait()
+            except queue.Empty:
+                return
+            self._pending.discard(coord)
+            if chunk is not None and coord not in self._cache:
+                self._store(chunk)
+
+    def _store(self, chunk):
+        self._cache[chunk.coord] = chunk
+        self._cache.move_to_end(chunk.coord)
+        while len(self._cache) > self.cache_tiles:
+            coord, evicted = self._cache.popitem(last=False)
+            self.active.discard(coord)
+            self._release_gpu(evicted)
+
+    def _release_gpu(self, chunk):
+        if chunk.batches:
+            self._released_batches.extend(chunk.batches)
+        chunk.batches = None
+
+    def update(self, drone_state):
+        """Per physics tick: collect built tiles, request missing ones and retire far ones."""
+        self._collect_results()
+        center_x, center_y = self.tile_of(drone_state["x"], drone_state["y"])
+        radius = self.load_radius
+        desired = [(center_x + dx, center_y + dy)
+                   for dx in range(-radius, radius + 1) for dy in range(-radius, radius + 1)]
+        desired.sort(key=lambda c: abs(c[0] - center_x) + abs(c[1] - center_y))  # Nearest first
+
+        for coord in desired:
+            if coord in self._cache:
+                self._cache.move_to_end(coord)
+            elif coord not in self._pending:
+                self._pending.add(coord)
+                self._requests.put(coord)
+
+        desired = set(desired)
+        for coord in self.active - desired:
+            chunk = self._cache.get(coord)
+            if chunk is not None:
+                self._release_gpu(chunk)
+        self.active = {coord for coord in desired if coord in self._cache}
+
+    def _chunk_now(self, coord):
+        """Return a tile, building it synchronously if the background thread has not delivered it yet."""
+        chunk = self._cache.get(coord)
+        if chunk is None:
+            chunk = self.build_chunk(coord)
+            self._store(chunk)
+        return chunk
+
+    def check_path_collision(self, current_state, target_state):
+        """Same contract as CollisionDetector.check_path_collision, across every tile the path touches."""
+        if self.terrain is not None:
+            hit = self.terrain.check_path((current_state["x"], current_state["y"], current_state["z"]),
+                                          (target_state["x"], target_state["y"], target_state["z"]))
+            if hit is not None:
+                return hit
+        start_x, start_y = current_state["x"], current_state["y"]
+        end_x, end_y = target_state["x"], target_state["y"]
+        lo_x, lo_y = self.tile_of(min(start_x, end_x) - WORLD_OBJECT_MARGIN, min(start_y, end_y) - WORLD_OBJECT_MARGIN)
+        hi_x, hi_y = self.tile_of(max(start_x, end_x) + WORLD_OBJECT_MARGIN, max(start_y, end_y) + WORLD_OBJECT_MARGIN)
+        coords = [(tx, ty) for tx in range(lo_x, hi_x + 1) for ty in range(lo_y, hi_y + 1)]
+
+        # Visit tiles in path order so the first reported hit is the earliest one
+        def path_order(coord):
+            center_x = (coord[0] + 0.5) * self.tile_size
+            center_y = (coord[1] + 0.5) * self.tile_size
+            return (center_x - start_x) * (end_x - start_x) + (center_y - start_y) * (end_y - start_y)
+
+        for coord in sorted(coords, key=path_order):
+            hit = self._chunk_now(coord).collision_detector.check_path_collision(current_state, target_state)
+            if hit is not None:
+                return hit
+        return None
+
+    def check_polyline_collision(self, vertices):
+        """Same contract as CollisionDetector.check_polyline_collision, one segment at a time."""
+        for start, end in zip(vertices[:-1], vertices[1:]):
+            hit = self.check_path_collision({"x": start[0], "y": start[1], "z": start[2]},
+                                            {"x": end[0], "y": end[1], "z": end[2]})
+            if hit is not None:
+                return hit
+        return None
+
+    def detectors_near(self, x, y, radius):
+        """Collision detectors of the already loaded tiles within radius of (x, y), without building any."""
+        lo_x, lo_y = self.tile_of(x - radius - WORLD_OBJECT_MARGIN, y - radius - WORLD_OBJECT_MARGIN)
+        hi_x, hi_y = self.tile_of(x + radius + WORLD_OBJECT_MARGIN, y + radius + WORLD_OBJECT_MARGIN)
+        chunks = (self._cache.get((tx, ty)) for tx in range(lo_x, hi_x + 1) for ty in range(lo_y, hi_y + 1))
+        return [chunk.collision_detector for chunk in chunks if chunk is not None]
+
+    def render(self):
+        """Render active tiles; must be called from the GL thread."""
+        from obstruction_renderer import create_scene_batches  # Render side only, keeps the world headless-safe
+
+        for batch in self._released_batches:
+            batch.delete()
+        self._released_batches.clear()
+
+        uploads = 0
+        for coord in self.active:
+            chunk = self._cache[coord]
+            if chunk.batches is None:
+                chunk.batches = create_scene_batches(chunk.scene)
+            for batch in chunk.batches:
+                if not batch.uploaded:
+                    if uploads >= WORLD_MAX_UPLOADS_PER_FRAME:
+                        continue  # Spread display list compilation and buffer uploads over frames
+                    uploads += 1
+                batch.render()
+
+    def delete(self):
+        """Clean up OpenGL resources."""
+        for chunk in self._cache.values():
+            self._release_gpu(chunk)
+        for batch in self._released_batches:
+            batch.delete()
+        self._released_batches.clear()
+
+    def close(self):
+        """Stop the background builder thread."""
+        self._requests.put(None)
+        self._worker.join(timeout=1.0)